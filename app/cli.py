@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+无界面的命令行统计与查询工具
+
+只依赖 app.utils.history，不导入 tkinter 和 Pillow，启动迅速，
+适合在定时任务和脚本中批量查询。
+
+用法:
+    python -m app.cli stats --days 30 --json
+    python -m app.cli list --status completed --limit 20
+    python -m app.cli export history.jsonl
+    python -m app.cli import other-machine.csv
+    python -m app.cli --history-file /path/to/history.json stats
+    python -m app.cli --profile alice stats
+    python -m app.cli profiles --days 7
+    python -m app.cli sync /mnt/shared/pyfocus
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from app.utils import history, transfer
+from app.utils.history import HistoryManager, SessionStatus, format_timestamp, format_duration
+
+STATUS_CHOICES = [status.value for status in SessionStatus]
+
+
+def cmd_stats(args):
+    """输出统计数据"""
+    stats = HistoryManager.get_statistics(args.days)
+    if args.json:
+        print(json.dumps(stats))
+        return 0
+
+    print(f"Total sessions: {stats['total_sessions']}")
+    print(f"Completed: {stats['completed_sessions']}")
+    print(f"Failed: {stats['failed_sessions']}")
+    print(f"Interrupted: {stats['interrupted_sessions']}")
+    print(f"Total focus time: {format_duration(stats['total_focus_time'])}")
+    print(f"Completion rate: {round(stats['completion_rate'], 1)}%")
+    return 0
+
+
+def cmd_list(args):
+    """按条件列出会话记录，按开始时间倒序"""
+    start = time.time() - args.days * 24 * 60 * 60 if args.days else None
+    sessions = HistoryManager.query(status=args.status, start=start, limit=args.limit)
+
+    if args.json:
+        print(json.dumps(list(sessions), ensure_ascii=False))
+        return 0
+
+    for session in sessions:
+        print(f"{session['id']}\t{format_timestamp(session['start_time'])}\t"
+              f"{format_duration(session['actual_duration'])}\t{session['status']}\t{session['notes']}")
+    return 0
+
+
+def cmd_profiles(args):
+    """列出用户配置及其统计数据（读取各配置按天汇总的计数）"""
+    from app.utils.profiles import get_aggregate_statistics
+    stats = get_aggregate_statistics(args.days)
+    if args.json:
+        print(json.dumps(stats))
+        return 0
+
+    rows = list(stats["profiles"].items()) + [("(all)", stats["total"])]
+    for name, profile_stats in rows:
+        print(f"{name}\t{profile_stats['total_sessions']}\t{profile_stats['completed_sessions']}\t"
+              f"{format_duration(profile_stats['total_focus_time'])}\t{round(profile_stats['completion_rate'], 1)}%")
+    return 0
+
+
+def cmd_sync(args):
+    """与共享目录中其他设备的历史记录同步"""
+    from app.utils.sync import sync_history
+    try:
+        counts = sync_history(args.directory, args.device)
+    except OSError as e:
+        print(f"Sync failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Added {counts['added']} and deleted {counts['deleted']} sessions; "
+          f"sent {counts['sent']} segments ({counts['bytes_sent']} bytes), "
+          f"received {counts['received']} segments ({counts['bytes_received']} bytes)", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Query PyFocus history without the GUI.")
+    parser.add_argument("--history-file", help="history file to read instead of the default one")
+    parser.add_argument("--profile", help="read this user profile's history")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stats_parser = subparsers.add_parser("stats", help="show statistics")
+    stats_parser.add_argument("--days", type=int, default=30, help="number of days, 0 for all (default: 30)")
+    stats_parser.add_argument("--json", action="store_true", help="print JSON")
+    stats_parser.set_defaults(func=cmd_stats)
+
+    list_parser = subparsers.add_parser("list", help="list sessions, newest first")
+    list_parser.add_argument("--status", choices=STATUS_CHOICES, help="only sessions with this status")
+    list_parser.add_argument("--days", type=int, default=0, help="only the last N days (default: all)")
+    list_parser.add_argument("--limit", type=int, help="maximum number of sessions")
+    list_parser.add_argument("--json", action="store_true", help="print JSON")
+    list_parser.set_defaults(func=cmd_list)
+
+    profiles_parser = subparsers.add_parser("profiles", help="per-profile and combined statistics")
+    profiles_parser.add_argument("--days", type=int, default=30,
+                                 help="number of calendar days, 0 for all (default: 30)")
+    profiles_parser.add_argument("--json", action="store_true", help="print JSON")
+    profiles_parser.set_defaults(func=cmd_profiles)
+
+    # export 和 import 子命令与 python -m app.utils.transfer 相同
+    transfer.add_subcommands(subparsers)
+
+    sync_parser = subparsers.add_parser("sync", help="merge history with other machines through a shared folder")
+    sync_parser.add_argument("directory", help="shared folder, e.g. on a mounted drive")
+    sync_parser.add_argument("--device", help="name of this machine in the folder (default: remembered, or host name)")
+    sync_parser.set_defaults(func=cmd_sync)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.profile:
+        from app.utils.profiles import profile_paths
+        try:
+            history.HISTORY_FILE = profile_paths(args.profile)[0]
+        except ValueError as e:
+            parser.error(str(e))
+    if args.history_file:
+        history.HISTORY_FILE = args.history_file
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
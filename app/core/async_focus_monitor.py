@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+asyncio 版本的焦点监控
+
+焦点变化以 FocusEvent 的形式放入 asyncio.Queue，由协程消费:
+
+    monitor = AsyncFocusMonitor()
+    monitor.bind_tk(root)        # 或在其他来源中调用 monitor.report(has_focus)
+    async for event in monitor:
+        ...
+
+report() 是线程安全的，可以在 Tk 主线程或其他线程中调用。
+"""
+
+import time
+import asyncio
+from collections import namedtuple
+
+from app.core.timer import TimerState
+
+# 焦点事件：kind 为 "lost" 或 "gained"，timestamp 为发生时间
+FocusEvent = namedtuple("FocusEvent", ["kind", "timestamp"])
+
+
+class AsyncFocusMonitor:
+    """将焦点变化转换为异步队列中的事件"""
+
+    def __init__(self, loop=None, maxsize=0):
+        """
+        初始化监控器（需在事件循环中创建，或传入 loop）
+
+        Args:
+            loop: 事件循环，默认为当前运行的事件循环
+            maxsize: 事件队列长度上限，0 表示不限制；队列满时丢弃最旧的事件
+        """
+        self.loop = loop or asyncio.get_running_loop()
+        self.events = asyncio.Queue(maxsize)
+        self.has_focus = True
+        self._watched = []
+
+    def report(self, has_focus):
+        """
+        报告当前焦点状态，只有变化时才产生事件（线程安全）
+
+        Args:
+            has_focus: 窗口是否拥有焦点
+        """
+        timestamp = time.time()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._report(has_focus, timestamp)
+        else:
+            self.loop.call_soon_threadsafe(self._report, has_focus, timestamp)
+
+    def bind_tk(self, root):
+        """
+        绑定 Tk 窗口的焦点事件
+
+        Args:
+            root: tkinter根窗口
+        """
+        root.bind("<FocusIn>", lambda event: self.report(True), add="+")
+        root.bind("<FocusOut>", lambda event: self.report(False), add="+")
+
+    def watch(self, timer):
+        """
+        严格模式：失去焦点时让运行中的计时器失败
+
+        Args:
+            timer: AsyncFocusTimer（或提供 state 和 fail() 的计时器）
+
+        Returns:
+            function: 调用后取消监视
+        """
+        self._watched.append(timer)
+
+        def unwatch():
+            if timer in self._watched:
+                self._watched.remove(timer)
+
+        return unwatch
+
+    async def get(self):
+        """
+        等待下一个焦点事件
+
+        Returns:
+            FocusEvent: 焦点事件
+        """
+        return await self.events.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.events.get()
+
+    def _report(self, has_focus, timestamp):
+        """在事件循环线程中处理焦点变化"""
+        if has_focus == self.has_focus:
+            return
+        self.has_focus = has_focus
+
+        if not has_focus:
+            for timer in list(self._watched):
+                if timer.state == TimerState.RUNNING:
+                    timer.fail()
+
+        event = FocusEvent("gained" if has_focus else "lost", timestamp)
+        if self.events.full():
+            self.events.get_nowait()
+        self.events.put_nowait(event)
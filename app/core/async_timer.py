@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+asyncio 版本的专注定时器
+
+每个计时器只是事件循环中的一个任务，不占用线程，一个事件循环可以运行上千个会话。
+状态与 FocusTimer 相同（TimerState），用法:
+
+    timer = AsyncFocusTimer(25 * 60)
+    timer.start()
+    async for remaining in timer.ticks():
+        ...
+    state = await timer      # 会话结束时的状态
+"""
+
+import time
+import asyncio
+
+from app.core.timer import TimerState
+
+
+class AsyncFocusTimer:
+    """asyncio 专注定时器"""
+
+    def __init__(self, duration=25*60, checkpoint=None):
+        """
+        初始化定时器
+
+        Args:
+            duration: 专注时长（秒）
+            checkpoint: 可选的 TimerCheckpoint，每次状态变化和每秒都会写入
+        """
+        self.duration = duration
+        self.remaining = duration
+        self.state = TimerState.IDLE
+        self.started_at = None
+        self.checkpoint = checkpoint
+        self._task = None
+        self._done = None
+        # 下一秒的截止时间（事件循环时钟）
+        self._deadline = None
+        # 暂停时当前这一秒已经过去的部分，恢复后只需再等剩下的部分
+        self._carry = 0.0
+        # 每秒和每次状态变化时递增，ticks() 的迭代者在 _waiters 上等待
+        self._version = 0
+        self._waiters = []
+
+    def start(self):
+        """开始或继续计时（需在事件循环中调用）"""
+        if self.state not in (TimerState.IDLE, TimerState.PAUSED):
+            return
+        loop = asyncio.get_running_loop()
+        if self.state == TimerState.IDLE:
+            self.started_at = time.time()
+            self._carry = 0.0
+            self._done = loop.create_future()
+        self.state = TimerState.RUNNING
+        self._save_checkpoint()
+        # 从调用 start() 时起计时，而不是从计时任务首次运行时起；
+        # 以截止时间为基准，避免误差累积
+        self._deadline = loop.time() + 1 - self._carry
+        self._carry = 0.0
+        self._task = loop.create_task(self._run())
+        self._notify()
+
+    def pause(self):
+        """暂停计时，取消计时任务，已经过去的不足一秒的时间会被保留"""
+        if self.state != TimerState.RUNNING:
+            return
+        self.state = TimerState.PAUSED
+        if self._deadline is not None:
+            now = asyncio.get_running_loop().time()
+            self._carry = min(max(1 - (self._deadline - now), 0.0), 1.0)
+        self._cancel_task()
+        self._save_checkpoint()
+        self._notify()
+
+    def resume(self):
+        """恢复计时"""
+        if self.state == TimerState.PAUSED:
+            self.start()
+
+    def stop(self):
+        """停止计时并复位，等待中的 await 得到 TimerState.IDLE"""
+        self.state = TimerState.IDLE
+        self._cancel_task()
+        self.remaining = self.duration
+        self.started_at = None
+        self._carry = 0.0
+        self._save_checkpoint()
+        self._finish(TimerState.IDLE)
+
+    def fail(self):
+        """标记为失败"""
+        if self.state not in (TimerState.RUNNING, TimerState.PAUSED):
+            return
+        self.state = TimerState.FAILED
+        self._cancel_task()
+        self._save_checkpoint()
+        self._finish(TimerState.FAILED)
+
+    def __await__(self):
+        """等待会话结束，返回结束时的状态；取消等待方不会影响计时器本身"""
+        if self._done is None:
+            raise RuntimeError("timer has not been started")
+        return asyncio.shield(self._done).__await__()
+
+    async def ticks(self):
+        """
+        异步迭代每秒的剩余时间，会话结束时迭代结束
+
+        Yields:
+            int: 剩余秒数（开始时先产生一次当前剩余时间）
+        """
+        loop = asyncio.get_running_loop()
+        seen = None
+        while True:
+            while self._version == seen:
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+                await waiter
+            # 迭代者处理较慢时只产生最新的剩余时间
+            seen = self._version
+            if self.state not in (TimerState.RUNNING, TimerState.PAUSED):
+                return
+            if self.state == TimerState.RUNNING:
+                yield self.remaining
+
+    async def _run(self):
+        """计时任务"""
+        loop = asyncio.get_running_loop()
+        while self.remaining > 0:
+            await asyncio.sleep(self._deadline - loop.time())
+            self.remaining -= 1
+            self._deadline += 1
+            self._save_checkpoint()
+            self._notify()
+
+        self._deadline = None
+        self._task = None
+        self.state = TimerState.COMPLETED
+        self._save_checkpoint()
+        self._finish(TimerState.COMPLETED)
+
+    def _cancel_task(self):
+        """取消计时任务"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._deadline = None
+
+    def _finish(self, state):
+        """结束会话，唤醒等待者"""
+        if self._done is not None and not self._done.done():
+            self._done.set_result(state)
+        self._notify()
+
+    def _notify(self):
+        """唤醒 ticks() 的迭代者"""
+        self._version += 1
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _save_checkpoint(self):
+        """写入检查点：进行中的会话记录状态，否则清除"""
+        if self.checkpoint is None:
+            return
+        if self.state in (TimerState.RUNNING, TimerState.PAUSED):
+            self.checkpoint.save(self.state.value, self.started_at, self.duration, self.remaining)
+        else:
+            self.checkpoint.clear()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+计时器检查点
+
+运行中的计时器每秒把状态写入一个固定长度的二进制记录（内存映射，原地覆盖），
+进程意外退出后，下次启动时可以据此恢复会话或将其记为中断。
+
+记录格式（小端，共 44 字节）:
+    magic(4s) version(H) state(B) pad(x) started_at(d) updated_at(d)
+    duration(q) remaining(q) crc32(I)
+
+每次写入只是一次 44 字节的内存拷贝，由操作系统负责回写磁盘；
+进程崩溃不会丢失已写入映射的数据。crc32 用于识别写了一半的记录。
+"""
+
+import os
+import mmap
+import time
+import zlib
+import struct
+import threading
+
+# 默认的检查点文件路径（每个用户配置的路径见 profiles.checkpoint_path）
+CHECKPOINT_FILE = os.path.join(os.path.expanduser("~"), ".focus_forest_timer.ckpt")
+
+_MAGIC = b"FFCK"
+_VERSION = 1
+_BODY = struct.Struct("<4sHBxddqq")
+_RECORD = struct.Struct("<4sHBxddqqI")
+RECORD_SIZE = _RECORD.size
+
+# 与 TimerState 的取值一致；检查点只记录进行中的会话
+STATE_IDLE = 0
+STATE_RUNNING = 1
+STATE_PAUSED = 2
+
+
+class TimerCheckpoint:
+    """计时器检查点文件"""
+
+    def __init__(self, path=None):
+        """
+        初始化检查点
+
+        Args:
+            path: 检查点文件路径，默认为 CHECKPOINT_FILE
+        """
+        self.path = path or CHECKPOINT_FILE
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        # 文件无法打开时不再重试，避免每秒输出错误
+        self._disabled = False
+
+    def set_path(self, path):
+        """
+        改用另一个检查点文件（例如切换用户配置时），关闭当前文件的内存映射
+
+        Args:
+            path: 检查点文件路径
+        """
+        self.close()
+        with self._lock:
+            self.path = path
+            self._disabled = False
+
+    def save(self, state, started_at, duration, remaining):
+        """
+        覆盖写入当前计时器状态
+
+        Args:
+            state: 计时器状态取值（STATE_RUNNING 或 STATE_PAUSED）
+            started_at: 会话开始时间戳
+            duration: 计划时长（秒）
+            remaining: 剩余秒数
+        """
+        body = _BODY.pack(_MAGIC, _VERSION, state, started_at or 0.0, time.time(),
+                          int(duration), int(remaining))
+        record = body + struct.pack("<I", zlib.crc32(body))
+        with self._lock:
+            if self._map is None and not self._open():
+                return
+            self._map[:] = record
+
+    def clear(self):
+        """标记没有进行中的会话（文件不存在时不创建）"""
+        with self._lock:
+            if self._map is None and not os.path.exists(self.path):
+                return
+            if self._map is None and not self._open():
+                return
+            self._map[:] = bytes(RECORD_SIZE)
+
+    def load(self):
+        """
+        读取检查点
+
+        Returns:
+            dict: 进行中的会话 {state, started_at, updated_at, duration, remaining}，
+                  没有进行中的会话或记录损坏时返回None
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read(RECORD_SIZE)
+        except OSError:
+            return None
+        if len(data) != RECORD_SIZE:
+            return None
+
+        magic, version, state, started_at, updated_at, duration, remaining, crc = _RECORD.unpack(data)
+        if magic != _MAGIC or version != _VERSION or crc != zlib.crc32(data[:_BODY.size]):
+            return None
+        if state not in (STATE_RUNNING, STATE_PAUSED):
+            return None
+        return {
+            "state": state,
+            "started_at": started_at,
+            "updated_at": updated_at,
+            "duration": duration,
+            "remaining": remaining,
+        }
+
+    def close(self):
+        """关闭内存映射"""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self):
+        """打开（必要时创建）检查点文件并建立内存映射"""
+        if self._disabled:
+            return False
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._file = os.fdopen(fd, "r+b")
+            if os.fstat(fd).st_size != RECORD_SIZE:
+                self._file.truncate(RECORD_SIZE)
+            self._map = mmap.mmap(fd, RECORD_SIZE)
+            return True
+        except (OSError, ValueError) as e:
+            print(f"打开计时器检查点文件出错: {e}")
+            self._disabled = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            return False
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+分心记录
+
+一次会话中窗口失去焦点的时间段保存在固定容量的环形缓冲中：
+每段为两个 uint32（相对会话开始的毫秒偏移、持续毫秒数），
+超出容量时覆盖最旧的记录，但次数和总时长始终是完整的。
+
+随会话保存到历史记录的附加字段（没有分心时不写入）:
+    distractions        分心次数
+    distracted_seconds  分心总时长（秒）
+    distraction_log     最近的分心时间段，小端 uint32 对的 base64 编码
+"""
+
+import sys
+import base64
+from array import array
+
+# 环形缓冲默认容量（分心段数）
+DEFAULT_CAPACITY = 64
+
+_UINT32_MAX = 0xFFFFFFFF
+
+
+class DistractionLog:
+    """一次会话的分心记录"""
+
+    __slots__ = ("started_at", "capacity", "count", "total", "lost_at", "_data", "_head", "_filled")
+
+    def __init__(self, started_at, capacity=DEFAULT_CAPACITY):
+        """
+        初始化分心记录
+
+        Args:
+            started_at: 会话开始时间戳
+            capacity: 环形缓冲保留的分心段数
+        """
+        self.started_at = started_at
+        self.capacity = capacity
+        # 分心次数与总时长（秒），包括已被覆盖的记录
+        self.count = 0
+        self.total = 0.0
+        # 当前这次失去焦点的时间，焦点未丢失时为None
+        self.lost_at = None
+        self._data = array("I", bytes(8 * capacity))
+        # 下一个写入的段位置，以及缓冲中有效的段数
+        self._head = 0
+        self._filled = 0
+
+    def focus_lost(self, timestamp):
+        """记录失去焦点"""
+        if self.lost_at is None:
+            self.lost_at = timestamp
+
+    def focus_gained(self, timestamp):
+        """记录重新获得焦点，结束当前分心段"""
+        lost_at = self.lost_at
+        if lost_at is None:
+            return
+        self.lost_at = None
+        duration = max(timestamp - lost_at, 0.0)
+
+        slot = self._head * 2
+        self._data[slot] = _clamp_ms(lost_at - self.started_at)
+        self._data[slot + 1] = _clamp_ms(duration)
+        self._head = (self._head + 1) % self.capacity
+        self._filled = min(self._filled + 1, self.capacity)
+        self.count += 1
+        self.total += duration
+
+    def close(self, timestamp):
+        """会话结束：焦点仍未恢复时按结束时间截止"""
+        self.focus_gained(timestamp)
+
+    def events(self):
+        """
+        按时间顺序返回缓冲中保留的分心段
+
+        Returns:
+            list: [(开始时间戳, 持续秒数), ...]
+        """
+        pairs = self._ordered()
+        started_at = self.started_at
+        return [(started_at + pairs[i] / 1000, pairs[i + 1] / 1000) for i in range(0, len(pairs), 2)]
+
+    def to_fields(self):
+        """
+        转换为随会话保存的附加字段
+
+        Returns:
+            dict: 没有分心时为空字典
+        """
+        if not self.count:
+            return {}
+        pairs = self._ordered()
+        if sys.byteorder != "little":
+            pairs.byteswap()
+        return {
+            "distractions": self.count,
+            "distracted_seconds": round(self.total, 1),
+            "distraction_log": base64.b64encode(pairs.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_session(cls, session, capacity=DEFAULT_CAPACITY):
+        """
+        从历史记录中的会话恢复分心记录
+
+        Args:
+            session: 会话字典（或 SessionRow）
+
+        Returns:
+            DistractionLog: 分心记录，会话没有分心字段时次数为0
+        """
+        log = cls(session.get("start_time", 0), capacity)
+        encoded = session.get("distraction_log")
+        if encoded:
+            pairs = array("I")
+            pairs.frombytes(base64.b64decode(encoded))
+            if sys.byteorder != "little":
+                pairs.byteswap()
+            pairs = pairs[-2 * capacity:]
+            log._data[:len(pairs)] = pairs
+            log._filled = len(pairs) // 2
+            log._head = log._filled % capacity
+        log.count = int(session.get("distractions", 0))
+        log.total = float(session.get("distracted_seconds", 0))
+        return log
+
+    def _ordered(self):
+        """缓冲中按时间顺序排列的 uint32 对"""
+        data = self._data
+        if self._filled < self.capacity:
+            return data[:2 * self._filled]
+        split = self._head * 2
+        return data[split:] + data[:split]
+
+
+def _clamp_ms(seconds):
+    """秒数转换为 uint32 毫秒"""
+    return min(max(int(seconds * 1000), 0), _UINT32_MAX)
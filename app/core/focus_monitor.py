@@ -8,10 +8,13 @@ import time
 import threading
 import tkinter as tk
 
+from app.core.distraction import DistractionLog
+
 class FocusMonitor:
     """
     监控应用程序是否保持焦点，
-    如果用户切换到其他窗口，则触发失焦回调
+    如果用户切换到其他窗口，则触发失焦回调；
+    会话期间（无论是否严格模式）记录每次失去焦点的时间段
     """
     
     def __init__(self, root, on_focus_lost=None, check_interval=1.0):
@@ -33,6 +36,10 @@ class FocusMonitor:
         # 记录最后一次焦点状态
         self.had_focus = True
         
+        # 当前会话的分心记录，tracking 为False时（如暂停中）不记录
+        self.distractions = None
+        self.tracking = False
+        
         # 绑定焦点事件
         self.root.bind("<FocusIn>", self._on_focus_in)
         self.root.bind("<FocusOut>", self._on_focus_out)
@@ -52,6 +59,46 @@ class FocusMonitor:
             self.monitoring = False
             self.stop_flag.set()
     
+    def begin_distractions(self, start_time):
+        """
+        开始记录新会话的分心
+        
+        Args:
+            start_time: 会话开始时间戳
+        """
+        self.distractions = DistractionLog(start_time)
+        self.tracking = True
+    
+    def set_tracking(self, tracking):
+        """
+        暂停或恢复分心记录；暂停时正在进行的分心段在此刻截止
+        
+        Args:
+            tracking: 是否记录
+        """
+        if self.distractions is None:
+            return
+        if not tracking:
+            self.distractions.focus_gained(time.time())
+        self.tracking = tracking
+    
+    def end_distractions(self, end_time):
+        """
+        结束当前会话的分心记录
+        
+        Args:
+            end_time: 会话结束时间戳
+            
+        Returns:
+            DistractionLog: 分心记录，没有进行中的记录时返回None
+        """
+        log = self.distractions
+        if log is not None:
+            log.close(end_time)
+        self.distractions = None
+        self.tracking = False
+        return log
+    
     def _monitor_focus(self):
         """监控线程主函数"""
         while not self.stop_flag.is_set():
@@ -69,9 +116,36 @@ class FocusMonitor:
     def _on_focus_in(self, event):
         """窗口获得焦点事件处理"""
         self.had_focus = True
+        if self.tracking:
+            self.root.after_idle(self._record_distraction, time.time())
     
     def _on_focus_out(self, event):
         """窗口失去焦点事件处理"""
         self.had_focus = False
+        if self.tracking:
+            self.root.after_idle(self._record_distraction, time.time())
         if self.monitoring and self.on_focus_lost:
-            self.on_focus_lost()
\ No newline at end of file
+            self.on_focus_lost()
+    
+    def _record_distraction(self, timestamp):
+        """
+        焦点事件处理完毕后判断应用是否仍有焦点
+        
+        焦点在应用内的组件之间移动也会产生 FocusOut/FocusIn，
+        只有整个应用失去焦点时才算分心。
+        
+        Args:
+            timestamp: 焦点事件发生的时间
+        """
+        log = self.distractions
+        if log is None or not self.tracking:
+            return
+        try:
+            has_focus = self.root.focus_get() is not None
+        except KeyError:
+            # 焦点在无法映射到组件的窗口上（如原生对话框），仍属于本应用
+            has_focus = True
+        if has_focus:
+            log.focus_gained(timestamp)
+        else:
+            log.focus_lost(timestamp)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+多计时器调度器
+
+用一个按截止时间排序的最小堆驱动任意数量的计时器，代替每个计时器一个线程。
+可以在独立的后台线程中运行（start），也可以挂在 Tk 的 after 循环上（attach），
+此时所有回调都在 Tk 主线程中执行。
+
+被调度的计时器只需提供 tick() 方法：每到一个截止时间调用一次，
+返回True表示在一个间隔后再次调用，返回False表示不再调度。FocusTimer
+在构造时传入 scheduler 即改用本调度器。
+"""
+
+import math
+import time
+import heapq
+import threading
+import itertools
+
+
+class TimerScheduler:
+    """基于最小堆的计时器调度器"""
+
+    def __init__(self, interval=1.0, clock=time.monotonic):
+        """
+        初始化调度器
+
+        Args:
+            interval: 两次 tick 之间的间隔（秒）
+            clock: 单调时钟函数
+        """
+        self.interval = interval
+        self.clock = clock
+        # 堆元素: (截止时间, 序号, 计时器, 令牌)
+        self._heap = []
+        # 每个计时器当前有效的令牌，移除或重新加入后旧的堆元素自动失效
+        self._tokens = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition(threading.Lock())
+        # 防止 tick 回调中的嵌套事件循环（如对话框）重入 run_pending
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._widget = None
+        self._after_id = None
+        self._stopped = False
+
+    def __len__(self):
+        """当前被调度的计时器数量"""
+        return len(self._tokens)
+
+    def add(self, timer, delay=None):
+        """
+        开始调度计时器，已在调度中的计时器会重新安排
+
+        Args:
+            timer: 提供 tick() 方法的计时器
+            delay: 首次调用 tick() 前的等待秒数，默认为一个间隔
+        """
+        deadline = self.clock() + (self.interval if delay is None else delay)
+        with self._cond:
+            token = next(self._counter)
+            self._tokens[timer] = token
+            heapq.heappush(self._heap, (deadline, token, timer, token))
+            earliest = self._heap[0][3] == token
+            if earliest:
+                self._cond.notify()
+        if earliest:
+            self._wake_tk()
+
+    def remove(self, timer):
+        """
+        停止调度计时器（堆中的旧元素在到期时丢弃）
+
+        Args:
+            timer: 计时器
+        """
+        with self._cond:
+            self._tokens.pop(timer, None)
+            # 失效元素过多时重建堆，避免频繁暂停和恢复使堆无限增长
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self._tokens):
+                # 原地修改，run_pending 持有的是同一个列表
+                self._heap[:] = [entry for entry in self._heap if self._tokens.get(entry[2]) == entry[3]]
+                heapq.heapify(self._heap)
+
+    def next_delay(self):
+        """
+        距离最近截止时间的秒数
+
+        Returns:
+            float: 秒数（已到期时为0），没有被调度的计时器时返回None
+        """
+        with self._cond:
+            return self._next_delay_locked()
+
+    def run_pending(self):
+        """
+        调用所有已到期计时器的 tick()
+
+        Returns:
+            float: 距离下一个截止时间的秒数，没有被调度的计时器时返回None
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return self.next_delay()
+        try:
+            heap = self._heap
+            tokens = self._tokens
+            interval = self.interval
+            while True:
+                with self._cond:
+                    now = self.clock()
+                    # 丢弃失效元素，找到最早的有效截止时间
+                    while heap and tokens.get(heap[0][2]) != heap[0][3]:
+                        heapq.heappop(heap)
+                    if not heap or heap[0][0] > now:
+                        return self._next_delay_locked()
+                    deadline, _, timer, token = heapq.heappop(heap)
+
+                again = timer.tick()
+
+                with self._cond:
+                    if tokens.get(timer) != token:
+                        # tick 期间被移除或重新加入
+                        continue
+                    if again:
+                        # 以截止时间而不是当前时间为基准，避免误差累积
+                        heapq.heappush(heap, (deadline + interval, next(self._counter), timer, token))
+                    else:
+                        del tokens[timer]
+        finally:
+            self._run_lock.release()
+
+    def start(self):
+        """在后台守护线程中运行调度器"""
+        if self._thread is None:
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run_thread, daemon=True)
+            self._thread.start()
+        return self
+
+    def attach(self, widget):
+        """
+        在 Tk 的 after 循环中运行调度器，tick() 在 Tk 主线程中调用；
+        此模式下 add() 也应在 Tk 主线程中调用
+
+        Args:
+            widget: 任意 Tk 组件
+        """
+        self._widget = widget
+        self._stopped = False
+        self._schedule_tk(0)
+        return self
+
+    def stop(self):
+        """停止后台线程或 Tk 循环（被调度的计时器保持不变）"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._widget is not None:
+            if self._after_id is not None:
+                self._widget.after_cancel(self._after_id)
+                self._after_id = None
+            self._widget = None
+        if self._thread is not None:
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            self._thread = None
+
+    def _next_delay_locked(self):
+        """距离最近截止时间的秒数（调用者持有锁）"""
+        if not self._heap:
+            return None
+        return max(self._heap[0][0] - self.clock(), 0.0)
+
+    def _run_thread(self):
+        """后台线程：等待最近的截止时间，到期后执行"""
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    delay = self._next_delay_locked()
+                    if delay == 0.0:
+                        break
+                    # 没有计时器时一直等待，add() 会唤醒
+                    self._cond.wait(delay)
+                if self._stopped:
+                    return
+            self.run_pending()
+
+    def _run_tk(self):
+        """Tk after 回调"""
+        self._after_id = None
+        if self._stopped:
+            return
+        delay = self.run_pending()
+        if delay is not None and self._after_id is None:
+            self._schedule_tk(delay)
+
+    def _schedule_tk(self, delay):
+        """安排下一次 after 回调"""
+        if self._widget is None:
+            return
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+        self._after_id = self._widget.after(math.ceil(delay * 1000), self._run_tk)
+
+    def _wake_tk(self):
+        """新的截止时间最早时提前 after 回调"""
+        if self._widget is not None and not self._stopped:
+            self._schedule_tk(self.next_delay() or 0)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+单实例支持
+
+第一个启动的进程在本地套接字上监听；之后的启动只把命令（如"显示窗口"、
+"开始25分钟专注"）发送给已运行的实例后立即退出，不创建 Tk 也不加载图像。
+
+优先使用 Unix 域套接字；平台不支持时（Windows）改用 127.0.0.1 上的 TCP 端口，
+端口号记录在用户目录的文件中。监听的实例在进程的整个生命周期内持有用户目录中
+锁文件的排他锁，同时启动的多个进程只有一个能成为实例；进程崩溃时锁由系统释放，
+下一个实例替换遗留的套接字文件或端口文件。本模块只依赖标准库，
+可以在导入 tkinter 之前使用。
+"""
+
+import os
+import json
+import socket
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Unix 域套接字路径
+SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".focus_forest.sock")
+
+# 不支持 Unix 域套接字时，记录 TCP 端口号的文件
+PORT_FILE = os.path.join(os.path.expanduser("~"), ".focus_forest.port")
+
+# 运行中的实例持有排他锁的文件
+LOCK_FILE = os.path.join(os.path.expanduser("~"), ".focus_forest.lock")
+
+_HAS_UNIX_SOCKET = hasattr(socket, "AF_UNIX")
+
+
+def send_command(command, timeout=0.5):
+    """
+    将命令发送给正在运行的实例
+
+    Args:
+        command: 命令字典，如 {"action": "raise"} 或 {"action": "start", "minutes": 25}
+        timeout: 连接和等待确认的超时时间（秒）
+
+    Returns:
+        bool: 命令已被运行中的实例接收时返回True，没有运行中的实例时返回False
+    """
+    try:
+        sock = _connect(timeout)
+    except (OSError, ValueError):
+        return False
+
+    try:
+        with sock:
+            sock.sendall(json.dumps(command).encode("utf-8") + b"\n")
+            return sock.makefile("rb").readline().strip() == b"ok"
+    except OSError:
+        return False
+
+
+def _connect(timeout):
+    """连接到正在运行的实例"""
+    if _HAS_UNIX_SOCKET:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = SOCKET_PATH
+    else:
+        with open(PORT_FILE, "r", encoding="utf-8") as f:
+            address = ("127.0.0.1", int(f.read().strip()))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class InstanceServer:
+    """在后台线程中接收其他启动进程发来的命令"""
+
+    def __init__(self, on_command):
+        """
+        初始化命令服务
+
+        Args:
+            on_command: 收到命令时的回调函数，参数为命令字典（在服务线程中调用）
+        """
+        self.on_command = on_command
+        self.sock = None
+        self.thread = None
+        self._lock_file = None
+
+    def start(self):
+        """
+        绑定套接字并开始监听
+
+        Returns:
+            bool: 绑定成功返回True；已有其他实例在运行时返回False
+        """
+        try:
+            self._lock_file = _acquire_lock()
+        except OSError:
+            return False
+        try:
+            self.sock = self._bind()
+        except OSError:
+            _release_lock(self._lock_file)
+            self._lock_file = None
+            return False
+        self.sock.listen(8)
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        return True
+
+    def _bind(self):
+        """绑定监听套接字（已持有实例锁），清理崩溃遗留的套接字文件"""
+        if _HAS_UNIX_SOCKET:
+            if os.path.exists(SOCKET_PATH):
+                # 能连上说明已有实例在运行；连不上则是遗留文件
+                try:
+                    _connect(0.2).close()
+                    raise OSError("another instance is running")
+                except (ConnectionRefusedError, FileNotFoundError, socket.timeout):
+                    os.unlink(SOCKET_PATH)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.bind(SOCKET_PATH)
+                os.chmod(SOCKET_PATH, 0o600)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind(("127.0.0.1", 0))
+            # 持有实例锁时已存在的端口文件是崩溃的实例遗留的，原子地替换，
+            # 正在连接的进程不会读到写了一半的文件
+            temp_path = f"{PORT_FILE}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(str(sock.getsockname()[1]))
+            os.replace(temp_path, PORT_FILE)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _serve(self):
+        """接收连接并分发命令"""
+        sock = self.sock
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                # 套接字已关闭
+                return
+            with conn:
+                try:
+                    conn.settimeout(1.0)
+                    line = conn.makefile("rb").readline()
+                    command = json.loads(line.decode("utf-8"))
+                    conn.sendall(b"ok\n")
+                except (OSError, ValueError):
+                    continue
+            if isinstance(command, dict):
+                self.on_command(command)
+
+    def close(self):
+        """停止监听并清理套接字文件"""
+        if self.sock is None:
+            return
+        try:
+            # 唤醒阻塞在 accept 上的服务线程
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.sock = None
+        try:
+            os.unlink(SOCKET_PATH if _HAS_UNIX_SOCKET else PORT_FILE)
+        except OSError:
+            pass
+        # 文件清理之后再释放实例锁
+        _release_lock(self._lock_file)
+        self._lock_file = None
+
+
+def _acquire_lock():
+    """
+    以非阻塞方式获取实例锁文件的排他锁，进程退出（包括崩溃）时由系统释放
+
+    Returns:
+        file: 持有锁的已打开文件
+
+    Raises:
+        OSError: 锁已被其他实例持有时
+    """
+    directory = os.path.dirname(LOCK_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    f = open(LOCK_FILE, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        raise
+    return f
+
+
+def _release_lock(f):
+    """释放实例锁并关闭文件"""
+    if f is None:
+        return
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+    f.close()
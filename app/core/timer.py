@@ -19,7 +19,7 @@ class TimerState(Enum):
 class FocusTimer:
     """专注定时器类"""
     
-    def __init__(self, duration=25*60, on_tick=None, on_complete=None, on_fail=None):
+    def __init__(self, duration=25*60, on_tick=None, on_complete=None, on_fail=None, checkpoint=None, scheduler=None):
         """
         初始化定时器
         
@@ -28,6 +28,8 @@ class FocusTimer:
             on_tick: 每秒回调函数，参数为剩余秒数
             on_complete: 完成时的回调函数
             on_fail: 失败时的回调函数
+            checkpoint: 可选的 TimerCheckpoint，每次状态变化和每秒都会写入
+            scheduler: 可选的 TimerScheduler，指定时由调度器驱动而不是创建计时线程
         """
         self.duration = duration
         self.remaining = duration
@@ -37,12 +39,25 @@ class FocusTimer:
         self.on_fail = on_fail
         self.timer_thread = None
         self.stop_flag = threading.Event()
+        # 会话开始时间，从空闲状态开始计时时记录
+        self.started_at = None
+        self.checkpoint = checkpoint
+        self._checkpoint_lock = threading.Lock()
+        self.scheduler = scheduler
         
     def start(self):
         """开始计时"""
         if self.state == TimerState.IDLE or self.state == TimerState.PAUSED:
+            if self.state == TimerState.IDLE:
+                self.started_at = time.time()
             self.state = TimerState.RUNNING
+            self._save_checkpoint()
             self.stop_flag.clear()
+            if self.scheduler is not None:
+                if self.on_tick:
+                    self.on_tick(self.remaining)
+                self.scheduler.add(self)
+                return
             self.timer_thread = threading.Thread(target=self._run_timer)
             self.timer_thread.daemon = True
             self.timer_thread.start()
@@ -52,22 +67,46 @@ class FocusTimer:
         if self.state == TimerState.RUNNING:
             self.state = TimerState.PAUSED
             self.stop_flag.set()
+            self._unschedule()
+            self._save_checkpoint()
     
     def resume(self):
         """恢复计时"""
         if self.state == TimerState.PAUSED:
             self.start()
     
+    def restore(self, duration, remaining, started_at):
+        """
+        恢复上次异常退出时进行中的会话，恢复后处于暂停状态
+        
+        Args:
+            duration: 计划时长（秒）
+            remaining: 剩余秒数
+            started_at: 会话开始时间戳
+        """
+        self.stop_flag.set()
+        self._unschedule()
+        self.duration = duration
+        self.remaining = remaining
+        self.started_at = started_at
+        self.state = TimerState.PAUSED
+        self._save_checkpoint()
+    
     def stop(self):
         """停止计时"""
         self.state = TimerState.IDLE
         self.stop_flag.set()
+        self._unschedule()
         self.remaining = self.duration
+        self.started_at = None
+        self._save_checkpoint()
     
     def fail(self):
         """标记为失败"""
         self.state = TimerState.FAILED
         self.stop_flag.set()
+        self._unschedule()
+        self._save_checkpoint()
         if self.on_fail:
             self.on_fail()
     
@@ -78,8 +117,48 @@ class FocusTimer:
                 self.on_tick(self.remaining)
             time.sleep(1)
             self.remaining -= 1
+            self._save_checkpoint()
         
         if self.remaining <= 0 and not self.stop_flag.is_set():
             self.state = TimerState.COMPLETED
+            self._save_checkpoint()
             if self.on_complete:
-                self.on_complete()
\ No newline at end of file
+                self.on_complete()
+    
+    def tick(self):
+        """
+        由调度器每秒调用一次
+        
+        Returns:
+            bool: 需要继续调度时返回True
+        """
+        if self.state != TimerState.RUNNING:
+            return False
+        self.remaining -= 1
+        self._save_checkpoint()
+        if self.remaining <= 0:
+            self.state = TimerState.COMPLETED
+            self._save_checkpoint()
+            if self.on_complete:
+                self.on_complete()
+            return False
+        if self.on_tick:
+            self.on_tick(self.remaining)
+        return True
+    
+    def _unschedule(self):
+        """从调度器中移除"""
+        if self.scheduler is not None:
+            self.scheduler.remove(self)
+    
+    def _save_checkpoint(self):
+        """写入检查点：进行中的会话记录状态，否则清除"""
+        if self.checkpoint is None:
+            return
+        # 状态先于加锁修改，最后获得锁的写入总是反映最新状态
+        with self._checkpoint_lock:
+            state = self.state
+            if state == TimerState.RUNNING or state == TimerState.PAUSED:
+                self.checkpoint.save(state.value, self.started_at, self.duration, self.remaining)
+            else:
+                self.checkpoint.clear()
\ No newline at end of file
@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+多人专注房间服务
+
+房间内的成员共用一个 AsyncFocusTimer：任何成员开始、暂停或放弃都作用于整个房间，
+一人放弃则所有人的树一起枯萎。会话结束时按 SessionStatus 给出每个成员的结果
+（放弃者为 failed，其他成员为 interrupted，完成时全部为 completed）。
+
+协议为 TCP 上的换行分隔 JSON，仅监听本机地址。客户端发送:
+    {"op": "join", "room": "study", "name": "alice"}   必须是第一条消息
+    {"op": "start", "minutes": 25}
+    {"op": "pause"} / {"op": "resume"} / {"op": "give_up"} / {"op": "leave"}
+
+服务器加入成功时回复 {"type": "welcome", ...} 快照，之后房间内的变化
+（joined、left、state、tick、ended）在短暂延迟内合并为一条
+{"type": "batch", "room": ..., "events": [...]} 消息，只编码一次后发给所有成员。
+
+所有房间运行在同一个 asyncio 事件循环中:
+    python -m app.service.focus_room --port 8766
+"""
+
+import sys
+import json
+import math
+import asyncio
+import argparse
+
+from app.core.timer import TimerState
+from app.core.async_timer import AsyncFocusTimer
+from app.utils.history import SessionStatus
+
+# 默认端口
+DEFAULT_PORT = 8766
+
+# 广播合并的延迟（秒）
+BATCH_DELAY = 0.05
+
+# 单个客户端未发送数据的上限，超过时断开该客户端（字节）
+MAX_CLIENT_BUFFER = 256 * 1024
+
+# 单条消息的长度上限（字节）
+MAX_LINE = 4096
+
+# 单次房间会话的时长上限（分钟）
+MAX_MINUTES = 24 * 60
+
+
+class Room:
+    """一个专注房间"""
+
+    def __init__(self, name, batch_delay=BATCH_DELAY):
+        """
+        初始化房间
+
+        Args:
+            name: 房间名称
+            batch_delay: 广播合并的延迟（秒）
+        """
+        self.name = name
+        self.batch_delay = batch_delay
+        # {StreamWriter: 成员名称}
+        self.members = {}
+        # 成员名称集合，加入时检查重名
+        self._names = set()
+        self.timer = None
+        self._watcher = None
+        # 放弃本次会话的成员
+        self._gave_up = None
+        self._pending = []
+        self._flush_handle = None
+
+    def snapshot(self):
+        """房间当前状态"""
+        timer = self.timer
+        return {
+            "type": "welcome",
+            "room": self.name,
+            "state": timer.state.name.lower() if timer else TimerState.IDLE.name.lower(),
+            "remaining": timer.remaining if timer else None,
+            "duration": timer.duration if timer else None,
+            "members": sorted(self.members.values()),
+        }
+
+    def join(self, writer, name):
+        """
+        加入成员
+
+        Returns:
+            bool: 名称已被占用时返回False
+        """
+        if name in self._names:
+            return False
+        self.members[writer] = name
+        self._names.add(name)
+        self.post({"type": "joined", "name": name})
+        return True
+
+    def leave(self, writer):
+        """移除成员；房间空了时停止计时器"""
+        name = self.members.pop(writer, None)
+        if name is None:
+            return
+        self._names.discard(name)
+        if not self.members:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self._pending.clear()
+            if self.timer is not None:
+                self.timer.stop()
+            return
+        self.post({"type": "left", "name": name})
+
+    def start(self, name, minutes):
+        """开始一次房间会话（上一次会话已结束时）"""
+        if self.timer is not None and self.timer.state in (TimerState.RUNNING, TimerState.PAUSED):
+            raise ValueError("a session is already in progress")
+        # 拒绝 NaN、inf 和过大的时长（1e309 解析为 inf，int(inf) 会抛出 OverflowError）
+        if not (math.isfinite(minutes) and 0 < minutes <= MAX_MINUTES):
+            raise ValueError(f"minutes must be between 0 and {MAX_MINUTES}")
+        self.timer = AsyncFocusTimer(int(minutes * 60))
+        self._gave_up = None
+        self.timer.start()
+        self._watcher = asyncio.get_running_loop().create_task(self._watch(self.timer))
+        self._post_state(name)
+
+    def pause(self, name):
+        """暂停房间会话"""
+        self._require_session().pause()
+        self._post_state(name)
+
+    def resume(self, name):
+        """继续房间会话"""
+        self._require_session().resume()
+        self._post_state(name)
+
+    def give_up(self, name):
+        """放弃：整个房间的会话失败"""
+        timer = self._require_session()
+        self._gave_up = name
+        timer.fail()
+
+    def post(self, event):
+        """
+        加入待广播的事件，在 batch_delay 后合并发送
+
+        Args:
+            event: 事件字典；tick 事件只保留最新的一条
+        """
+        pending = self._pending
+        if event["type"] == "tick" and pending and pending[-1]["type"] == "tick":
+            pending[-1] = event
+        else:
+            pending.append(event)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_delay, self.flush)
+
+    def flush(self):
+        """将待广播的事件编码一次后发给所有成员"""
+        self._flush_handle = None
+        if not self._pending:
+            return
+        payload = _encode({"type": "batch", "room": self.name, "events": self._pending})
+        self._pending = []
+        for writer in list(self.members):
+            transport = writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                # 跟不上广播的客户端直接断开，避免占用无限内存
+                transport.abort()
+                continue
+            writer.write(payload)
+
+    async def _watch(self, timer):
+        """转发计时器的 tick，会话结束时广播每个成员的结果"""
+        async for remaining in timer.ticks():
+            self.post({"type": "tick", "remaining": remaining})
+        state = await timer
+        if state == TimerState.IDLE:
+            return
+
+        if state == TimerState.COMPLETED:
+            statuses = {name: SessionStatus.COMPLETED.value for name in self.members.values()}
+        else:
+            statuses = {
+                name: (SessionStatus.FAILED if name == self._gave_up else SessionStatus.INTERRUPTED).value
+                for name in self.members.values()
+            }
+        self.post({
+            "type": "ended",
+            "state": state.name.lower(),
+            "by": self._gave_up,
+            "planned_duration": timer.duration,
+            "actual_duration": timer.duration - timer.remaining,
+            "statuses": statuses,
+        })
+
+    def _require_session(self):
+        """获取进行中的计时器"""
+        timer = self.timer
+        if timer is None or timer.state not in (TimerState.RUNNING, TimerState.PAUSED):
+            raise ValueError("no session in progress")
+        return timer
+
+    def _post_state(self, name):
+        """广播计时器状态变化"""
+        timer = self.timer
+        self.post({
+            "type": "state",
+            "state": timer.state.name.lower(),
+            "remaining": timer.remaining,
+            "duration": timer.duration,
+            "by": name,
+        })
+
+
+class FocusRoomServer:
+    """在一个事件循环中托管所有房间的TCP服务"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, batch_delay=BATCH_DELAY):
+        """
+        初始化服务
+
+        Args:
+            host: 监听地址，默认只监听本机
+            port: 端口号，0 表示自动分配
+            batch_delay: 广播合并的延迟（秒）
+        """
+        self.host = host
+        self.port = port
+        self.batch_delay = batch_delay
+        self.rooms = {}
+        self.server = None
+
+    async def start(self):
+        """开始监听，返回实际端口号"""
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port, limit=MAX_LINE)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        """运行服务直到被取消"""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle_client(self, reader, writer):
+        """处理一个客户端连接"""
+        room = None
+        try:
+            message = await _read_message(reader)
+            if message is None or message.get("op") != "join" or not message.get("room") or not message.get("name"):
+                writer.write(_encode({"type": "error", "message": "the first message must be a join"}))
+                return
+
+            room = self.rooms.get(message["room"])
+            if room is None:
+                room = self.rooms[message["room"]] = Room(message["room"], self.batch_delay)
+            if not room.join(writer, str(message["name"])):
+                writer.write(_encode({"type": "error", "message": "name already taken in this room"}))
+                room = None
+                return
+            writer.write(_encode(room.snapshot()))
+
+            name = room.members[writer]
+            while True:
+                message = await _read_message(reader)
+                if message is None or message.get("op") == "leave":
+                    return
+                try:
+                    self._dispatch(room, name, message)
+                except (ValueError, TypeError, OverflowError) as e:
+                    writer.write(_encode({"type": "error", "message": str(e)}))
+        except (ConnectionError, ValueError):
+            # 连接断开，或单条消息超过长度上限
+            pass
+        finally:
+            if room is not None:
+                room.leave(writer)
+                if not room.members and self.rooms.get(room.name) is room:
+                    del self.rooms[room.name]
+            writer.close()
+
+    @staticmethod
+    def _dispatch(room, name, message):
+        """执行成员的命令"""
+        op = message.get("op")
+        if op == "start":
+            room.start(name, float(message.get("minutes", 25)))
+        elif op == "pause":
+            room.pause(name)
+        elif op == "resume":
+            room.resume(name)
+        elif op == "give_up":
+            room.give_up(name)
+        else:
+            raise ValueError(f"unknown op: {op}")
+
+
+class FocusRoomClient:
+    """房间客户端，供本地测试和负载测试使用"""
+
+    def __init__(self, reader, writer, welcome):
+        self.reader = reader
+        self.writer = writer
+        self.welcome = welcome
+
+    @classmethod
+    async def connect(cls, room, name, host="127.0.0.1", port=DEFAULT_PORT):
+        """
+        连接服务并加入房间
+
+        Returns:
+            FocusRoomClient: 已加入房间的客户端
+
+        Raises:
+            ConnectionError: 服务拒绝加入时
+        """
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        writer.write(_encode({"op": "join", "room": room, "name": name}))
+        welcome = await _read_message(reader)
+        if welcome is None or welcome.get("type") != "welcome":
+            writer.close()
+            raise ConnectionError(welcome.get("message") if welcome else "connection closed")
+        return cls(reader, writer, welcome)
+
+    def send(self, op, **fields):
+        """发送命令"""
+        self.writer.write(_encode(dict(fields, op=op)))
+
+    async def events(self):
+        """
+        异步迭代房间事件（批量消息会被拆开）
+
+        Yields:
+            dict: 事件
+        """
+        while True:
+            message = await _read_message(self.reader)
+            if message is None:
+                return
+            if message.get("type") == "batch":
+                for event in message["events"]:
+                    yield event
+            else:
+                yield message
+
+    async def close(self):
+        """离开房间并关闭连接"""
+        if not self.writer.is_closing():
+            self.send("leave")
+            self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def _read_message(reader):
+    """读取一条消息，连接关闭时返回None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return {}
+    return message if isinstance(message, dict) else {}
+
+
+def _encode(message):
+    """编码为一行JSON"""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def main(argv=None):
+    """独立运行入口"""
+    parser = argparse.ArgumentParser(prog="python -m app.service.focus_room",
+                                     description="Host shared PyFocus focus rooms on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-delay", type=float, default=BATCH_DELAY,
+                        help="seconds to coalesce room updates before broadcasting")
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = FocusRoomServer(args.host, args.port, args.batch_delay)
+        port = await server.start()
+        print(f"Serving PyFocus focus rooms on {args.host}:{port}", file=sys.stderr, flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+本地HTTP统计接口
+
+基于 http.server 的只读服务，仅监听本机地址，提供:
+    GET /stats?days=30                         统计数据
+    GET /sessions?page=1&per_page=50&status=   分页的会话列表（按开始时间倒序）
+    GET /timer                                 当前计时器状态
+
+统计和会话列表的响应按历史记录代数缓存并附带 ETag，
+轮询的客户端携带 If-None-Match 时直接返回 304。
+
+可在界面进程中以后台线程运行，也可独立运行:
+    python -m app.service.http_api --port 8765
+"""
+
+import sys
+import json
+import zlib
+import argparse
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from app.utils import history
+from app.utils.history import HistoryManager
+
+# 默认端口
+DEFAULT_PORT = 8765
+
+# 每页会话数上限
+MAX_PER_PAGE = 500
+
+# 会话列表响应缓存的最大条目数
+MAX_CACHED_RESPONSES = 64
+
+
+class StatsAPI:
+    """统计接口的请求处理逻辑与响应缓存，与具体的HTTP服务器无关"""
+
+    def __init__(self, timer_provider=None):
+        """
+        初始化接口
+
+        Args:
+            timer_provider: 返回当前 FocusTimer 的可调用对象，独立运行时为None
+        """
+        self.timer_provider = timer_provider
+        self._lock = threading.Lock()
+        # 会话列表响应缓存 {(页码, 每页数, 状态): (代数, ETag, 响应体)}，按最近使用排列
+        self._responses = OrderedDict()
+
+    def handle(self, target, if_none_match=None):
+        """
+        处理一次GET请求
+
+        Args:
+            target: 请求路径（含查询字符串）
+            if_none_match: 请求头 If-None-Match 的值
+
+        Returns:
+            tuple: (状态码, 响应头字典, 响应体字节串)
+        """
+        parts = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        try:
+            if parts.path == "/stats":
+                etag, body = self._stats(query)
+            elif parts.path == "/sessions":
+                etag, body = self._sessions(query)
+            elif parts.path == "/timer":
+                etag, body = self._timer()
+            else:
+                return HTTPStatus.NOT_FOUND, {}, _json({"error": "not found"})
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {}, _json({"error": str(e)})
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return HTTPStatus.NOT_MODIFIED, headers, b""
+        return HTTPStatus.OK, headers, body
+
+    def _stats(self, query):
+        """统计数据（结果由 HistoryManager 的统计缓存提供）"""
+        days = int(query.get("days", 30))
+        if days < 0:
+            raise ValueError("days must be >= 0")
+        stats = HistoryManager.get_statistics(days)
+        body = _json(stats)
+        # 统计窗口随时间滑动，ETag 同时包含代数与内容校验和
+        return f'"s{HistoryManager.get_generation()}-{zlib.crc32(body):08x}"', body
+
+    def _sessions(self, query):
+        """分页的会话列表（响应按解析后的参数缓存，参数顺序和多余参数不影响命中）"""
+        page = int(query.get("page", 1))
+        per_page = int(query.get("per_page", 50))
+        status = query.get("status") or None
+        if page < 1 or not 1 <= per_page <= MAX_PER_PAGE:
+            raise ValueError(f"page must be >= 1 and per_page between 1 and {MAX_PER_PAGE}")
+        key = (page, per_page, status)
+
+        with HistoryManager.lock:
+            generation = HistoryManager.get_generation()
+            with self._lock:
+                cached = self._responses.get(key)
+                if cached is not None and cached[0] == generation:
+                    self._responses.move_to_end(key)
+                    return cached[1], cached[2]
+
+            body = _json({
+                "page": page,
+                "per_page": per_page,
+                "total": HistoryManager.count(status=status),
+                "sessions": list(HistoryManager.query(status=status, limit=per_page, offset=(page - 1) * per_page)),
+            })
+
+        etag = f'"l{generation}-{zlib.crc32(body):08x}"'
+        with self._lock:
+            # 代数变化后旧响应不会再命中，直接清空
+            if any(entry[0] != generation for entry in self._responses.values()):
+                self._responses.clear()
+            self._responses[key] = (generation, etag, body)
+            self._responses.move_to_end(key)
+            while len(self._responses) > MAX_CACHED_RESPONSES:
+                self._responses.popitem(last=False)
+        return etag, body
+
+    def _timer(self):
+        """当前计时器状态"""
+        timer = self.timer_provider() if self.timer_provider else None
+        if timer is None:
+            state = {"state": None, "remaining": None, "duration": None}
+        else:
+            state = {"state": timer.state.name.lower(), "remaining": timer.remaining, "duration": timer.duration}
+        return f'"t{state["state"]}-{state["remaining"]}-{state["duration"]}"', _json(state)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """将GET请求转交给 StatsAPI"""
+
+    server_version = "PyFocus"
+
+    def do_GET(self):
+        status, headers, body = self.server.api.handle(self.path, self.headers.get("If-None-Match"))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """不输出访问日志"""
+
+
+class StatsServer:
+    """本地HTTP统计服务"""
+
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1", timer_provider=None):
+        """
+        初始化服务并绑定端口
+
+        Args:
+            port: 端口号，0 表示自动分配
+            host: 监听地址，默认只监听本机
+            timer_provider: 返回当前 FocusTimer 的可调用对象
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = StatsAPI(timer_provider)
+        self.thread = None
+
+    @property
+    def url(self):
+        """服务地址"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """在后台守护线程中运行服务（可与 Tk 主循环并存）"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+            self.thread.start()
+        return self
+
+    def serve_forever(self):
+        """在当前线程中运行服务，直到被中断"""
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread = None
+
+
+def _json(data):
+    """序列化为JSON字节串"""
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def main(argv=None):
+    """独立运行入口"""
+    parser = argparse.ArgumentParser(prog="python -m app.service.http_api",
+                                     description="Serve PyFocus statistics on localhost.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--history-file", help="history file to serve instead of the default one")
+    args = parser.parse_args(argv)
+
+    if args.history_file:
+        history.HISTORY_FILE = args.history_file
+
+    server = StatsServer(args.port)
+    print(f"Serving PyFocus statistics on {server.url}", file=sys.stderr)
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
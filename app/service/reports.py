@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+专注报告生成
+
+为每个用户的历史文件生成一份报告：概要图片（report.png）和静态页面（report.html），
+输出到 <输出目录>/<用户名>/ 下。每个用户的历史文件单独读取为会话表，
+不切换 HistoryManager 当前的历史文件，各用户的报告在进程池中并行生成。
+
+输出目录中的 reports.json 记录每个用户上次生成报告时历史文件的签名、
+报告日期和统计天数；这些都没有变化且报告文件仍然存在的用户直接跳过，
+每周重新运行时只有历史记录有变化的用户需要重新生成。历史文件不存在的用户
+不生成报告。
+
+用法:
+    python -m app.service.reports --out reports users/*.json
+    python -m app.service.reports --out reports --users-dir users --days 7
+"""
+
+import os
+import sys
+import json
+import html
+import time
+import argparse
+import datetime
+import concurrent.futures
+
+from app.utils import history
+from app.utils.history import HistoryManager, format_duration
+from app.utils.analytics import compute_analytics
+from app.utils.session_table import SessionTable
+from app.ui.charts import render_daily_focus, render_status_breakdown, CHART_WIDTH, chart_font
+
+# 报告格式版本，修改报告内容后递增，使所有用户的缓存失效
+REPORT_VERSION = 1
+
+# 默认统计天数（周报）
+DEFAULT_DAYS = 7
+
+# 增量缓存清单文件名
+MANIFEST_FILE = "reports.json"
+
+# 概要图片顶部标题区域的高度
+_HEADER_HEIGHT = 56
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Focus report: {user}</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 2em; color: #333; }}
+table {{ border-collapse: collapse; margin-bottom: 1.5em; }}
+td {{ padding: 4px 16px 4px 0; }}
+td.value {{ font-weight: bold; }}
+</style>
+</head>
+<body>
+<h1>Focus report: {user}</h1>
+<p>{period}</p>
+<table>
+<tr><td>Total sessions</td><td class="value">{total_sessions}</td></tr>
+<tr><td>Completed</td><td class="value">{completed_sessions}</td></tr>
+<tr><td>Failed</td><td class="value">{failed_sessions}</td></tr>
+<tr><td>Interrupted</td><td class="value">{interrupted_sessions}</td></tr>
+<tr><td>Total focus time</td><td class="value">{total_focus_time}</td></tr>
+<tr><td>Completion rate</td><td class="value">{completion_rate}%</td></tr>
+<tr><td>Current streak</td><td class="value">{current_streak} days</td></tr>
+</table>
+<img src="report.png" alt="Focus summary for {user}" width="{width}">
+</body>
+</html>
+"""
+
+
+def find_profiles(paths=(), users_dir=None):
+    """
+    收集要生成报告的用户
+
+    Args:
+        paths: 历史文件路径，用户名为文件名（不含扩展名）
+        users_dir: 包含 <用户名>.json 历史文件的目录
+
+    Returns:
+        dict: {用户名: 历史文件路径}
+    """
+    profiles = {}
+    if users_dir:
+        with os.scandir(users_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    profiles[entry.name[:-5]] = entry.path
+    for path in paths:
+        profiles[os.path.splitext(os.path.basename(path))[0]] = path
+    return profiles
+
+
+def generate_reports(profiles, out_dir, days=DEFAULT_DAYS, report_date=None, workers=None, executor=None):
+    """
+    为多个用户生成报告，跳过历史记录没有变化的用户
+
+    Args:
+        profiles: {用户名: 历史文件路径}
+        out_dir: 输出目录
+        days: 统计天数
+        report_date: 报告日期（datetime.date），默认为今天；统计截至该日结束
+        workers: 工作进程数，默认为CPU核数
+        executor: 可复用的 concurrent.futures.Executor，默认临时创建进程池
+
+    Returns:
+        dict: 包含 rendered、skipped、missing（历史文件不存在）、failed 的计数
+    """
+    if report_date is None:
+        report_date = datetime.date.today()
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    manifest = _read_manifest(manifest_path)
+
+    # 在主进程中只比较文件签名，决定哪些用户需要重新生成
+    jobs = []
+    skipped = missing = 0
+    stale = False
+    for user, path in profiles.items():
+        key = _cache_key(path, days, report_date)
+        if key is None:
+            # 历史文件不存在时没有可报告的内容，不生成报告
+            missing += 1
+            stale = manifest.pop(user, None) is not None or stale
+            continue
+        user_dir = os.path.join(out_dir, user)
+        if manifest.get(user) == key and _report_exists(user_dir):
+            skipped += 1
+            continue
+        jobs.append((user, path, user_dir, days, report_date.toordinal(), key))
+
+    rendered = failed = 0
+    if jobs:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        # 每个任务很小，批量分发以减少进程间通信
+        chunksize = max(1, len(jobs) // (workers * 8))
+        if executor is None and workers <= 1:
+            results = map(_build_report_job, jobs)
+        elif executor is None:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(_build_report_job, jobs, chunksize=chunksize)
+        else:
+            results = executor.map(_build_report_job, jobs, chunksize=chunksize)
+
+        try:
+            for user, key, error in results:
+                if error is None:
+                    manifest[user] = key
+                    rendered += 1
+                else:
+                    manifest.pop(user, None)
+                    failed += 1
+                    print(f"Error generating report for {user}: {error}", file=sys.stderr)
+        finally:
+            if executor is None and workers > 1:
+                pool.shutdown()
+    if jobs or stale:
+        _write_manifest(manifest_path, manifest)
+
+    return {"rendered": rendered, "skipped": skipped, "missing": missing, "failed": failed}
+
+
+def build_report(user, history_path, user_dir, days=DEFAULT_DAYS, report_date=None):
+    """
+    为一个用户生成报告（在工作进程中调用）
+
+    Args:
+        user: 用户名
+        history_path: 历史文件路径
+        user_dir: 报告输出目录
+        days: 统计天数
+        report_date: 报告日期（datetime.date），默认为今天
+    """
+    if report_date is None:
+        report_date = datetime.date.today()
+    # 统计截至报告日期结束
+    now = time.mktime((report_date + datetime.timedelta(days=1)).timetuple()) - 1
+
+    # 直接读取该用户的历史文件，不改变 HistoryManager 的全局状态，可在多个线程中同时调用
+    table = SessionTable.from_dicts(HistoryManager._read_history_file(history_path))
+    stats = HistoryManager.get_statistics(days, now=now, table=table)
+    insights = compute_analytics(days, table=table, now=now)
+
+    first_day = report_date - datetime.timedelta(days=days - 1)
+    period = f"{first_day.isoformat()} to {report_date.isoformat()} ({days} days)"
+
+    os.makedirs(user_dir, exist_ok=True)
+    image = render_summary(user, period, stats, insights)
+    # 报告图片以纯色为主，低压缩级别的文件大小相差不大，编码快一倍
+    image.save(os.path.join(user_dir, "report.png"), compress_level=1)
+
+    page = _HTML_TEMPLATE.format(
+        user=html.escape(user),
+        period=html.escape(period),
+        total_sessions=stats["total_sessions"],
+        completed_sessions=stats["completed_sessions"],
+        failed_sessions=stats["failed_sessions"],
+        interrupted_sessions=stats["interrupted_sessions"],
+        total_focus_time=html.escape(format_duration(stats["total_focus_time"])),
+        completion_rate=round(stats["completion_rate"], 1),
+        current_streak=insights["current_streak"],
+        width=image.width,
+    )
+    with open(os.path.join(user_dir, "report.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+
+
+def render_summary(user, period, stats, insights):
+    """
+    绘制报告的概要图片：标题、每日专注柱状图和状态分布
+
+    Returns:
+        PIL.Image.Image: 图像
+    """
+    from PIL import Image, ImageDraw
+
+    daily = render_daily_focus(insights["first_day"], insights["daily_focus"])
+    status = render_status_breakdown(
+        (stats["completed_sessions"], stats["failed_sessions"], stats["interrupted_sessions"])
+    )
+    image = Image.new("RGB", (CHART_WIDTH, _HEADER_HEIGHT + daily.height + status.height), "#ffffff")
+    draw = ImageDraw.Draw(image)
+    font = chart_font()
+    draw.text((10, 8), f"Focus report: {user}", fill="#333333", font=font)
+    draw.text((10, 26), f"{period}    total focus {format_duration(stats['total_focus_time'])}    "
+                        f"streak {insights['current_streak']} days", fill="#333333", font=font)
+    image.paste(daily, (0, _HEADER_HEIGHT))
+    image.paste(status, (0, _HEADER_HEIGHT + daily.height))
+    return image
+
+
+def _build_report_job(job):
+    """
+    工作进程入口：生成一个用户的报告，错误以字符串返回，不影响其他用户
+
+    Returns:
+        tuple: (用户名, 缓存键, 错误信息或None)
+    """
+    user, path, user_dir, days, report_day, key = job
+    try:
+        build_report(user, path, user_dir, days, datetime.date.fromordinal(report_day))
+    except Exception as e:
+        return user, key, str(e) or type(e).__name__
+    return user, key, None
+
+
+def _cache_key(path, days, report_date):
+    """
+    用户报告的缓存键：历史文件签名、统计天数、报告日期和报告格式版本
+
+    Returns:
+        list: 可直接保存为JSON的缓存键，历史文件不存在时返回None
+    """
+    signature = history._file_signature(path)
+    if signature is None:
+        return None
+    _, mtime_ns, size = signature
+    return [mtime_ns, size, days, report_date.isoformat(), REPORT_VERSION]
+
+
+def _report_exists(user_dir):
+    """报告文件是否都存在"""
+    return (os.path.exists(os.path.join(user_dir, "report.png"))
+            and os.path.exists(os.path.join(user_dir, "report.html")))
+
+
+def _read_manifest(path):
+    """读取增量缓存清单，不存在或损坏时返回空字典"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(path, manifest):
+    """原子地写入增量缓存清单（先写临时文件再替换）"""
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Error saving report manifest: {e}", file=sys.stderr)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(prog="python -m app.service.reports",
+                                     description="Render focus reports (PNG + HTML) for many users.")
+    parser.add_argument("paths", nargs="*", help="history files, one per user (user name = file name)")
+    parser.add_argument("--users-dir", help="directory of <user>.json history files")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help=f"days per report (default: {DEFAULT_DAYS})")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, help="report date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    if args.days < 1:
+        parser.error("--days must be >= 1")
+
+    profiles = find_profiles(args.paths, args.users_dir)
+    if not profiles:
+        parser.error("no history files given")
+
+    started = time.perf_counter()
+    counts = generate_reports(profiles, args.out, args.days, args.date, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"Rendered {counts['rendered']}, skipped {counts['skipped']} unchanged and "
+          f"{counts['missing']} without history, failed {counts['failed']} in {elapsed:.1f}s", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
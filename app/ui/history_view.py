@@ -8,15 +8,48 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import sys
 import os
+import time
+import bisect
+from collections import deque
 from datetime import datetime, timedelta
 
 # 确保能够正确导入项目中的其他模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.utils.history import HistoryManager, SessionStatus, format_timestamp, format_duration
+from app.utils.analytics import compute_analytics, WEEKDAY_NAMES
+from app.utils.formatting import SessionFormatter
+from app.ui.charts import ChartRenderer
+
+# 搜索框停止输入后触发搜索的延迟（毫秒）
+SEARCH_DELAY = 150
+
+# 搜索结果最多显示的会话数
+SEARCH_LIMIT = 500
+
+# 每页显示的会话数
+PAGE_SIZE = 200
+
+# 筛选选项对应的状态
+FILTER_STATUSES = {
+    "all": None,
+    "completed": SessionStatus.COMPLETED.value,
+    "failed": SessionStatus.FAILED.value,
+}
+
+# 统计窗口随时间滑动，增量更新的统计结果超过此时长（秒）后重新计算
+STATS_MAX_AGE = 60 * 60
+
+# 历史记录变化后延迟重新计算扩展指标（毫秒），连续变化只计算一次
+INSIGHTS_DELAY = 500
 
 class HistoryView(tk.Toplevel):
-    """历史记录查看窗口"""
+    """
+    历史记录查看窗口
+    
+    窗口常驻，关闭时只隐藏。窗口订阅历史记录变化：新增的会话插入为单行，
+    删除的会话就地移除，统计计数按变化的会话增减，不重新读取整个历史记录。
+    """
     
     def __init__(self, parent):
         """
@@ -28,7 +61,26 @@ class HistoryView(tk.Toplevel):
         super().__init__(parent)
         self.title("Focus History")
         self.transient(parent)
-        self.detached_list = []
+        # 当前页（从0开始）及符合筛选条件的会话总数
+        self.page = 0
+        self.total = 0
+        # 表格行对应的会话 {行ID: 会话字典}
+        self.row_sessions = {}
+        # 行显示字段的格式化缓存
+        self.formatter = SessionFormatter()
+        
+        # 表格和统计数据对应的历史记录代数
+        self.list_generation = None
+        self.stats_generation = None
+        # 当前统计结果、统计窗口起点及计算时间
+        self.stats = None
+        self.stats_cutoff = None
+        self.stats_loaded_at = 0
+        self.insights_job = None
+        
+        # 其他线程发来的历史记录变化事件，在界面线程中批量处理
+        self.pending_events = deque()
+        self.events_scheduled = False
         
         # 窗口大小和位置
         window_width = 800
@@ -51,6 +103,25 @@ class HistoryView(tk.Toplevel):
         # 加载统计数据
         self._load_statistics()
         
+        # 订阅历史记录变化，窗口销毁时取消
+        self.unsubscribe = HistoryManager.subscribe(self._on_history_changed)
+        self.bind("<Destroy>", self._on_destroy)
+        
+        # 关闭时只隐藏，再次打开时不需要重新加载
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        
+    def show(self):
+        """重新显示隐藏的窗口"""
+        self.deiconify()
+        self.lift()
+        self.focus_set()
+        
+    def _on_destroy(self, event):
+        """窗口销毁时取消订阅并停止图表绘制线程"""
+        if event.widget is self:
+            self.unsubscribe()
+            self.charts.close()
+        
     def _create_widgets(self):
         """创建界面组件"""
         # 创建界面框架
@@ -69,12 +140,24 @@ class HistoryView(tk.Toplevel):
         self.stats_tab = ttk.Frame(self.notebook, padding=10)
         self.notebook.add(self.stats_tab, text="Statistics")
         
+        # 图表选项卡
+        self.charts_tab = ttk.Frame(self.notebook, padding=10)
+        self.notebook.add(self.charts_tab, text="Charts")
+        
         # 设置历史记录选项卡内容
         self._setup_history_tab()
         
         # 设置统计信息选项卡内容
         self._setup_stats_tab()
         
+        # 设置图表选项卡内容
+        self._setup_charts_tab()
+        
+        # 切换到统计或图表选项卡时补上延迟的扩展指标和图表
+        self.insights_dirty = False
+        self.charts_dirty = False
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        
     def _setup_history_tab(self):
         """设置历史记录选项卡内容"""
         # 创建工具栏
@@ -103,6 +186,36 @@ class HistoryView(tk.Toplevel):
         clear_btn = ttk.Button(toolbar, text="Clear History", command=self._clear_history)
         clear_btn.pack(side=tk.RIGHT, padx=5)
         
+        # 备注搜索栏
+        search_bar = ttk.Frame(self.history_tab)
+        search_bar.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(search_bar, text="Search notes:").pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_bar, textvariable=self.search_var, width=40)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        # 输入停顿后再搜索，回车立即搜索
+        self.search_job = None
+        search_entry.bind("<KeyRelease>", self._schedule_search)
+        search_entry.bind("<Return>", lambda event: self._run_search())
+        
+        self.search_result_var = tk.StringVar()
+        ttk.Label(search_bar, textvariable=self.search_result_var).pack(side=tk.LEFT, padx=5)
+        
+        # 分页栏（先于表格布局在底部）
+        pager = ttk.Frame(self.history_tab)
+        pager.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        
+        self.next_btn = ttk.Button(pager, text="Next ›", command=lambda: self._change_page(1))
+        self.next_btn.pack(side=tk.RIGHT, padx=5)
+        
+        self.page_var = tk.StringVar()
+        ttk.Label(pager, textvariable=self.page_var).pack(side=tk.RIGHT, padx=5)
+        
+        self.prev_btn = ttk.Button(pager, text="‹ Prev", command=lambda: self._change_page(-1))
+        self.prev_btn.pack(side=tk.RIGHT, padx=5)
+        
         # 创建表格
         columns = ("Date", "Start Time", "Duration", "Planned Duration", "Status")
         self.tree = ttk.Treeview(self.history_tab, columns=columns, show="headings")
@@ -177,7 +290,7 @@ class HistoryView(tk.Toplevel):
         
         # 统计信息展示区域
         self.stats_frame = ttk.LabelFrame(self.stats_tab, text="Statistics", padding=10)
-        self.stats_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        self.stats_frame.pack(fill=tk.X, pady=10)
         
         # 总会话数
         self.total_sessions_var = tk.StringVar(value="All Sessions: 0")
@@ -203,80 +316,298 @@ class HistoryView(tk.Toplevel):
         self.completion_rate_var = tk.StringVar(value="Completion rate: 0%")
         ttk.Label(self.stats_frame, textvariable=self.completion_rate_var, font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
         
+        # 扩展指标展示区域
+        self.insights_frame = ttk.LabelFrame(self.stats_tab, text="Insights", padding=10)
+        self.insights_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        # 连续完成天数
+        self.streak_var = tk.StringVar(value="Streak: 0 days (best: 0 days)")
+        ttk.Label(self.insights_frame, textvariable=self.streak_var, font=("Arial", 11)).pack(anchor=tk.W, pady=2)
+        
+        # 滚动7日专注时间
+        self.rolling_var = tk.StringVar(value="Focus in the last 7 days: 0seconds")
+        ttk.Label(self.insights_frame, textvariable=self.rolling_var, font=("Arial", 11)).pack(anchor=tk.W, pady=2)
+        
+        # 最佳时段
+        self.best_time_var = tk.StringVar(value="Most focused: -")
+        ttk.Label(self.insights_frame, textvariable=self.best_time_var, font=("Arial", 11)).pack(anchor=tk.W, pady=2)
+        
+        # 按计划时长的完成率
+        self.by_planned_var = tk.StringVar(value="Completion by planned duration: -")
+        ttk.Label(self.insights_frame, textvariable=self.by_planned_var, font=("Arial", 11)).pack(anchor=tk.W, pady=2)
+        
+        # 星期 x 小时 热力图
+        self.heatmap_canvas = tk.Canvas(self.insights_frame, width=36 + 24 * 22, height=16 + 7 * 14, highlightthickness=0)
+        self.heatmap_canvas.pack(anchor=tk.W, pady=(5, 0))
+        
     def _load_history(self):
-        """加载历史记录数据"""
+        """加载当前页的历史记录"""
         # 清空表格
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # 获取历史记录
-        history = HistoryManager.get_history()
+        self.tree.delete(*self.tree.get_children())
+        self.row_sessions.clear()
+        
+        # 筛选条件下推到 HistoryManager，只取当前页
+        status = self._filter_status()
+        offset = self.page * PAGE_SIZE
+        query = self.search_var.get().strip()
+        with HistoryManager.lock:
+            self.list_generation = HistoryManager.get_generation()
+            if query:
+                # 有搜索条件时只取备注匹配的会话
+                matches, history = HistoryManager.search_notes(query, limit=SEARCH_LIMIT)
+                if len(history) < matches:
+                    self.search_result_var.set(f"{matches} matches (showing latest {len(history)})")
+                else:
+                    self.search_result_var.set(f"{matches} matches")
+                if status is not None:
+                    history = [session for session in history if session.get("status") == status]
+                history.sort(key=lambda x: x.get("start_time", 0), reverse=True)
+                self.total = len(history)
+                page_sessions = history[offset:offset + PAGE_SIZE]
+            else:
+                self.search_result_var.set("")
+                self.total = HistoryManager.count(status=status)
+                page_sessions = list(HistoryManager.query(status=status, limit=PAGE_SIZE, offset=offset))
         
-        # 按时间倒序排序
-        history.sort(key=lambda x: x.get("start_time", 0), reverse=True)
+        # 为不同状态设置不同颜色
+        self.tree.tag_configure(SessionStatus.COMPLETED.value, foreground="green")
+        self.tree.tag_configure(SessionStatus.FAILED.value, foreground="red")
+        self.tree.tag_configure(SessionStatus.INTERRUPTED.value, foreground="orange")
         
         # 将记录添加到表格
-        for session in history:
-            # 获取数据
-            start_time = session.get("start_time", 0)
-            date_str = format_timestamp(start_time).split()[0]
-            time_str = format_timestamp(start_time).split()[1]
-            actual_duration = session.get("actual_duration", 0)
-            planned_duration = session.get("planned_duration", 0)
-            status = session.get("status", "")
-            
-            # 格式化持续时间
-            actual_duration_str = format_duration(actual_duration)
-            planned_duration_str = format_duration(planned_duration)
-            
-            # 格式化状态
-            if status == SessionStatus.COMPLETED.value:
-                status_str = "Completed ✓"
-            elif status == SessionStatus.FAILED.value:
-                status_str = "Failed ✗"
-            elif status == SessionStatus.INTERRUPTED.value:
-                status_str = "Interrupted !"
-            else:
-                status_str = status
+        for session in page_sessions:
+            self._insert_row(session, tk.END)
+        
+        self._update_pager()
+    
+    def _insert_row(self, session, index):
+        """
+        在表格中插入一个会话
+        
+        Args:
+            session: 会话字典
+            index: 插入位置
+        """
+        # 显示字段按会话缓存，翻页、筛选和刷新时不重复格式化
+        values = self.formatter.row(session)
+        
+        # 将数据添加到表格
+        item = self.tree.insert("", index, values=values, tags=(session.get("status", ""),))
+        self.row_sessions[item] = session
+    
+    def _delete_row(self, item):
+        """从表格中删除一行"""
+        self.tree.delete(item)
+        del self.row_sessions[item]
+    
+    def _update_pager(self):
+        """更新分页栏"""
+        pages = max(1, -(-self.total // PAGE_SIZE))
+        if self.page >= pages:
+            # 删除记录后当前页可能已不存在
+            self.page = pages - 1
+            self._load_history()
+            return
+        self.page_var.set(f"Page {self.page + 1} of {pages} ({self.total} sessions)")
+        self.prev_btn.state(["!disabled"] if self.page > 0 else ["disabled"])
+        self.next_btn.state(["!disabled"] if self.page < pages - 1 else ["disabled"])
+    
+    def _filter_status(self):
+        """当前筛选条件对应的状态，全部时为None"""
+        return FILTER_STATUSES[self.filter_var.get()]
+    
+    def _on_history_changed(self, event):
+        """
+        历史记录变化回调（可能在计时器等其他线程中调用）
+        
+        事件先放入队列，由界面线程空闲时批量处理。
+        """
+        self.pending_events.append(event)
+        if not self.events_scheduled:
+            self.events_scheduled = True
+            try:
+                self.after_idle(self._apply_history_events)
+            except (tk.TclError, RuntimeError):
+                # 窗口已销毁或主循环已退出
+                pass
+    
+    def _apply_history_events(self):
+        """处理等待中的历史记录变化"""
+        self.events_scheduled = False
+        reload_list = reload_stats = False
+        while self.pending_events:
+            event = self.pending_events.popleft()
+            generation = event["generation"]
             
-            # 将数据添加到表格
-            self.tree.insert("", tk.END, values=(date_str, time_str, actual_duration_str, planned_duration_str, status_str), tags=(status,))
+            # 表格：代数连续时逐条更新，否则（漏掉事件、清空、外部修改）重新加载当前页
+            if generation > self.list_generation:
+                if reload_list or event["type"] == "reset" or generation != self.list_generation + 1:
+                    reload_list = True
+                else:
+                    self.list_generation = generation
+                    reload_list = not self._apply_rows(event)
             
-            # 为不同状态设置不同颜色
-            self.tree.tag_configure(SessionStatus.COMPLETED.value, foreground="green")
-            self.tree.tag_configure(SessionStatus.FAILED.value, foreground="red")
-            self.tree.tag_configure(SessionStatus.INTERRUPTED.value, foreground="orange")
+            # 统计数据同理
+            if generation > self.stats_generation:
+                if reload_stats or event["type"] == "reset" or generation != self.stats_generation + 1:
+                    reload_stats = True
+                else:
+                    self.stats_generation = generation
+                    sign = 1 if event["type"] == "added" else -1
+                    for session in event["sessions"]:
+                        self._count_session(session, sign)
+        
+        if reload_list:
+            self._load_history()
+        else:
+            self._update_pager()
+        
+        if reload_stats or time.time() - self.stats_loaded_at > STATS_MAX_AGE:
+            self._load_statistics()
+        else:
+            self._show_statistics()
+            self._schedule_insights()
+    
+    def _apply_rows(self, event):
+        """
+        将一个新增或删除事件应用到当前页
         
-        # 应用筛选
-        self._apply_filter()
+        Returns:
+            bool: 无法增量更新、需要重新加载当前页时返回False
+        """
+        if self.search_var.get().strip():
+            # 搜索结果受备注索引决定，直接重新搜索（结果数有上限）
+            return False
+        
+        status = self._filter_status()
+        for session in event["sessions"]:
+            if status is not None and session.get("status") != status:
+                continue
+            if event["type"] == "added":
+                self.total += 1
+                if not self._row_added(session, event["generation"]):
+                    return False
+            else:
+                self.total -= 1
+                if not self._row_removed(session, event["generation"]):
+                    return False
+        return True
     
-    def _apply_filter(self):
-        """应用筛选条件"""
-        # 获取筛选条件
-        filter_value = self.filter_var.get()
-        
-        # 先显示所有记录
-        for item in self.tree.get_children():
-            self.tree.item(item, tags=self.tree.item(item, "tags"))
-            self.tree.item(item, open=True)
-            
-        # 如果选择了筛选条件
-        if filter_value != "all":
-            for item in self.tree.get_children():
-                status = self.tree.item(item, "values")[-1]
-                
-                # 根据状态筛选
-                if filter_value == "completed" and "Completed" not in status:
-                    self.tree.detach(item)  # 不删除，只是暂时不显示
-                    self.detached_list.append(item)
-                elif filter_value == "failed" and "Failed" not in status:
-                    self.tree.detach(item)
-                    self.detached_list.append(item)
+    def _row_added(self, session, generation):
+        """新增的会话落在当前页时插入为单行，落在之前的页时整页后移一行"""
+        items = self.tree.get_children()
+        start_time = session.get("start_time", 0)
+        if self.page > 0 and items and start_time > self.row_sessions[items[0]]["start_time"]:
+            # 之前各页整体后移，上一页的最后一条移到本页顶部
+            if HistoryManager.get_generation() != generation:
+                return False
+            shifted = next(HistoryManager.query(status=self._filter_status(), limit=1, offset=self.page * PAGE_SIZE), None)
+            if shifted is not None:
+                self._insert_row(shifted, 0)
         else:
-            # 显示所有被隐藏的条目
-            for item in self.detached_list:
-                self.tree.reattach(item, "", 0)
-                self.detached_list.remove(item)
+            # 表格按开始时间倒序，二分查找插入位置
+            starts = [-self.row_sessions[item]["start_time"] for item in items]
+            index = bisect.bisect_left(starts, -start_time)
+            if index >= PAGE_SIZE:
+                return True
+            self._insert_row(session, index)
+        
+        items = self.tree.get_children()
+        if len(items) > PAGE_SIZE:
+            self._delete_row(items[-1])
+        return True
+    
+    def _row_removed(self, session, generation):
+        """删除的会话在当前页时就地移除，在之前的页时整页前移一行"""
+        items = self.tree.get_children()
+        removed = next((item for item in items if self.row_sessions[item].get("id") == session.get("id")), None)
+        if removed is None:
+            if not (self.page > 0 and items and session.get("start_time", 0) > self.row_sessions[items[0]]["start_time"]):
+                # 在之后的页中，当前页不变
+                return True
+            removed = items[0]
+        self._delete_row(removed)
+        
+        # 下一页的第一条移到本页底部
+        if HistoryManager.get_generation() != generation:
+            return False
+        moved = next(HistoryManager.query(
+            status=self._filter_status(), limit=1, offset=(self.page + 1) * PAGE_SIZE - 1
+        ), None)
+        if moved is not None:
+            self._insert_row(moved, tk.END)
+        return True
+    
+    def _change_page(self, step):
+        """翻页"""
+        self.page = max(0, self.page + step)
+        self._load_history()
+    
+    def _schedule_search(self, event=None):
+        """输入变化后延迟搜索，连续输入时只搜索一次"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY, self._run_search)
+    
+    def _run_search(self):
+        """按搜索框内容重新加载历史记录"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
+        self.page = 0
+        self._load_history()
+    
+    def _apply_filter(self):
+        """应用筛选条件，从第一页重新加载"""
+        self.page = 0
+        self._load_history()
+    
+    def _setup_charts_tab(self):
+        """设置图表选项卡内容"""
+        # 时间范围与统计选项卡共用
+        range_frame = ttk.Frame(self.charts_tab)
+        range_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(range_frame, text="Time Range:").pack(side=tk.LEFT, padx=(0, 5))
+        for text, value in (("Last 7 days", "7"), ("Last 30 days", "30"), ("Last 90 days", "90"), ("All", "0")):
+            ttk.Radiobutton(range_frame, text=text, variable=self.stats_range_var, value=value, command=self._load_statistics).pack(side=tk.LEFT, padx=5)
+        
+        # 图表在后台线程中绘制，完成后替换到这些标签上
+        self.charts = ChartRenderer(self)
+        self.chart_labels = {}
+        for name in ("daily", "calendar", "status"):
+            label = ttk.Label(self.charts_tab)
+            label.pack(anchor=tk.W, pady=(0, 8))
+            self.chart_labels[name] = label
+    
+    def _refresh_charts(self):
+        """按当前时间范围、历史记录代数和日期显示图表，图表选项卡不可见时等到切换过去再更新"""
+        if self.notebook.select() != str(self.charts_tab):
+            self.charts_dirty = True
+            return
+        self.charts_dirty = False
+        
+        days = int(self.stats_range_var.get())
+        # 日期也是键的一部分：过了零点后每日图表的窗口随之移动
+        key = (days, HistoryManager.get_generation(), datetime.now().date())
+        
+        def chart_data():
+            # 只在缓存未命中时读取数据（两者都按代数缓存）
+            with HistoryManager.lock:
+                stats = HistoryManager.get_statistics(days)
+                insights = compute_analytics(days)
+            return {
+                "first_day": insights["first_day"],
+                "daily_focus": list(insights["daily_focus"]),
+                "status_counts": (stats["completed_sessions"], stats["failed_sessions"], stats["interrupted_sessions"]),
+            }
+        
+        self.charts.request(key, chart_data, self._show_charts)
+    
+    def _show_charts(self, images):
+        """替换为绘制好的图表"""
+        for name, image in images.items():
+            self.chart_labels[name].configure(image=image)
     
     def _load_statistics(self):
         """加载统计信息"""
@@ -284,7 +615,43 @@ class HistoryView(tk.Toplevel):
         days = int(self.stats_range_var.get())
         
         # 获取统计数据
-        stats = HistoryManager.get_statistics(days)
+        with HistoryManager.lock:
+            self.stats_generation = HistoryManager.get_generation()
+            self.stats = HistoryManager.get_statistics(days)
+        self.stats_loaded_at = time.time()
+        self.stats_cutoff = self.stats_loaded_at - days * 24 * 60 * 60 if days else None
+        self._show_statistics()
+        
+        # 更新扩展指标和图表
+        self._load_insights(days)
+        self._refresh_charts()
+    
+    def _count_session(self, session, sign):
+        """
+        按新增（sign=1）或删除（sign=-1）的会话增减统计计数
+        
+        Args:
+            session: 会话字典
+            sign: 1 或 -1
+        """
+        if self.stats_cutoff is not None and session.get("start_time", 0) < self.stats_cutoff:
+            return
+        stats = self.stats
+        stats["total_sessions"] += sign
+        stats["total_focus_time"] += sign * session.get("actual_duration", 0)
+        status = session.get("status")
+        if status == SessionStatus.COMPLETED.value:
+            stats["completed_sessions"] += sign
+        elif status == SessionStatus.FAILED.value:
+            stats["failed_sessions"] += sign
+        elif status == SessionStatus.INTERRUPTED.value:
+            stats["interrupted_sessions"] += sign
+        total = stats["total_sessions"]
+        stats["completion_rate"] = (stats["completed_sessions"] / total * 100) if total > 0 else 0
+    
+    def _show_statistics(self):
+        """显示当前统计结果"""
+        stats = self.stats
         
         # 更新统计信息显示
         self.total_sessions_var.set(f"Total sessions: {stats['total_sessions']}")
@@ -300,6 +667,82 @@ class HistoryView(tk.Toplevel):
         completion_rate = round(stats['completion_rate'], 1)
         self.completion_rate_var.set(f"Completion rate: {completion_rate}%")
     
+    def _schedule_insights(self):
+        """历史记录变化后延迟更新扩展指标和图表；对应选项卡不可见时等到切换过去再更新"""
+        self.insights_dirty = True
+        self.charts_dirty = True
+        if self.insights_job is None and self.notebook.select() in (str(self.stats_tab), str(self.charts_tab)):
+            self.insights_job = self.after(INSIGHTS_DELAY, self._refresh_insights)
+    
+    def _refresh_insights(self):
+        """重新计算延迟的扩展指标和图表（只更新可见的选项卡）"""
+        self.insights_job = None
+        selected = self.notebook.select()
+        if self.insights_dirty and selected == str(self.stats_tab):
+            self._load_insights(int(self.stats_range_var.get()))
+        if self.charts_dirty and selected == str(self.charts_tab):
+            self._refresh_charts()
+    
+    def _on_tab_changed(self, event):
+        """切换选项卡"""
+        self._refresh_insights()
+    
+    def _load_insights(self, days):
+        """加载扩展统计指标"""
+        self.insights_dirty = False
+        insights = compute_analytics(days)
+        
+        self.streak_var.set(f"Streak: {insights['current_streak']} days (best: {insights['longest_streak']} days)")
+        
+        rolling = insights['rolling_7day'][-1] if insights['rolling_7day'] else 0
+        self.rolling_var.set(f"Focus in the last 7 days: {format_duration(rolling)}")
+        
+        hour_of_day = insights['hour_of_day']
+        weekday = insights['weekday']
+        if any(hour_of_day):
+            best_hour = hour_of_day.index(max(hour_of_day))
+            best_weekday = WEEKDAY_NAMES[weekday.index(max(weekday))]
+            self.best_time_var.set(f"Most focused: {best_hour:02d}:00-{best_hour + 1:02d}:00, {best_weekday}")
+        else:
+            self.best_time_var.set("Most focused: -")
+        
+        by_planned = insights['completion_by_planned']
+        if by_planned:
+            parts = [f"{planned // 60}min {round(rate, 1)}% ({total})" for planned, (total, completed, rate) in by_planned.items()]
+            self.by_planned_var.set("Completion by planned duration: " + ", ".join(parts))
+        else:
+            self.by_planned_var.set("Completion by planned duration: -")
+        
+        self._draw_heatmap(insights['heatmap'])
+    
+    def _draw_heatmap(self, heatmap):
+        """
+        绘制 星期 x 小时 专注热力图
+        
+        Args:
+            heatmap: 7x24 专注秒数矩阵
+        """
+        canvas = self.heatmap_canvas
+        canvas.delete("all")
+        
+        cell_width, cell_height, left, top = 22, 14, 36, 16
+        peak = max(max(row) for row in heatmap) or 1
+        
+        # 小时刻度
+        for hour in range(0, 24, 3):
+            canvas.create_text(left + hour * cell_width + cell_width // 2, top // 2, text=str(hour), font=("Arial", 8))
+        
+        for day, row in enumerate(heatmap):
+            canvas.create_text(left // 2, top + day * cell_height + cell_height // 2, text=WEEKDAY_NAMES[day], font=("Arial", 8))
+            for hour, seconds in enumerate(row):
+                # 颜色由浅到深表示专注时长
+                level = seconds / peak
+                shade = int(235 - 160 * level)
+                color = f"#{shade:02x}{int(245 - 60 * level):02x}{shade:02x}"
+                x = left + hour * cell_width
+                y = top + day * cell_height
+                canvas.create_rectangle(x, y, x + cell_width - 1, y + cell_height - 1, fill=color, outline="")
+    
     def _show_session_details(self, event):
         """显示会话详细信息"""
         # 获取选中的项
@@ -316,23 +759,8 @@ class HistoryView(tk.Toplevel):
         if not selection:
             return
         
-        # 获取选中项的值
-        selected_item = selection[0]
-        date_str = self.tree.item(selected_item, "values")[0]
-        time_str = self.tree.item(selected_item, "values")[1]
-        
-        # 查找对应的会话记录
-        history = HistoryManager.get_history()
-        selected_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
-        selected_timestamp = selected_dt.timestamp()
-        
-        # 在历史记录中查找匹配的会话
-        for session in history:
-            start_time = session.get("start_time", 0)
-            # 允许1秒的误差
-            if abs(start_time - selected_timestamp) < 1:
-                self._display_session_details(session)
-                break
+        # 表格行对应的会话记录
+        self._display_session_details(self.row_sessions[selection[0]])
     
     def _display_session_details(self, session):
         """显示会话详细信息对话框"""
@@ -343,7 +771,7 @@ class HistoryView(tk.Toplevel):
         
         # 设置窗口大小和位置
         window_width = 400
-        window_height = 300
+        window_height = 330
         screen_width = self.winfo_screenwidth()
         screen_height = self.winfo_screenheight()
         center_x = int(self.winfo_x() + (self.winfo_width() - window_width) / 2)
@@ -397,17 +825,26 @@ class HistoryView(tk.Toplevel):
         elif status == SessionStatus.INTERRUPTED.value:
             status_label.configure(foreground="orange")
         
+        # 分心次数和总时长
+        distractions = session.get("distractions", 0)
+        if distractions:
+            distractions_str = f"{distractions} ({format_duration(int(session.get('distracted_seconds', 0)))})"
+        else:
+            distractions_str = "None"
+        ttk.Label(content_frame, text="Distractions:", font=("Arial", 11)).grid(row=5, column=0, sticky=tk.W, pady=5)
+        ttk.Label(content_frame, text=distractions_str, font=("Arial", 11)).grid(row=5, column=1, sticky=tk.W, pady=5)
+        
         # 添加备注信息
-        ttk.Label(content_frame, text="Notes:", font=("Arial", 11)).grid(row=5, column=0, sticky=tk.NW, pady=5)
+        ttk.Label(content_frame, text="Notes:", font=("Arial", 11)).grid(row=6, column=0, sticky=tk.NW, pady=5)
         
         notes_text = tk.Text(content_frame, wrap=tk.WORD, height=4, width=30)
-        notes_text.grid(row=5, column=1, sticky=tk.W, pady=5)
+        notes_text.grid(row=6, column=1, sticky=tk.W, pady=5)
         notes_text.insert(tk.END, notes)
         notes_text.configure(state="disabled")  # 禁止编辑
         
         # 关闭按钮
         close_button = ttk.Button(content_frame, text="关闭", command=details_window.destroy)
-        close_button.grid(row=6, column=0, columnspan=2, pady=(20, 0))
+        close_button.grid(row=7, column=0, columnspan=2, pady=(20, 0))
         
     def _delete_selected(self):
         """删除选中的会话记录"""
@@ -420,34 +857,12 @@ class HistoryView(tk.Toplevel):
         if not messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected session(s)?"):
             return
         
-        # 获取选中项的值
-        selected_item = selection[0]
-        date_str = self.tree.item(selected_item, "values")[0]
-        time_str = self.tree.item(selected_item, "values")[1]
-        
-        # 查找对应的会话记录
-        history = HistoryManager.get_history()
-        selected_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
-        selected_timestamp = selected_dt.timestamp()
-        
-        # 在历史记录中查找匹配的会话
-        for session in history:
-            start_time = session.get("start_time", 0)
-            # 允许1秒的误差
-            if abs(start_time - selected_timestamp) < 1:
-                # 删除会话
-                HistoryManager.delete_session(session.get("id"))
-                break
-        
-        # 重新加载历史记录
-        self._load_history()
-        
-        # 重新加载统计数据
-        self._load_statistics()
+        # 一次删除全部选中的会话（只写入一次文件、只产生一个事件）；
+        # 表格和统计数据通过历史记录变化事件更新
+        HistoryManager.delete_sessions([self.row_sessions[item].get("id") for item in selection])
     
     def _clear_history(self):
         """清空历史记录"""
         if messagebox.askyesno("Confirm Clear", "Are you sure you want to clear all sessions? This action cannot be undone!"):
-            HistoryManager.clear_history()
-            self._load_history()
-            self._load_statistics()  # 也更新统计数据
\ No newline at end of file
+            # 表格和统计数据通过历史记录变化事件更新
+            HistoryManager.clear_history()
\ No newline at end of file
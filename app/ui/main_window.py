@@ -14,12 +14,12 @@ import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.core.timer import FocusTimer, TimerState
+from app.core.checkpoint import TimerCheckpoint
 from app.core.focus_monitor import FocusMonitor
 from app.ui.tree_view import TreeView
-from app.ui.settings_dialog import SettingsDialog
-from app.ui.history_view import HistoryView
-from app.utils.config import get_config
-from app.utils.history import HistoryManager, SessionStatus
+from app.utils.config import get_store
+
+# 设置对话框、历史记录窗口和历史记录模块在首次使用时才导入，以缩短启动时间
 
 class MainWindow:
     """应用程序主窗口"""
@@ -42,12 +42,15 @@ class MainWindow:
         # 创建UI组件
         self._create_widgets()
         
-        # 获取配置
-        self.config = get_config()
+        # 获取配置（内存中的配置存储，读取不访问文件）
+        self.config = get_store()
         
         # 初始化计时器
         self._initialize_timer()
         
+        # 只响应与主窗口相关的配置变化
+        self.config.subscribe(self._on_config_changed, keys=("focus_duration",))
+        
         # 初始化焦点监控
         self.focus_monitor = FocusMonitor(
             self.master,
@@ -58,8 +61,21 @@ class MainWindow:
         self.session_start_time = None
         self.focus_lost_flag = None
         
+        # 常驻的历史记录窗口，首次打开时创建
+        self.history_view = None
+        
+        # 窗口最小化或隐藏时不更新界面，重新显示时补上最新的剩余时间
+        self.visible = True
+        self.pending_remaining = None
+        self.timer_text = None
+        self.master.bind("<Map>", self._on_map, add="+")
+        self.master.bind("<Unmap>", self._on_unmap, add="+")
+        
         # 更新定时器显示
         self._update_timer_display(self.timer.remaining)
+        
+        # 上次异常退出时有进行中的会话，恢复或记为中断
+        self._recover_session()
     
     def _create_widgets(self):
         """创建界面组件"""
@@ -134,25 +150,85 @@ class MainWindow:
     def _initialize_timer(self):
         """初始化计时器"""
         duration = self.config.get("focus_duration", 25 * 60)  # 默认25分钟
+        # 检查点按用户配置分开保存，异常退出的会话只在原来的配置中恢复
+        from app.utils.profiles import checkpoint_path, current_profile
+        self.checkpoint = TimerCheckpoint(checkpoint_path(current_profile()))
         self.timer = FocusTimer(
             duration=duration,
             on_tick=self._update_timer_display,
             on_complete=self._on_timer_complete,
-            on_fail=self._on_timer_fail
+            on_fail=self._on_timer_fail,
+            checkpoint=self.checkpoint
         )
     
+    def _recover_session(self):
+        """处理上次异常退出时留下的检查点"""
+        pending = self.checkpoint.load()
+        if pending is None:
+            return
+        
+        # 恢复为暂停状态，开始时间和剩余时间与退出前一致
+        self.timer.restore(pending["duration"], pending["remaining"], pending["started_at"])
+        self.session_start_time = pending["started_at"]
+        
+        minutes, seconds = divmod(max(pending["remaining"], 0), 60)
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(pending["started_at"]))
+        if pending["remaining"] > 0 and messagebox.askyesno(
+                "Unfinished Session",
+                f"The focus session started at {started} was cut short with "
+                f"{minutes:02d}:{seconds:02d} left. Do you want to resume it?"):
+            # 程序未运行的时间不算专注时间：开始时间后移退出期间的时长，
+            # 结束时按 结束时间 - 开始时间 计算的实际时长只包含运行期间
+            self.session_start_time = pending["started_at"] + max(0.0, time.time() - pending["updated_at"])
+            self.start_button.config(text="Resume", state=tk.NORMAL)
+            self.give_up_button.config(state=tk.NORMAL)
+            self.settings_button.config(state=tk.DISABLED)
+            self._update_timer_display(self.timer.remaining)
+            
+            # 崩溃前的分心记录已丢失，从恢复时开始重新记录
+            self.focus_monitor.begin_distractions(self.session_start_time)
+            self.focus_monitor.set_tracking(False)
+            return
+        
+        # 不恢复则按最后一次检查点的时间记录
+        if pending["remaining"] > 0:
+            self._record_session("interrupted", "The app exited unexpectedly and the session was interrupted",
+                                 end_time=pending["updated_at"])
+        else:
+            self._record_session("completed", "Success", end_time=pending["updated_at"])
+        self._reset_ui()
+    
     def _update_timer_display(self, remaining_seconds):
         """更新计时器显示"""
+        # 窗口不可见时只记下剩余时间，重新显示时再更新
+        if not self.visible:
+            self.pending_remaining = remaining_seconds
+            return
+        self.pending_remaining = None
+        
         minutes = remaining_seconds // 60
         seconds = remaining_seconds % 60
-        self.timer_label.config(text=f"{minutes:02d}:{seconds:02d}")
+        text = f"{minutes:02d}:{seconds:02d}"
+        if text != self.timer_text:
+            self.timer_text = text
+            self.timer_label.config(text=text)
         
-        # 根据剩余时间更新树木生长阶段
+        # 根据剩余时间更新树木生长阶段（阶段不变时不会重绘）
         progress = 1.0 - (remaining_seconds / self.timer.duration)
         self.tree_view.update_tree_growth(progress)
-        
-        # 确保在主线程中更新UI
-        self.master.update_idletasks()
+    
+    def _on_map(self, event):
+        """窗口重新显示"""
+        if event.widget is not self.master:
+            return
+        self.visible = True
+        if self.pending_remaining is not None:
+            self._update_timer_display(self.pending_remaining)
+    
+    def _on_unmap(self, event):
+        """窗口最小化或隐藏"""
+        if event.widget is self.master:
+            self.visible = False
     
     def _open_settings(self):
         """打开设置对话框"""
@@ -162,30 +238,99 @@ class MainWindow:
             return
         
         # 打开设置对话框
-        dialog = SettingsDialog(self.master)
+        from app.ui.settings_dialog import SettingsDialog
+        SettingsDialog(self.master)
         
-        # 如果设置已更改，重新加载配置和初始化计时器
-        if hasattr(dialog, 'result') and dialog.result:
-            self.config = get_config()
-            self._initialize_timer()
-            self._update_timer_display(self.timer.remaining)
+        # 设置的变化通过配置订阅（_on_config_changed）生效，无需重建计时器
+    
+    def _on_config_changed(self, changes):
+        """
+        配置变化回调
+        
+        Args:
+            changes: 发生变化的配置项
+        """
+        # 会话进行中不修改时长，会话结束后 _reset_ui 会读取新的时长
+        if self.timer.state in (TimerState.RUNNING, TimerState.PAUSED):
+            return
+        
+        self.timer.duration = changes["focus_duration"]
+        self.timer.stop()
+        self._update_timer_display(self.timer.remaining)
     
     def _open_history(self):
-        """打开历史记录窗口"""
-        HistoryView(self.master)
+        """打开历史记录窗口（窗口常驻，关闭后再次打开时直接显示）"""
+        if self.history_view is not None and self.history_view.winfo_exists():
+            self.history_view.show()
+            return
+        from app.ui.history_view import HistoryView
+        self.history_view = HistoryView(self.master)
+    
+    def handle_command(self, command):
+        """
+        处理其他启动进程发来的命令（在 Tk 主线程中调用）
+        
+        Args:
+            command: 命令字典，action 为 "raise" 或 "start"（可带 minutes），
+                     可带 profile 切换用户配置
+        """
+        # 显示并激活窗口
+        self.master.deiconify()
+        self.master.lift()
+        self.master.focus_force()
+        
+        if command.get("profile") and not self._switch_profile(command["profile"]):
+            return
+        
+        if command.get("action") == "start" and self.timer.state not in (TimerState.RUNNING, TimerState.PAUSED):
+            # 上一次会话结束后计时器停留在完成或失败状态，先复位
+            self.timer.stop()
+            
+            # 指定时长只用于本次会话，不修改配置
+            minutes = command.get("minutes")
+            duration = int(minutes) * 60 if minutes else self.config.get("focus_duration", 25 * 60)
+            self.timer.duration = duration
+            self.timer.remaining = duration
+            self._on_start()
+    
+    def _switch_profile(self, name):
+        """
+        切换用户配置，会话进行中不允许切换
+        
+        历史记录窗口通过 reset 事件重新读取，计时器时长通过配置订阅更新。
+        
+        Returns:
+            bool: 是否已切换到该配置
+        """
+        from app.utils.profiles import checkpoint_path, current_profile, switch_profile
+        if name == current_profile():
+            return True
+        if self.timer.state in (TimerState.RUNNING, TimerState.PAUSED):
+            messagebox.showwarning("Profile", "You can switch profiles when you are NOT in a focus session.")
+            return False
+        try:
+            switch_profile(name)
+        except ValueError as e:
+            messagebox.showerror("Profile", str(e))
+            return False
+        self.master.title(f"PyFocus - {name}")
+        # 改用该配置的检查点，恢复该配置中异常退出的会话
+        self.checkpoint.set_path(checkpoint_path(name))
+        self._recover_session()
+        return True
     
     def _on_start(self):
         """开始按钮点击处理"""
         if self.timer.state == TimerState.IDLE:
-            # 记录会话开始时间
-            self.session_start_time = time.time()
-            
-            # 开始新的专注会话
+            # 开始新的专注会话，并记录会话开始时间
             self.timer.start()
+            self.session_start_time = self.timer.started_at
+            
+            # 记录本次会话的分心（非严格模式也记录）
+            self.focus_monitor.begin_distractions(self.session_start_time)
             self.start_button.config(text="Pause", state=tk.NORMAL)
             self.give_up_button.config(state=tk.NORMAL)
             self.settings_button.config(state=tk.DISABLED)  # 禁用设置按钮
-            self.history_button.config(state=tk.DISABLED)   # 禁用历史按钮
             
             # 开始焦点监控
             if self.config.get("strict_mode", False):
@@ -196,13 +341,15 @@ class MainWindow:
             self.timer.pause()
             self.start_button.config(text="Resume")
             
-            # 暂停焦点监控
+            # 暂停焦点监控，暂停期间不记录分心
             self.focus_monitor.stop_monitoring()
+            self.focus_monitor.set_tracking(False)
             
         elif self.timer.state == TimerState.PAUSED:
             # 继续当前会话
             self.timer.resume()
             self.start_button.config(text="Pause")
+            self.focus_monitor.set_tracking(True)
             
             # 恢复焦点监控
             if self.config.get("strict_mode", False):
@@ -212,19 +359,7 @@ class MainWindow:
         """放弃按钮点击处理"""
         if messagebox.askyesno("Confirm Give Up", "Are you sure you want to give up? Your tree will wither!"):
             # 记录会话
-            if self.session_start_time is not None:
-                end_time = time.time()
-                actual_duration = int(end_time - self.session_start_time)
-                
-                # 添加到历史记录
-                HistoryManager.add_session(
-                    start_time=self.session_start_time,
-                    end_time=end_time,
-                    planned_duration=self.timer.duration,
-                    actual_duration=actual_duration,
-                    status=SessionStatus.FAILED,
-                    notes="Ended by user"
-                )
+            self._record_session("failed", "Ended by user")
             
             self.timer.fail()
             self.tree_view.set_tree_dead()
@@ -235,19 +370,7 @@ class MainWindow:
         self.focus_monitor.stop_monitoring()
         
         # 记录成功完成的会话
-        if self.session_start_time is not None:
-            end_time = time.time()
-            actual_duration = int(end_time - self.session_start_time)
-            
-            # 添加到历史记录
-            HistoryManager.add_session(
-                start_time=self.session_start_time,
-                end_time=end_time,
-                planned_duration=self.timer.duration,
-                actual_duration=actual_duration,
-                status=SessionStatus.COMPLETED,
-                notes="Success"
-            )
+        self._record_session("completed", "Success")
         
         messagebox.showinfo("Congratulations!", "Focus session ended. You planted a tree!")
         self._reset_ui()
@@ -257,19 +380,8 @@ class MainWindow:
         self.focus_monitor.stop_monitoring()
         
         # 如果是外部原因导致的失败，记录会话
-        if self.session_start_time is not None and self.timer.state == TimerState.FAILED:
-            end_time = time.time()
-            actual_duration = int(end_time - self.session_start_time)
-            
-            # 添加到历史记录
-            HistoryManager.add_session(
-                start_time=self.session_start_time,
-                end_time=end_time,
-                planned_duration=self.timer.duration,
-                actual_duration=actual_duration,
-                status=SessionStatus.INTERRUPTED,
-                notes="Session interrupted"
-            )
+        if self.timer.state == TimerState.FAILED:
+            self._record_session("interrupted", "Session interrupted")
         
         self._reset_ui()
     
@@ -283,12 +395,48 @@ class MainWindow:
             self._reset_ui()
             self.focus_lost_flag = None
     
+    def _record_session(self, status, notes, end_time=None):
+        """
+        将当前会话写入历史记录
+        
+        Args:
+            status: 会话状态取值（SessionStatus 的 value）
+            notes: 备注信息
+            end_time: 会话结束时间戳，默认为当前时间
+        """
+        if self.session_start_time is None:
+            return
+        
+        from app.utils.history import HistoryManager, SessionStatus
+        
+        if end_time is None:
+            end_time = time.time()
+        actual_duration = int(end_time - self.session_start_time)
+        
+        # 分心记录作为附加字段随会话保存
+        distractions = self.focus_monitor.end_distractions(end_time)
+        extra = distractions.to_fields() if distractions is not None else None
+        
+        # 添加到历史记录
+        HistoryManager.add_session(
+            start_time=self.session_start_time,
+            end_time=end_time,
+            planned_duration=self.timer.duration,
+            actual_duration=actual_duration,
+            status=SessionStatus(status),
+            notes=notes,
+            extra=extra
+        )
+    
     def _reset_ui(self):
         """重置UI到初始状态"""
+        # 计时器复位为空闲状态，并恢复配置中的专注时长
+        self.timer.duration = self.config.get("focus_duration", 25 * 60)
+        self.timer.stop()
+        
         self.start_button.config(text="Plant", state=tk.NORMAL)
         self.give_up_button.config(state=tk.DISABLED)
         self.settings_button.config(state=tk.NORMAL)  # 恢复设置按钮
-        self.history_button.config(state=tk.NORMAL)   # 恢复历史按钮
         self._update_timer_display(self.timer.duration)
         
         # 重置会话开始时间
@@ -299,21 +447,15 @@ class MainWindow:
         if self.timer.state == TimerState.RUNNING or self.timer.state == TimerState.PAUSED:
             if messagebox.askyesno("Confirm Exit", "The focus session is in progress. Are you sure you want to exit?"):
                 # 如果正在进行中的会话被终止，记录为中断
-                if self.session_start_time is not None:
-                    end_time = time.time()
-                    actual_duration = int(end_time - self.session_start_time)
-                    
-                    # 添加到历史记录
-                    HistoryManager.add_session(
-                        start_time=self.session_start_time,
-                        end_time=end_time,
-                        planned_duration=self.timer.duration,
-                        actual_duration=actual_duration,
-                        status=SessionStatus.INTERRUPTED,
-                        notes="User exited the app and the session was interrupted"
-                    )
+                self._record_session("interrupted", "User exited the app and the session was interrupted")
                 
+                # 会话已记录，清除检查点
+                self.timer.stop()
+                self.checkpoint.close()
                 self.focus_monitor.stop_monitoring()
+                self.config.flush()
                 self.master.destroy()
         else:
+            self.checkpoint.close()
+            self.config.flush()
             self.master.destroy()
\ No newline at end of file
@@ -12,7 +12,7 @@ import os
 # 确保能够正确导入项目中的其他模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app.utils.config import get_config, save_config
+from app.utils.config import get_store
 
 class SettingsDialog(tk.Toplevel):
     """设置对话框，允许用户修改应用设置"""
@@ -41,8 +41,8 @@ class SettingsDialog(tk.Toplevel):
         # 设置不可调整大小
         self.resizable(False, False)
         
-        # 加载当前配置
-        self.config = get_config()
+        # 加载当前配置（内存中的快照）
+        self.config = get_store().snapshot()
         
         # 创建界面
         self._create_widgets()
@@ -144,13 +144,12 @@ class SettingsDialog(tk.Toplevel):
         # 获取严格模式设置
         strict_mode = self.strict_mode_var.get()
         
-        # 更新配置
-        self.config["focus_duration"] = focus_duration_sec
-        self.config["short_break"] = short_break_sec
-        self.config["strict_mode"] = strict_mode
-        
-        # 保存配置
-        save_config(self.config)
+        # 更新配置，订阅者只会收到实际变化的项，文件保存会被合并
+        get_store().update({
+            "focus_duration": focus_duration_sec,
+            "short_break": short_break_sec,
+            "strict_mode": strict_mode,
+        })
         
         # 设置结果标志，让父窗口知道设置已更改
         self.result = True
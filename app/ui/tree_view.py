@@ -7,7 +7,12 @@
 import os
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
+
+# 树木图像文件名，索引 0-3 为四个生长阶段，索引 4 为枯萎的树
+TREE_IMAGE_FILES = ("stage1.png", "stage2.png", "stage3.png", "stage4.png", "dead.png")
+
+# 缺少图像文件时使用的占位颜色
+_BLANK_COLORS = ("white", "white", "white", "white", "#CCCCCC")
 
 class TreeView(ttk.Frame):
     """树木生长视图组件"""
@@ -24,74 +29,77 @@ class TreeView(ttk.Frame):
         # 创建画布用于显示树木图像
         self.canvas = tk.Canvas(self, width=300, height=300, bg="#F0F0F0")
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", self._on_canvas_resize)
         
-        # 加载树木图像
-        self.tree_images = self._load_tree_images()
+        # 树木图像在第一次显示时才解码，启动时只加载第一阶段
+        self.tree_images = [None] * len(TREE_IMAGE_FILES)
+        self.resources_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+            "resources", "trees"
+        )
         
         # 当前图像引用（防止垃圾回收）
         self.current_image = None
         
+        # 当前显示的图像索引和画布项，阶段不变时不重绘
+        self.current_index = None
+        self.image_item = None
+        
         # 显示初始树木
         self.update_tree_growth(0)
     
-    def _load_tree_images(self):
-        """加载不同生长阶段的树木图像"""
-        images = []
-        resources_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-            "resources", "trees"
-        )
+    def _get_tree_image(self, image_index):
+        """
+        获取指定阶段的树木图像，首次使用时加载
+        
+        Args:
+            image_index: 图像索引
+            
+        Returns:
+            ImageTk.PhotoImage: 树木图像
+        """
+        image = self.tree_images[image_index]
+        if image is None:
+            image = self._load_tree_image(image_index)
+            self.tree_images[image_index] = image
+        return image
+    
+    def _load_tree_image(self, image_index):
+        """
+        加载并缩放单个树木图像
+        
+        Args:
+            image_index: 图像索引
+            
+        Returns:
+            ImageTk.PhotoImage: 树木图像
+        """
+        # Pillow 只在需要显示图像时才导入
+        from PIL import Image, ImageTk
+        
+        blank_color = _BLANK_COLORS[image_index]
         
         # 如果资源目录不存在，创建它
-        if not os.path.exists(resources_path):
-            os.makedirs(resources_path)
-            print(f"警告: 树木图像目录不存在，已创建 {resources_path}")
+        if not os.path.exists(self.resources_path):
+            os.makedirs(self.resources_path)
+            print(f"警告: 树木图像目录不存在，已创建 {self.resources_path}")
             print("请将树木图像放入该目录")
-            
-            # 创建示例空图像
-            for i in range(1, 5):
-                blank_image = Image.new('RGB', (300, 300), color='white')
-                images.append(ImageTk.PhotoImage(blank_image))
-                
-            # 添加枯萎树的图像
-            dead_image = Image.new('RGB', (300, 300), color='#CCCCCC')
-            images.append(ImageTk.PhotoImage(dead_image))
-            return images
+            return ImageTk.PhotoImage(Image.new('RGB', (300, 300), color=blank_color))
         
+        filename = TREE_IMAGE_FILES[image_index]
+        path = os.path.join(self.resources_path, filename)
         try:
-            # 加载四个生长阶段的图像
-            for i in range(1, 5):
-                path = os.path.join(resources_path, f"stage{i}.png")
-                if os.path.exists(path):
-                    image = Image.open(path)
-                    # 调整图像大小以适应画布
-                    image = image.resize((300, 300), Image.LANCZOS)
-                    images.append(ImageTk.PhotoImage(image))
-                else:
-                    # 如果图像不存在，使用空白图像
-                    blank_image = Image.new('RGB', (300, 300), color='white')
-                    images.append(ImageTk.PhotoImage(blank_image))
-                    print(f"警告: 树木图像 stage{i}.png 不存在")
-            
-            # 加载枯萎的树图像
-            dead_path = os.path.join(resources_path, "dead.png")
-            if os.path.exists(dead_path):
-                dead_image = Image.open(dead_path)
-                dead_image = dead_image.resize((300, 300), Image.LANCZOS)
-                images.append(ImageTk.PhotoImage(dead_image))
-            else:
-                blank_image = Image.new('RGB', (300, 300), color='#CCCCCC')
-                images.append(ImageTk.PhotoImage(blank_image))
-                print("警告: 枯萎树木图像 dead.png 不存在")
-                
+            if os.path.exists(path):
+                image = Image.open(path)
+                # 调整图像大小以适应画布
+                image = image.resize((300, 300), Image.LANCZOS)
+                return ImageTk.PhotoImage(image)
+            print(f"警告: 树木图像 {filename} 不存在")
         except Exception as e:
             print(f"加载树木图像时出错: {e}")
-            # 创建备用图像
-            for i in range(5):
-                blank_image = Image.new('RGB', (300, 300), color='white')
-                images.append(ImageTk.PhotoImage(blank_image))
         
-        return images
+        # 如果图像不存在或加载失败，使用空白图像
+        return ImageTk.PhotoImage(Image.new('RGB', (300, 300), color=blank_color))
     
     def update_tree_growth(self, progress):
         """
@@ -100,9 +108,6 @@ class TreeView(ttk.Frame):
         Args:
             progress: 专注进度，0.0-1.0
         """
-        if not self.tree_images:
-            return
-            
         # 根据进度选择对应的树木图像
         if progress < 0.25:
             image_index = 0  # 第一阶段
@@ -127,12 +132,18 @@ class TreeView(ttk.Frame):
         Args:
             image_index: 图像索引
         """
+        # 生长阶段没有变化时不重绘
+        if image_index == self.current_index:
+            return
+        
         # 清除画布
         self.canvas.delete("all")
+        self.current_index = None
+        self.image_item = None
         
         # 确保索引有效
         if 0 <= image_index < len(self.tree_images):
-            self.current_image = self.tree_images[image_index]
+            self.current_image = self._get_tree_image(image_index)
             # 获取画布尺寸
             canvas_width = self.canvas.winfo_width()
             canvas_height = self.canvas.winfo_height()
@@ -142,4 +153,10 @@ class TreeView(ttk.Frame):
             y = canvas_height // 2
             
             # 显示图像
-            self.canvas.create_image(x, y, image=self.current_image)
\ No newline at end of file
+            self.image_item = self.canvas.create_image(x, y, image=self.current_image)
+            self.current_index = image_index
+    
+    def _on_canvas_resize(self, event):
+        """画布大小变化（包括首次显示）时重新居中图像"""
+        if self.image_item is not None:
+            self.canvas.coords(self.image_item, event.width // 2, event.height // 2)
\ No newline at end of file
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+长周期专注数据分析模块
+
+将会话表的列一次性载入 NumPy 数组，以向量化运算计算时段热力图、
+连续打卡天数、滚动7日专注时长和按计划时长分组的完成率。
+未安装 NumPy 时退回纯 Python 实现，结果一致。
+"""
+
+import copy
+import time
+import datetime
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+from app.utils.history import HistoryManager, SessionStatus
+
+# 1970-01-01 是星期四，换算为 周一=0 的偏移量
+_EPOCH_WEEKDAY = 3
+
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# 结果缓存 {(days, 历史记录代数, 今天的日期序号): 结果}；界面线程和后台绘制线程共用，访问时持有锁
+_cache = {}
+_cache_lock = threading.Lock()
+_cache_hits = 0
+_cache_misses = 0
+
+
+def compute_analytics(days=30, table=None, now=None):
+    """
+    计算过去指定天数的扩展统计指标
+
+    统计窗口为包括今天在内的最近 days 个自然日（从 first_day 本地零点开始，
+    而不是 now 之前的 days*86400 秒），与按天排列的每日序列一致。
+    使用 HistoryManager 的会话表时，结果按 (days, 历史记录代数, 今天) 缓存，
+    每次返回缓存结果的独立副本，调用者可以修改。
+
+    Args:
+        days: 要统计的天数，0 表示全部
+        table: 会话表，默认使用 HistoryManager 当前的会话表
+        now: 当前时间戳，默认取 time.time()
+
+    Returns:
+        dict: 包含以下键的字典
+            heatmap: 7x24 列表，按 星期 x 小时 统计的专注秒数
+            hour_of_day: 长度24的列表，各小时的专注秒数
+            weekday: 长度7的列表，各星期几的专注秒数（周一在前）
+            current_streak: 截至今天（或昨天）的连续完成天数
+            longest_streak: 最长连续完成天数
+            first_day: 每日序列的第一天（datetime.date）
+            daily_focus: 每日专注秒数列表
+            rolling_7day: 每日对应的滚动7日专注秒数列表
+            completion_by_planned: {计划时长(秒): (总数, 完成数, 完成率%)}
+            days: 统计天数
+    """
+    global _cache_hits, _cache_misses
+
+    if now is None:
+        now = time.time()
+    today = _local_day(now)
+
+    key = None
+    if table is None:
+        table = HistoryManager.get_table()
+        key = (days, HistoryManager.get_generation(), today)
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached is not None:
+                _cache_hits += 1
+            else:
+                _cache_misses += 1
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+    if days == 0:
+        first_day = None
+        cutoff_time = float("-inf")
+    else:
+        # 从本地时间 first_day 零点开始统计
+        first_day = today - days + 1
+        cutoff_time = time.mktime(_day_to_date(first_day).timetuple())
+
+    completed_code = table.status_pool.code_of(SessionStatus.COMPLETED.value)
+
+    if np is not None:
+        result = _compute_numpy(table, cutoff_time, first_day, completed_code, today)
+    else:
+        result = _compute_python(table, cutoff_time, first_day, completed_code, today)
+
+    result["days"] = days
+    if key is not None:
+        with _cache_lock:
+            # 代数或日期变化后旧结果不会再命中，直接清空
+            if any(old[1:] != key[1:] for old in _cache):
+                _cache.clear()
+            _cache[key] = result
+        return copy.deepcopy(result)
+    return result
+
+
+def cache_info():
+    """
+    获取分析结果缓存的使用情况
+
+    Returns:
+        dict: 包含 hits、misses、size 的字典
+    """
+    with _cache_lock:
+        return {"hits": _cache_hits, "misses": _cache_misses, "size": len(_cache)}
+
+
+def _local_day(timestamp):
+    """将时间戳换算为本地日期序号（自1970-01-01起的天数）"""
+    return int((timestamp + time.localtime(timestamp).tm_gmtoff) // 86400)
+
+
+def _day_to_date(day):
+    """将本地日期序号换算为 datetime.date"""
+    return datetime.date(1970, 1, 1) + datetime.timedelta(days=day)
+
+
+def _hour_offset(hour_bucket, cache):
+    """获取某个UTC小时内的本地时区偏移（秒），按小时缓存"""
+    offset = cache.get(hour_bucket)
+    if offset is None:
+        offset = time.localtime(hour_bucket * 3600).tm_gmtoff
+        cache[hour_bucket] = offset
+    return offset
+
+
+def _streaks(completed_days, today):
+    """
+    由升序排列、去重后的完成日期序号计算连续天数
+
+    Returns:
+        tuple: (当前连续天数, 最长连续天数)
+    """
+    longest = 0
+    run = 0
+    previous = None
+    for day in completed_days:
+        run = run + 1 if previous is not None and day == previous + 1 else 1
+        longest = max(longest, run)
+        previous = day
+
+    # 今天还未完成时，截至昨天的连续天数仍然有效
+    current = run if previous is not None and previous >= today - 1 else 0
+    return current, longest
+
+
+def _finish(heatmap, daily, first_day, completed_days, today, planned_totals, planned_completed):
+    """整理两种实现共同的输出"""
+    current_streak, longest_streak = _streaks(completed_days, today)
+
+    rolling = []
+    window = 0
+    for i, seconds in enumerate(daily):
+        window += seconds
+        if i >= 7:
+            window -= daily[i - 7]
+        rolling.append(window)
+
+    completion_by_planned = {}
+    for planned in sorted(planned_totals):
+        total = planned_totals[planned]
+        completed = planned_completed.get(planned, 0)
+        completion_by_planned[planned] = (total, completed, completed / total * 100 if total else 0)
+
+    return {
+        "heatmap": heatmap,
+        "hour_of_day": [sum(row[h] for row in heatmap) for h in range(24)],
+        "weekday": [sum(row) for row in heatmap],
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "first_day": _day_to_date(first_day),
+        "daily_focus": daily,
+        "rolling_7day": rolling,
+        "completion_by_planned": completion_by_planned,
+    }
+
+
+def _compute_python(table, cutoff_time, first_day, completed_code, today):
+    """纯 Python 实现"""
+    heatmap = [[0] * 24 for _ in range(7)]
+    daily_totals = {}
+    completed_days = set()
+    planned_totals = {}
+    planned_completed = {}
+    offsets = {}
+
+    for start_time, actual, planned, status_code in zip(
+            table.start_times, table.actual_durations, table.planned_durations, table.status_codes):
+        if start_time < cutoff_time:
+            continue
+        local = start_time + _hour_offset(int(start_time // 3600), offsets)
+        day = int(local // 86400)
+        hour = int(local % 86400 // 3600)
+        heatmap[(day + _EPOCH_WEEKDAY) % 7][hour] += actual
+        daily_totals[day] = daily_totals.get(day, 0) + actual
+        planned_totals[planned] = planned_totals.get(planned, 0) + 1
+        if status_code == completed_code:
+            completed_days.add(day)
+            planned_completed[planned] = planned_completed.get(planned, 0) + 1
+
+    if first_day is None:
+        first_day = min(min(daily_totals), today) if daily_totals else today
+    daily = [daily_totals.get(day, 0) for day in range(first_day, today + 1)]
+
+    return _finish(heatmap, daily, first_day, sorted(completed_days), today,
+                   planned_totals, planned_completed)
+
+
+def _compute_numpy(table, cutoff_time, first_day, completed_code, today):
+    """NumPy 向量化实现"""
+    starts = np.frombuffer(table.start_times, dtype=np.float64)
+    mask = starts >= cutoff_time
+    starts = starts[mask]
+    actual = np.frombuffer(table.actual_durations, dtype=np.int64)[mask]
+    planned = np.frombuffer(table.planned_durations, dtype=np.int64)[mask]
+    status = np.frombuffer(table.status_codes, dtype=np.dtype(table.status_codes.typecode))[mask]
+
+    # 时区偏移只对出现过的UTC小时各计算一次
+    hour_buckets = np.floor_divide(starts, 3600).astype(np.int64)
+    unique_hours, inverse = np.unique(hour_buckets, return_inverse=True)
+    offsets = np.array([time.localtime(int(h) * 3600).tm_gmtoff for h in unique_hours], dtype=np.float64)
+    local = starts + offsets[inverse] if len(starts) else starts
+
+    day = np.floor_divide(local, 86400).astype(np.int64)
+    hour = np.floor_divide(np.mod(local, 86400), 3600).astype(np.int64)
+    weekday = (day + _EPOCH_WEEKDAY) % 7
+
+    heatmap = np.bincount(weekday * 24 + hour, weights=actual, minlength=7 * 24).astype(np.int64)
+    heatmap = heatmap.reshape(7, 24).tolist()
+
+    if first_day is None:
+        first_day = min(int(day.min()), today) if len(day) else today
+    in_days = (day >= first_day) & (day <= today)
+    daily = np.bincount(day[in_days] - first_day, weights=actual[in_days],
+                        minlength=today - first_day + 1).astype(np.int64).tolist()
+
+    completed = status == completed_code
+    completed_days = np.unique(day[completed]).tolist()
+
+    planned_values, planned_inverse = np.unique(planned, return_inverse=True)
+    totals = np.bincount(planned_inverse, minlength=len(planned_values))
+    completed_counts = np.bincount(planned_inverse, weights=completed, minlength=len(planned_values))
+    planned_totals = {int(p): int(t) for p, t in zip(planned_values, totals)}
+    planned_completed = {int(p): int(c) for p, c in zip(planned_values, completed_counts)}
+
+    return _finish(heatmap, daily, first_day, completed_days, today, planned_totals, planned_completed)
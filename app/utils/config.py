@@ -6,6 +6,8 @@
 
 import os
 import json
+import time
+import threading
 
 # 配置文件路径
 CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".focus_forest_config.json")
@@ -19,41 +21,310 @@ DEFAULT_CONFIG = {
     "strict_mode": False,       # 严格模式（窗口失焦则失败）
 }
 
+# 配置项类型，写入和从文件加载时按此转换
+CONFIG_SCHEMA = {
+    "focus_duration": int,
+    "short_break": int,
+    "long_break": int,
+    "auto_start_breaks": bool,
+    "strict_mode": bool,
+}
+
+
+class ConfigStore:
+    """
+    内存中的配置存储
+
+    读取只访问内存；配置文件被外部修改时按修改时间自动重新加载
+    （只在主线程中检查，订阅者不会在后台线程中收到重新加载的通知）。
+    写入后通知订阅者发生变化的配置项，并在短暂延迟后合并为一次原子保存。
+    """
+
+    def __init__(self, path=None, save_delay=0.5, reload_interval=1.0):
+        """
+        初始化配置存储
+
+        Args:
+            path: 配置文件路径，默认为 CONFIG_FILE
+            save_delay: 写入后延迟保存的秒数，期间的多次写入合并为一次保存
+            reload_interval: 检查配置文件修改时间的最短间隔（秒）
+        """
+        self.path = path or CONFIG_FILE
+        self.save_delay = save_delay
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._save_timer = None
+        self._last_check = time.monotonic()
+        self._signature = _file_signature(self.path)
+        self._values = _read_config_file(self.path)
+
+    def get(self, key, default=None):
+        """
+        获取配置项
+
+        Args:
+            key: 配置项名称
+            default: 配置项不存在时的默认值
+
+        Returns:
+            配置项的值
+        """
+        self._maybe_reload()
+        return self._values.get(key, default)
+
+    def snapshot(self):
+        """
+        获取全部配置的副本
+
+        Returns:
+            dict: 配置字典
+        """
+        self._maybe_reload()
+        with self._lock:
+            return dict(self._values)
+
+    def set(self, key, value):
+        """
+        修改单个配置项
+
+        Args:
+            key: 配置项名称
+            value: 新的值
+        """
+        self.update({key: value})
+
+    def update(self, values):
+        """
+        批量修改配置项，只通知和保存实际发生变化的项
+
+        Args:
+            values: 配置字典
+
+        Returns:
+            dict: 发生变化的配置项
+        """
+        with self._lock:
+            changes = {}
+            for key, value in values.items():
+                value = _coerce(key, value)
+                if key not in self._values or self._values[key] != value:
+                    self._values[key] = value
+                    changes[key] = value
+            if changes:
+                self._schedule_save()
+
+        if changes:
+            self._notify(changes)
+        return changes
+
+    def subscribe(self, callback, keys=None):
+        """
+        订阅配置变化
+
+        Args:
+            callback: 回调函数，参数为 {配置项: 新值}，在修改配置的线程中调用
+            keys: 只关心的配置项集合，None 表示全部
+
+        Returns:
+            function: 调用后取消订阅
+        """
+        subscriber = (callback, frozenset(keys) if keys is not None else None)
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+        def unsubscribe():
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def flush(self):
+        """立即保存尚未写入文件的修改"""
+        with self._lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+            self._save()
+
+    def reload(self):
+        """
+        重新读取配置文件，并通知发生变化的配置项
+
+        Returns:
+            dict: 发生变化的配置项
+        """
+        with self._lock:
+            self._last_check = time.monotonic()
+            self._signature = _file_signature(self.path)
+            values = _read_config_file(self.path)
+            changes = {key: value for key, value in values.items() if self._values.get(key) != value}
+            self._values = values
+
+        if changes:
+            self._notify(changes)
+        return changes
+
+    def switch(self, path):
+        """
+        切换到另一个配置文件（例如切换用户配置），先保存当前文件尚未写入的修改
+
+        订阅者会收到两个文件之间发生变化的配置项。
+
+        Args:
+            path: 配置文件路径
+
+        Returns:
+            dict: 发生变化的配置项
+        """
+        with self._lock:
+            self.flush()
+            self.path = path
+        return self.reload()
+
+    def _maybe_reload(self):
+        """
+        配置文件的修改时间变化时重新加载，检查频率受 reload_interval 限制
+
+        只在主线程（Tk 所在线程）中检查，后台线程读取时直接使用内存中的值，
+        避免订阅者的回调在非 Tk 线程中被调用。
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+        # 有尚未保存的修改时以内存为准
+        if self._save_timer is None and _file_signature(self.path) != self._signature:
+            self.reload()
+
+    def _schedule_save(self):
+        """安排一次延迟保存，已安排时不重复"""
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save(self):
+        """原子地写入配置文件（先写临时文件再替换）"""
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._values, f, indent=4)
+            os.replace(temp_path, self.path)
+            self._signature = _file_signature(self.path)
+        except Exception as e:
+            print(f"保存配置文件出错: {e}")
+
+    def _notify(self, changes):
+        """通知订阅者"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, keys in subscribers:
+            if keys is None:
+                callback(dict(changes))
+            else:
+                relevant = {key: value for key, value in changes.items() if key in keys}
+                if relevant:
+                    callback(relevant)
+
+
+# 全局配置存储，首次使用时创建
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    获取全局配置存储
+
+    Returns:
+        ConfigStore: 配置存储
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ConfigStore()
+    return _store
+
+
 def get_config():
     """
-    获取应用配置，如果配置文件不存在则创建
-    
+    获取应用配置，如果配置文件不存在则返回默认配置
+
+    首次运行时不写入文件，配置文件在用户第一次保存设置时创建。
+
     Returns:
         dict: 配置字典
     """
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            # 确保所有默认配置项存在
-            for key, value in DEFAULT_CONFIG.items():
-                if key not in config:
-                    config[key] = value
-            
-            return config
-        except Exception as e:
-            print(f"读取配置文件出错: {e}")
-            return DEFAULT_CONFIG.copy()
-    else:
-        # 创建默认配置
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
+    return get_store().snapshot()
 
 def save_config(config):
     """
     保存配置到文件
-    
+
     Args:
         config: 配置字典
     """
+    store = get_store()
+    store.update(config)
+    store.flush()
+
+
+def _read_config_file(path):
+    """
+    读取配置文件，补全缺省配置项并转换类型
+
+    Args:
+        path: 配置文件路径
+
+    Returns:
+        dict: 配置字典
+    """
+    config = DEFAULT_CONFIG.copy()
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            for key, value in stored.items():
+                config[key] = _coerce(key, value)
+        except Exception as e:
+            print(f"读取配置文件出错: {e}")
+            return DEFAULT_CONFIG.copy()
+    return config
+
+
+# 布尔配置项可接受的字符串
+_BOOL_STRINGS = {"true": True, "1": True, "yes": True, "on": True,
+                 "false": False, "0": False, "no": False, "off": False}
+
+
+def _coerce(key, value):
+    """按 CONFIG_SCHEMA 转换配置项的类型，无法转换时使用默认值"""
+    value_type = CONFIG_SCHEMA.get(key)
+    if value_type is None or isinstance(value, value_type):
+        return value
+    if value_type is bool:
+        # bool("false") 为 True，字符串按内容解析；数字只接受 0 和 1
+        if isinstance(value, str):
+            return _BOOL_STRINGS.get(value.strip().lower(), DEFAULT_CONFIG[key])
+        if isinstance(value, (int, float)) and value in (0, 1):
+            return bool(value)
+        return DEFAULT_CONFIG[key]
+    try:
+        return value_type(value)
+    except (TypeError, ValueError):
+        return DEFAULT_CONFIG[key]
+
+
+def _file_signature(path):
+    """获取文件的 (修改时间, 大小)，文件不存在时返回None"""
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4)
-    except Exception as e:
-        print(f"保存配置文件出错: {e}")
\ No newline at end of file
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
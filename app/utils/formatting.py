@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+历史记录表格的行格式化
+
+每个会话的显示字段（日期、时间、实际时长、计划时长、状态）只格式化一次，
+结果按会话ID缓存在有界的LRU缓存中，翻页、筛选和刷新时直接复用。
+
+日期字符串按天缓存，时间字符串由预先生成的 "HH:MM" 和 ":SS" 片段拼接，
+每行只需调用一次 time.localtime，不再经过 datetime.fromtimestamp 和 strftime。
+时长字符串的取值很少（计划时长只有几种），同样缓存。
+"""
+
+import time
+from collections import OrderedDict
+
+from app.utils.history import SessionStatus, format_duration
+
+# 默认缓存的会话行数（足够覆盖多页表格）
+DEFAULT_CAPACITY = 4096
+
+# 日期和时长缓存的上限，超过时清空重建
+_MAX_DAYS = 20000
+_MAX_DURATIONS = 10000
+
+# 状态的显示文本
+STATUS_LABELS = {
+    SessionStatus.COMPLETED.value: "Completed ✓",
+    SessionStatus.FAILED.value: "Failed ✗",
+    SessionStatus.INTERRUPTED.value: "Interrupted !",
+}
+
+# 一天内每分钟的 "HH:MM" 以及每秒的 ":SS" 片段
+_MINUTES = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)]
+_SECONDS = [f":{second:02d}" for second in range(62)]
+
+
+class SessionFormatter:
+    """会话显示字段的格式化与缓存"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        初始化格式化器
+
+        Args:
+            capacity: 按会话ID缓存的行数
+        """
+        self.capacity = capacity
+        # {会话ID: (源字段, 显示字段元组)}，按最近使用排序
+        self._rows = OrderedDict()
+        # {(年, 月, 日): "YYYY-MM-DD"}
+        self._days = {}
+        # {秒数: 时长文本}
+        self._durations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def row(self, session):
+        """
+        获取会话在表格中的显示字段
+
+        Args:
+            session: 会话字典（或 SessionRow）
+
+        Returns:
+            tuple: (日期, 时间, 实际时长, 计划时长, 状态)
+        """
+        start_time = session.get("start_time", 0)
+        actual_duration = session.get("actual_duration", 0)
+        planned_duration = session.get("planned_duration", 0)
+        status = session.get("status", "")
+        # 源字段一起缓存，ID相同但内容不同（例如重新导入）时重新格式化
+        source = (start_time, actual_duration, planned_duration, status)
+
+        rows = self._rows
+        session_id = session.get("id")
+        cached = rows.get(session_id)
+        if cached is not None and cached[0] == source:
+            rows.move_to_end(session_id)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        date_str, time_str = self.split_timestamp(start_time)
+        values = (
+            date_str,
+            time_str,
+            self.duration(actual_duration),
+            self.duration(planned_duration),
+            STATUS_LABELS.get(status, status),
+        )
+        if session_id is not None:
+            rows[session_id] = (source, values)
+            rows.move_to_end(session_id)
+            if len(rows) > self.capacity:
+                rows.popitem(last=False)
+        return values
+
+    def split_timestamp(self, timestamp):
+        """
+        将时间戳格式化为日期和时间两部分，与 format_timestamp 的结果一致
+
+        Args:
+            timestamp: 时间戳
+
+        Returns:
+            tuple: ("YYYY-MM-DD", "HH:MM:SS")
+        """
+        local = time.localtime(timestamp)
+        key = local[:3]
+        date_str = self._days.get(key)
+        if date_str is None:
+            if len(self._days) >= _MAX_DAYS:
+                self._days.clear()
+            date_str = self._days[key] = f"{local.tm_year:04d}-{local.tm_mon:02d}-{local.tm_mday:02d}"
+        return date_str, _MINUTES[local.tm_hour * 60 + local.tm_min] + _SECONDS[local.tm_sec]
+
+    def duration(self, seconds):
+        """
+        格式化时长，与 format_duration 的结果一致
+
+        Args:
+            seconds: 秒数
+
+        Returns:
+            str: 时长文本
+        """
+        text = self._durations.get(seconds)
+        if text is None:
+            if len(self._durations) >= _MAX_DURATIONS:
+                self._durations.clear()
+            text = self._durations[seconds] = format_duration(seconds)
+        return text
+
+    def cache_info(self):
+        """
+        获取缓存的使用情况
+
+        Returns:
+            dict: 包含 hits、misses、rows、days、durations 的字典
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "rows": len(self._rows),
+            "days": len(self._days),
+            "durations": len(self._durations),
+        }
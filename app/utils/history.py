@@ -7,8 +7,18 @@
 import os
 import json
 import time
+import bisect
+import operator
+import itertools
 import datetime
+import functools
+import threading
 from enum import Enum
+from array import array
+
+from app.utils.session_table import SessionTable
+from app.utils.notes_index import NotesIndex
+from app.utils.id_allocator import IdAllocator
 
 # 历史记录文件路径
 HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".focus_forest_history.json")
@@ -20,10 +30,71 @@ class SessionStatus(Enum):
     INTERRUPTED = "interrupted"  # 被打断（如窗口失焦）
 
 
+# 保护内存会话表的可重入锁（界面线程、计时器线程与服务线程共用）
+_history_lock = threading.RLock()
+
+# 当前线程嵌套调用被锁定函数的层数
+_lock_state = threading.local()
+
+# 单个变化事件最多携带的会话数，超过时改为发送 reset 事件
+MAX_EVENT_SESSIONS = 1000
+
+
+def _locked(func):
+    """
+    使被装饰的函数在历史记录锁内执行
+    
+    最外层的调用释放锁之后再通知历史记录变化的订阅者，
+    订阅者在回调中等待其他线程（如界面线程）时不会死锁。
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_lock_state, "depth", 0)
+        with _history_lock:
+            _lock_state.depth = depth + 1
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                _lock_state.depth = depth
+        if not depth and HistoryManager._pending_events:
+            HistoryManager._dispatch_events()
+        return result
+    return wrapper
+
+
 class HistoryManager:
     """历史记录管理器"""
     
+    # 跨线程读取会话表时应持有此锁
+    lock = _history_lock
+    
+    # 内存中的紧凑会话表及其对应的历史文件签名
+    _table = None
+    _table_signature = None
+    
+    # 历史记录代数，每次写入或外部修改后单调递增
+    _generation = 0
+    
+    # 统计结果缓存 {(days, generation): (结果, 失效时间)} 及命中计数
+    _stats_cache = {}
+    _stats_hits = 0
+    _stats_misses = 0
+    
+    # 备注全文索引，随增删增量维护；代数与会话表不一致时重新加载或构建
+    _notes_index = None
+    
+    # 按开始时间排序的行号及对应的开始时间 (代数, 行号, 开始时间)，供 query 按时间范围定位
+    _start_order = None
+    
+    # 历史记录变化的订阅者，以及等待通知的事件
+    _subscribers = []
+    _pending_events = []
+    
+    # 当前历史文件的会话ID分配器
+    _id_allocator = None
+    
     @staticmethod
+    @_locked
     def get_history():
         """
         获取历史记录
@@ -31,9 +102,145 @@ class HistoryManager:
         Returns:
             list: 历史记录列表
         """
-        if os.path.exists(HISTORY_FILE):
+        return HistoryManager.get_table().to_dicts()
+    
+    @staticmethod
+    @_locked
+    def get_table():
+        """
+        获取紧凑会话表，历史文件被外部修改时自动重新加载
+        
+        返回的会话表由管理器持有，调用者应只读访问。
+        
+        Returns:
+            SessionTable: 会话表
+        """
+        signature = _file_signature(HISTORY_FILE)
+        if HistoryManager._table is None or signature != HistoryManager._table_signature:
+            HistoryManager._table = SessionTable.from_dicts(HistoryManager._read_history_file())
+            HistoryManager._table_signature = signature
+            HistoryManager._bump_generation()
+            # 文件被外部修改（或重新加载），订阅者需要重新读取
+            HistoryManager._post_event({"type": "reset"})
+        return HistoryManager._table
+    
+    @staticmethod
+    @_locked
+    def set_history_file(path):
+        """
+        切换历史文件（例如切换用户配置），丢弃内存中的会话表和索引
+        
+        订阅者会收到 reset 事件并重新读取。
+        
+        Args:
+            path: 历史文件路径
+        """
+        global HISTORY_FILE
+        if path == HISTORY_FILE and HistoryManager._table is not None:
+            return
+        HISTORY_FILE = path
+        HistoryManager._table = None
+        HistoryManager._table_signature = None
+        HistoryManager._notes_index = None
+        HistoryManager._start_order = None
+        HistoryManager.get_table()
+    
+    @staticmethod
+    def get_generation():
+        """
+        获取历史记录代数
+        
+        代数在每次写入（或检测到文件被外部修改）后递增，
+        可作为历史记录内容的版本号用于缓存校验。
+        
+        Returns:
+            int: 历史记录代数
+        """
+        HistoryManager.get_table()
+        return HistoryManager._generation
+    
+    @staticmethod
+    def subscribe(callback):
+        """
+        订阅历史记录变化
+        
+        每次写入（代数递增）对应一个事件字典，generation 为写入后的代数:
+            {"type": "added", "sessions": [...], "generation": n}    新增的会话
+            {"type": "deleted", "sessions": [...], "generation": n}  删除的会话
+            {"type": "reset", "generation": n}   清空、外部修改或批量导入，需要重新读取
+        
+        回调在修改历史记录的线程中、释放历史记录锁之后调用。
+        订阅者收到的代数不连续时（例如漏掉或乱序的事件）应重新读取。
+        
+        Args:
+            callback: 回调函数，参数为事件字典
+            
+        Returns:
+            function: 调用后取消订阅
+        """
+        with _history_lock:
+            HistoryManager._subscribers.append(callback)
+        
+        def unsubscribe():
+            with _history_lock:
+                if callback in HistoryManager._subscribers:
+                    HistoryManager._subscribers.remove(callback)
+        
+        return unsubscribe
+    
+    @staticmethod
+    def _post_event(event):
+        """记录一个变化事件（在锁内调用），由最外层的 _locked 调用返回后发送"""
+        if HistoryManager._subscribers:
+            HistoryManager._pending_events.append(dict(event, generation=HistoryManager._generation))
+    
+    @staticmethod
+    def _dispatch_events():
+        """在锁外将等待的事件发给订阅者"""
+        with _history_lock:
+            events, HistoryManager._pending_events = HistoryManager._pending_events, []
+            subscribers = list(HistoryManager._subscribers)
+        for event in events:
+            for callback in subscribers:
+                callback(event)
+    
+    @staticmethod
+    def _bump_generation():
+        """递增历史记录代数，并丢弃旧代数的统计缓存"""
+        HistoryManager._generation += 1
+        HistoryManager._stats_cache.clear()
+    
+    @staticmethod
+    def cache_info():
+        """
+        获取统计缓存的使用情况
+        
+        Returns:
+            dict: 包含 hits、misses、size、generation 的字典
+        """
+        return {
+            "hits": HistoryManager._stats_hits,
+            "misses": HistoryManager._stats_misses,
+            "size": len(HistoryManager._stats_cache),
+            "generation": HistoryManager._generation,
+        }
+    
+    @staticmethod
+    def _read_history_file(path=None):
+        """
+        从文件读取原始历史记录
+        
+        Args:
+            path: 历史文件路径，默认为当前的 HISTORY_FILE
+            
+        Returns:
+            list: 历史记录列表
+        """
+        if path is None:
+            path = HISTORY_FILE
+        if os.path.exists(path):
             try:
-                with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+                with open(path, 'r', encoding='utf-8') as f:
                     history = json.load(f)
                 return history
             except Exception as e:
@@ -44,7 +251,8 @@ class HistoryManager:
             return []
     
     @staticmethod
-    def add_session(start_time, end_time, planned_duration, actual_duration, status, notes=""):
+    @_locked
+    def add_session(start_time, end_time, planned_duration, actual_duration, status, notes="", extra=None):
         """
         添加专注会话记录
         
@@ -55,13 +263,15 @@ class HistoryManager:
             actual_duration: 实际时长（秒）
             status: 会话状态 (SessionStatus枚举)
             notes: 备注信息
+            extra: 附加字段字典（如分心记录），不会覆盖标准字段
         """
         # 获取当前历史记录
-        history = HistoryManager.get_history()
+        table = HistoryManager.get_table()
+        index = HistoryManager._synced_notes_index()
         
         # 创建新的会话记录
         session = {
-            "id": int(time.time() * 1000),  # 使用时间戳作为唯一ID
+            "id": HistoryManager._new_id(table),  # 跨进程唯一、按时间递增的ID
             "start_time": start_time,
             "end_time": end_time,
             "planned_duration": planned_duration,
@@ -69,98 +279,768 @@ class HistoryManager:
             "status": status.value if isinstance(status, SessionStatus) else status,
             "notes": notes
         }
+        if extra:
+            session = {**extra, **session}
         
         # 添加到历史记录
-        history.append(session)
+        table.append(session)
+        if index is not None:
+            index.add_rows(table, len(table) - 1)
         
         # 保存历史记录
-        HistoryManager._save_history(history)
+        HistoryManager._save_history(
+            table, notes_index=index, event={"type": "added", "sessions": [table.row_dict(len(table) - 1)]}
+        )
         
         return session
     
     @staticmethod
+    @_locked
+    def add_sessions(sessions):
+        """
+        批量添加会话记录，按ID去重，最后只写入一次文件
+        
+        已存在的ID以及输入中重复出现的ID会被跳过；
+        没有ID的记录会被分配一个新的ID。
+        
+        Args:
+            sessions: 会话字典的可迭代对象（可以是生成器，逐条消费）
+            
+        Returns:
+            tuple: (新增的记录数, 跳过的重复记录数)
+        """
+        table = HistoryManager.get_table()
+        index = HistoryManager._synced_notes_index()
+        start = len(table)
+        added, skipped = HistoryManager._append_sessions(table, sessions)
+        
+        # 所有记录追加完成后一次性保存
+        if added:
+            if index is not None:
+                index.add_rows(table, start)
+            HistoryManager._save_history(table, notes_index=index,
+                                         event=_change_event("added", table, range(start, len(table))))
+        
+        return added, skipped
+    
+    @staticmethod
+    def _append_sessions(table, sessions):
+        """
+        按ID去重后把会话追加到会话表（不保存）
+        
+        读取输入出错时撤销本次已追加的行后重新抛出异常。
+        
+        Returns:
+            tuple: (新增的记录数, 跳过的重复记录数)
+        """
+        start = len(table)
+        # 已有的ID通过会话表的哈希索引检查，本批次内的ID单独记录
+        batch_ids = set()
+        counts = {"added": 0, "skipped": 0}
+        
+        def fresh_sessions():
+            """逐条过滤重复记录，生成待追加的会话"""
+            for session in sessions:
+                session_id = session.get("id")
+                if session_id in (None, ""):
+                    session_id = HistoryManager._new_id(table, batch_ids)
+                    session = dict(session, id=session_id)
+                else:
+                    session_id = int(session_id)
+                    if session_id in batch_ids or table.row_of(session_id) is not None:
+                        counts["skipped"] += 1
+                        continue
+                
+                status = session.get("status", "")
+                if isinstance(status, SessionStatus):
+                    session = dict(session, status=status.value)
+                
+                batch_ids.add(session_id)
+                counts["added"] += 1
+                yield session
+        
+        try:
+            table.extend(fresh_sessions())
+        except BaseException:
+            # 读取输入出错时撤销已追加的行，内存中的表与文件、缓存和索引保持一致
+            table.truncate(start)
+            raise
+        return counts["added"], counts["skipped"]
+    
+    @staticmethod
+    @_locked
     def delete_session(session_id):
         """
         删除指定的会话记录
         
         Args:
             session_id: 会话ID
+            
+        Returns:
+            bool: 是否找到并删除了该会话
+        """
+        return HistoryManager.delete_sessions((session_id,)) > 0
+    
+    @staticmethod
+    @_locked
+    def delete_sessions(session_ids):
+        """
+        批量删除会话记录，最后只写入一次文件
+        
+        每个ID通过哈希索引定位，只删除一条记录（旧版本可能留下重复的ID）。
+        
+        Args:
+            session_ids: 会话ID的可迭代对象
+            
+        Returns:
+            int: 删除的记录数
         """
         # 获取当前历史记录
-        history = HistoryManager.get_history()
+        table = HistoryManager.get_table()
+        index = HistoryManager._synced_notes_index()
         
-        # 过滤掉要删除的会话
-        history = [session for session in history if session.get("id") != session_id]
+        # 按ID定位要删除的行
+        rows = HistoryManager._rows_of(table, session_ids)
+        if not rows:
+            return 0
+        event = _change_event("deleted", table, rows)
+        if index is not None:
+            index.remove_rows(rows)
+        table.delete_rows(rows)
         
         # 保存历史记录
-        HistoryManager._save_history(history)
+        HistoryManager._save_history(table, notes_index=index, event=event)
+        return len(rows)
+    
+    @staticmethod
+    @_locked
+    def apply_changes(sessions=(), delete_ids=()):
+        """
+        删除和添加会话记录，最后只写入一次文件（目录同步合并远程变化时使用）
+        
+        先删除再添加，添加时按ID去重（与 add_sessions 相同）。
+        同时有删除和添加时订阅者收到 reset 事件。
+        
+        Args:
+            sessions: 要添加的会话字典的可迭代对象
+            delete_ids: 要删除的会话ID的可迭代对象
+            
+        Returns:
+            tuple: (新增的记录数, 删除的记录数)
+        """
+        table = HistoryManager.get_table()
+        index = HistoryManager._synced_notes_index()
+        
+        rows = HistoryManager._rows_of(table, delete_ids)
+        if rows:
+            event = _change_event("deleted", table, rows)
+            if index is not None:
+                index.remove_rows(rows)
+            table.delete_rows(rows)
+        
+        start = len(table)
+        try:
+            added, _ = HistoryManager._append_sessions(table, sessions)
+        except BaseException:
+            if rows:
+                # 删除尚未保存，丢弃内存中的表和索引，下次访问重新从文件加载
+                HistoryManager._table = None
+                HistoryManager._notes_index = None
+            raise
+        
+        if added:
+            if index is not None:
+                index.add_rows(table, start)
+            event = {"type": "reset"} if rows else _change_event("added", table, range(start, len(table)))
+        if rows or added:
+            HistoryManager._save_history(table, notes_index=index, event=event)
+        return added, len(rows)
+    
+    @staticmethod
+    def _rows_of(table, session_ids):
+        """
+        按ID定位会话所在的行（每个ID只取一行，旧版本可能留下重复的ID）
+        
+        Returns:
+            list: 升序排列的行号
+        """
+        return sorted({row for row in map(table.row_of, session_ids) if row is not None})
+    
+    @staticmethod
+    @_locked
+    def get_session(session_id):
+        """
+        按ID获取会话记录（哈希索引，O(1)）
+        
+        Args:
+            session_id: 会话ID
+            
+        Returns:
+            dict: 会话字典，不存在时返回None
+        """
+        table = HistoryManager.get_table()
+        row = table.row_of(session_id)
+        return None if row is None else table.row_dict(row)
+    
+    @staticmethod
+    @_locked
+    def has_session(session_id):
+        """
+        检查会话ID是否存在（哈希索引，O(1)）
+        
+        Args:
+            session_id: 会话ID
+            
+        Returns:
+            bool: 是否存在
+        """
+        return HistoryManager.get_table().row_of(session_id) is not None
+    
+    @staticmethod
+    @_locked
+    def get_id_allocator():
+        """
+        获取当前历史文件的会话ID分配器
+        
+        Returns:
+            IdAllocator: 分配器
+        """
+        allocator = HistoryManager._id_allocator
+        path = f"{HISTORY_FILE}.ids"
+        if allocator is None or allocator.path != path:
+            allocator = HistoryManager._id_allocator = IdAllocator(path)
+        return allocator
+    
+    @staticmethod
+    def _new_id(table, taken=()):
+        """
+        分配一个新的会话ID（在锁内调用）
+        
+        分配器保证跨进程唯一；与已有记录（例如从其他机器合并的记录）
+        或本批次中已使用的ID冲突时重新分配。
+        
+        Args:
+            table: 当前会话表
+            taken: 本批次中已使用的ID集合
+            
+        Returns:
+            int: 会话ID
+        """
+        allocator = HistoryManager.get_id_allocator()
+        while True:
+            session_id = allocator.allocate()
+            if session_id not in taken and table.row_of(session_id) is None:
+                return session_id
     
     @staticmethod
+    @_locked
     def clear_history():
         """清除所有历史记录"""
-        HistoryManager._save_history([])
+        HistoryManager._save_history(SessionTable(), notes_index=NotesIndex())
     
     @staticmethod
-    def _save_history(history):
+    @_locked
+    def _save_history(history, notes_index=None, event=None):
         """
         保存历史记录到文件
         
         Args:
-            history: 历史记录列表
+            history: 会话表（SessionTable）或历史记录列表
+            notes_index: 已与 history 同步的备注索引，随历史记录一起保存；
+                         为None时丢弃旧索引，下次搜索时重新构建
+            event: 保存成功后通知订阅者的变化事件，默认为 reset
         """
+        if not isinstance(history, SessionTable):
+            history = SessionTable.from_dicts(history)
+        
         try:
             # 确保目录存在
             os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
             
             with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2)
+                _write_history_file(history, f)
         except Exception as e:
             print(f"Error saving history file: {e}")
+            # 写入失败时丢弃内存中的表，下次访问重新从文件加载
+            HistoryManager._table = None
+            HistoryManager._notes_index = None
+            return
+        
+        HistoryManager._table = history
+        HistoryManager._table_signature = _file_signature(HISTORY_FILE)
+        HistoryManager._bump_generation()
+        HistoryManager._post_event(event or {"type": "reset"})
+        
+        HistoryManager._notes_index = notes_index
+        if notes_index is not None:
+            notes_index.generation = HistoryManager._generation
+            HistoryManager._save_notes_index(notes_index)
+    
+    @staticmethod
+    @_locked
+    def search_notes(query, limit=None):
+        """
+        按备注全文搜索会话
+        
+        查询中的每个词按前缀匹配，所有词都匹配的会话才会返回。
+        
+        Args:
+            query: 查询文本
+            limit: 返回的最大记录数，None 表示不限制
+            
+        Returns:
+            tuple: (匹配的总数, 会话字典列表)，最近添加的在前
+        """
+        table = HistoryManager.get_table()
+        total, rows = HistoryManager._get_notes_index().search(query, table, limit)
+        return total, [table.row_dict(i) for i in rows]
     
     @staticmethod
-    def get_statistics(days=30):
+    @_locked
+    def query(status=None, start=None, end=None, order="desc", limit=None, offset=0):
+        """
+        按条件查询会话，结果按开始时间排序并分页
+        
+        时间范围在按开始时间排序的行号上二分定位，状态按编码在列上比较，
+        只有返回的那一页会被转换为字典。结果是惰性迭代器；迭代期间
+        历史记录被修改时抛出 RuntimeError。
+        
+        Args:
+            status: 状态（字符串或 SessionStatus），也可以是多个状态的集合；None 表示不限
+            start: 开始时间下限（包含），None 表示不限
+            end: 开始时间上限（不包含），None 表示不限
+            order: "desc" 最近的在前，"asc" 最早的在前
+            limit: 返回的最大记录数，None 表示不限制
+            offset: 跳过的记录数
+            
+        Returns:
+            iterator: 会话字典的迭代器
+        """
+        if order not in ("asc", "desc"):
+            raise ValueError(f"order must be 'asc' or 'desc', not {order!r}")
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit and offset must be >= 0")
+        
+        table, rows, codes = HistoryManager._select(status, start, end)
+        stop = None if limit is None else offset + limit
+        if codes is None:
+            # 没有状态条件时直接在行号上切片（倒序时从末尾切片，不复制整个行号序列）
+            if order == "desc":
+                size = len(rows)
+                rows = rows[max(size - (size if stop is None else stop), 0):max(size - offset, 0)][::-1]
+            else:
+                rows = rows[offset:stop]
+        else:
+            status_codes = table.status_codes
+            if order == "desc":
+                rows = reversed(rows)
+            rows = itertools.islice((row for row in rows if status_codes[row] in codes), offset, stop)
+        return _iter_rows(table, rows, HistoryManager._generation)
+    
+    @staticmethod
+    @_locked
+    def count(status=None, start=None, end=None):
+        """
+        统计符合条件的会话数，条件与 query 相同
+        
+        Returns:
+            int: 会话数
+        """
+        table, rows, codes = HistoryManager._select(status, start, end)
+        if codes is None:
+            return len(rows)
+        if isinstance(rows, range):
+            # 行号连续时直接在状态列的切片上计数
+            status_codes = table.status_codes[rows.start:rows.stop]
+            return sum(status_codes.count(code) for code in codes)
+        status_codes = table.status_codes
+        return sum(1 for row in rows if status_codes[row] in codes)
+    
+    @staticmethod
+    def _select(status, start, end):
+        """
+        按时间范围和状态条件定位候选行
+        
+        Returns:
+            tuple: (会话表, 按开始时间升序的候选行号, 状态编码集合或None)
+        """
+        table = HistoryManager.get_table()
+        rows, starts = HistoryManager._sorted_rows(table)
+        lo = 0 if start is None else bisect.bisect_left(starts, start)
+        hi = len(starts) if end is None else bisect.bisect_left(starts, end)
+        rows = rows[lo:max(lo, hi)]
+        
+        codes = None
+        if status is not None:
+            if isinstance(status, (str, SessionStatus)):
+                status = (status,)
+            codes = {table.status_pool.code_of(_status_value(value)) for value in status}
+            codes.discard(None)
+        return table, rows, codes
+    
+    @staticmethod
+    def _sorted_rows(table):
+        """
+        获取按开始时间升序排列的行号及对应的开始时间，按代数缓存
+        
+        会话通常按时间顺序追加，此时行号就是 range，不需要排序。
+        
+        Returns:
+            tuple: (行号序列, 开始时间序列)
+        """
+        cached = HistoryManager._start_order
+        if cached is not None and cached[0] == HistoryManager._generation:
+            return cached[1], cached[2]
+        
+        starts = table.start_times
+        if all(map(operator.le, starts, itertools.islice(starts, 1, None))):
+            rows = range(len(starts))
+            sorted_starts = starts
+        else:
+            rows = array("I", sorted(range(len(starts)), key=starts.__getitem__))
+            sorted_starts = array("d", (starts[row] for row in rows))
+        HistoryManager._start_order = (HistoryManager._generation, rows, sorted_starts)
+        return rows, sorted_starts
+    
+    @staticmethod
+    def _synced_notes_index():
+        """
+        获取与当前会话表同步的备注索引，用于增量维护
+        
+        Returns:
+            NotesIndex: 索引，尚未加载或已过期时返回None
+        """
+        index = HistoryManager._notes_index
+        if index is not None and index.generation == HistoryManager._generation:
+            return index
+        return None
+    
+    @staticmethod
+    @_locked
+    def _get_notes_index():
+        """
+        获取备注索引：优先使用内存中的索引，其次读取索引文件，最后从会话表构建
+        
+        Returns:
+            NotesIndex: 索引
+        """
+        table = HistoryManager.get_table()
+        index = HistoryManager._synced_notes_index()
+        if index is not None:
+            return index
+        
+        index = NotesIndex.load(_notes_index_file(), HistoryManager._table_signature)
+        if index is None:
+            index = NotesIndex.build(table)
+            HistoryManager._save_notes_index(index)
+        index.generation = HistoryManager._generation
+        HistoryManager._notes_index = index
+        return index
+    
+    @staticmethod
+    def _save_notes_index(index):
+        """将备注索引保存到历史文件旁边（历史文件不存在时不保存）"""
+        signature = HistoryManager._table_signature
+        if signature is None:
+            return
+        try:
+            index.save(_notes_index_file(), signature)
+        except OSError as e:
+            print(f"Error saving notes index: {e}")
+    
+    @staticmethod
+    @_locked
+    def get_statistics(days=30, now=None, table=None):
         """
         获取过去指定天数的统计数据
         
+        结果按 (days, 历史记录代数) 缓存。写入历史记录会使缓存失效；
+        时间范围内最早的会话滑出统计窗口时，对应的缓存也会失效。
+        
         Args:
             days: 要统计的天数
+            now: 统计窗口的终点时间戳，默认为当前时间；指定时不使用缓存
+            table: 会话表，默认使用当前历史文件的会话表；指定时不使用缓存
             
         Returns:
             dict: 包含统计信息的字典
         """
-        # 获取历史记录
-        history = HistoryManager.get_history()
+        # 指定时间点或会话表时不使用缓存，也不计入缓存命中统计
+        use_cache = now is None and table is None
+        
+        # 获取紧凑会话表
+        if table is None:
+            table = HistoryManager.get_table()
         
         # 计算截止时间点（过去days天的起始时间）
+        if now is None:
+            now = time.time()
+        
+        # 查询缓存
+        key = (days, HistoryManager._generation)
+        if use_cache:
+            cached = HistoryManager._stats_cache.get(key)
+            if cached is not None and now < cached[1]:
+                HistoryManager._stats_hits += 1
+                return dict(cached[0])
+            HistoryManager._stats_misses += 1
+        
+        window_days = 2000*365 if days == 0 else days
+        cutoff_time = now - (window_days * 24 * 60 * 60)
+        
+        # 按列扫描时间范围内的会话记录
+        counts = _aggregate_statistics(
+            table.start_times, table.status_codes, table.actual_durations,
+            cutoff_time, _status_codes(table)
+        )
+        
+        result = _finalize_statistics(counts, window_days)
+        if not use_cache:
+            return result
+        
+        # 最早的会话滑出统计窗口之前结果保持不变
+        earliest = counts[-1]
+        expires_at = earliest + window_days * 24 * 60 * 60 if earliest is not None else float("inf")
+        HistoryManager._stats_cache[key] = (result, expires_at)
+        return dict(result)
+    
+    @staticmethod
+    def get_statistics_parallel(days=30, workers=None, min_chunk_size=50000, executor=None):
+        """
+        分块并行计算统计数据，结果与 get_statistics 完全一致
+        
+        会话表按行切分为若干块，各块在进程池中分别汇总，最后合并部分结果。
+        适用于由多台机器导出合并而成的超大历史记录。
+        
+        Args:
+            days: 要统计的天数
+            workers: 工作进程数，默认为CPU核数
+            min_chunk_size: 每块的最少会话数，避免小历史记录被切得过碎
+            executor: 可复用的 concurrent.futures.Executor，默认临时创建进程池
+            
+        Returns:
+            dict: 包含统计信息的字典
+        """
+        # 只在锁内复制需要的列，计算期间不阻塞界面、计时器和写入
+        start_times, status_codes, actual_durations, codes = HistoryManager._statistics_columns()
+        
+        # 截止时间在主进程中计算一次，保证各块使用同一时间点
         now = time.time()
         if days == 0:
             days = 2000*365
         cutoff_time = now - (days * 24 * 60 * 60)
         
-        # 筛选时间范围内的会话记录
-        recent_sessions = [s for s in history if s.get("start_time", 0) >= cutoff_time]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        size = len(start_times)
+        chunk_count = max(1, min(workers * 4, size // max(1, min_chunk_size)))
         
-        # 计算统计数据
-        total_sessions = len(recent_sessions)
-        completed_sessions = len([s for s in recent_sessions if s.get("status") == SessionStatus.COMPLETED.value])
-        failed_sessions = len([s for s in recent_sessions if s.get("status") == SessionStatus.FAILED.value])
-        interrupted_sessions = len([s for s in recent_sessions if s.get("status") == SessionStatus.INTERRUPTED.value])
+        # 单块时直接在当前进程计算
+        if chunk_count == 1 or (workers <= 1 and executor is None):
+            counts = _aggregate_statistics(start_times, status_codes, actual_durations, cutoff_time, codes)
+            return _finalize_statistics(counts, days)
         
-        # 计算总专注时间
-        total_focus_time = sum(s.get("actual_duration", 0) for s in recent_sessions)
+        # 按行切分列（array 切片以紧凑的二进制形式传给子进程）
+        step = -(-size // chunk_count)
+        chunks = [
+            (start_times[i:i + step], status_codes[i:i + step],
+             actual_durations[i:i + step], cutoff_time, codes)
+            for i in range(0, size, step)
+        ]
         
-        # 计算完成率
-        completion_rate = (completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
+        if executor is None:
+            # 延迟导入，避免只读取统计的命令行工具承担进程池模块的导入开销
+            import concurrent.futures
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(_aggregate_statistics, *zip(*chunks)))
+        else:
+            partials = list(executor.map(_aggregate_statistics, *zip(*chunks)))
         
-        return {
-            "total_sessions": total_sessions,
-            "completed_sessions": completed_sessions,
-            "failed_sessions": failed_sessions,
-            "interrupted_sessions": interrupted_sessions,
-            "total_focus_time": total_focus_time,
-            "completion_rate": completion_rate,
-            "days": days
-        }
+        # 合并部分结果
+        counts = tuple(sum(values) for values in zip(*(partial[:-1] for partial in partials)))
+        return _finalize_statistics(counts, days)
+
+    
+    @staticmethod
+    @_locked
+    def _statistics_columns():
+        """
+        复制统计所需的列
+        
+        Returns:
+            tuple: (开始时间列, 状态编码列, 实际时长列, (完成, 放弃, 打断) 的状态编码)
+        """
+        table = HistoryManager.get_table()
+        return (array(table.start_times.typecode, table.start_times),
+                array(table.status_codes.typecode, table.status_codes),
+                array(table.actual_durations.typecode, table.actual_durations),
+                _status_codes(table))
+
+
+def _write_history_file(table, f):
+    """
+    将会话表以JSON数组格式流式写入文件，每条记录占一行
+    
+    逐行编码，不需要在内存中构造完整的字典列表。
+    
+    Args:
+        table: 会话表
+        f: 已打开的文本文件
+    """
+    f.write("[\n")
+    f.writelines(
+        (",\n" if i else "") + line
+        for i, line in enumerate(table.iter_json())
+    )
+    f.write("\n]\n")
+
+
+def _change_event(event_type, table, rows):
+    """
+    生成新增或删除的变化事件，会话过多时改为 reset
+    
+    Args:
+        event_type: "added" 或 "deleted"
+        table: 会话表
+        rows: 变化的行号序列
+        
+    Returns:
+        dict: 变化事件
+    """
+    if len(rows) <= MAX_EVENT_SESSIONS:
+        return {"type": event_type, "sessions": [table.row_dict(i) for i in rows]}
+    return {"type": "reset"}
+
+
+def _status_codes(table):
+    """
+    获取会话表中三种状态的编码
+    
+    Args:
+        table: 会话表
+        
+    Returns:
+        tuple: (完成, 放弃, 打断) 的状态编码，不存在的状态为None
+    """
+    pool = table.status_pool
+    return (
+        pool.code_of(SessionStatus.COMPLETED.value),
+        pool.code_of(SessionStatus.FAILED.value),
+        pool.code_of(SessionStatus.INTERRUPTED.value),
+    )
+
+
+def _aggregate_statistics(start_times, status_codes, actual_durations, cutoff_time, codes):
+    """
+    汇总一段会话列的统计计数（模块级函数，可被子进程调用）
+    
+    Args:
+        start_times: 开始时间列
+        status_codes: 状态编码列
+        actual_durations: 实际时长列
+        cutoff_time: 截止时间点
+        codes: (完成, 放弃, 打断) 的状态编码
+        
+    Returns:
+        tuple: (总数, 完成数, 放弃数, 打断数, 总专注时间, 范围内最早的开始时间)
+    """
+    completed_code, failed_code, interrupted_code = codes
+    earliest = None
+    total_sessions = 0
+    completed_sessions = 0
+    failed_sessions = 0
+    interrupted_sessions = 0
+    total_focus_time = 0
+    for start_time, status_code, actual_duration in zip(start_times, status_codes, actual_durations):
+        if start_time < cutoff_time:
+            continue
+        if earliest is None or start_time < earliest:
+            earliest = start_time
+        total_sessions += 1
+        total_focus_time += actual_duration
+        if status_code == completed_code:
+            completed_sessions += 1
+        elif status_code == failed_code:
+            failed_sessions += 1
+        elif status_code == interrupted_code:
+            interrupted_sessions += 1
+    return (total_sessions, completed_sessions, failed_sessions, interrupted_sessions, total_focus_time, earliest)
+
+
+def _finalize_statistics(counts, days):
+    """
+    由汇总计数生成统计结果字典
+    
+    Args:
+        counts: _aggregate_statistics 返回的计数元组
+        days: 统计天数
+        
+    Returns:
+        dict: 包含统计信息的字典
+    """
+    total_sessions, completed_sessions, failed_sessions, interrupted_sessions, total_focus_time = counts[:5]
+    
+    # 计算完成率
+    completion_rate = (completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
+    
+    return {
+        "total_sessions": total_sessions,
+        "completed_sessions": completed_sessions,
+        "failed_sessions": failed_sessions,
+        "interrupted_sessions": interrupted_sessions,
+        "total_focus_time": total_focus_time,
+        "completion_rate": completion_rate,
+        "days": days
+    }
+
+
+def _iter_rows(table, rows, generation):
+    """
+    逐行转换为会话字典，迭代期间历史记录被修改时抛出 RuntimeError
+    
+    Args:
+        table: 会话表
+        rows: 行号的可迭代对象
+        generation: 查询时的历史记录代数
+    """
+    rows = iter(rows)
+    while True:
+        # 行号的筛选同样读取会话表，需要在锁内推进
+        with _history_lock:
+            if HistoryManager._generation != generation:
+                raise RuntimeError("history changed during query")
+            row = next(rows, None)
+            if row is None:
+                return
+            session = table.row_dict(row)
+        yield session
+
+
+def _status_value(status):
+    """状态的字符串值"""
+    return status.value if isinstance(status, SessionStatus) else status
+
+
+def _notes_index_file():
+    """备注索引文件路径（历史文件旁边）"""
+    return f"{HISTORY_FILE}.idx"
+
+
+def _file_signature(path):
+    """
+    获取文件签名，用于判断文件是否被修改
+    
+    Args:
+        path: 文件路径
+        
+    Returns:
+        tuple: (inode, 修改时间, 大小)，文件不存在时返回None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
 
 
 def format_timestamp(timestamp):
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+会话ID分配
+
+ID按时间递增，由毫秒时间戳、节点号和序号组成:
+    id = 毫秒时间戳 << 10 | 节点号（6位）<< 4 | 序号（4位）
+
+- 节点号在每个历史文件首次分配ID时随机生成并保存。通过共享目录同步的
+  机器在清单中公布各自的节点号，同步时发现与其他机器重复会改用未被占用的
+  节点号（set_node），因此同步的机器即使在同一毫秒内新增会话，ID也不会相同；
+- 上次分配到的位置保存在历史文件旁边（<历史文件>.ids），读写时加文件锁，
+  同一历史文件的多个进程（界面、命令行导入、多个实例）不会分配到相同的ID，
+  系统时间回拨时也保持递增；
+- 每次加锁预留一批ID，批量导入时不必为每条记录读写一次文件。
+
+新ID都大于旧版本以毫秒时间戳作为ID的记录，在 JSON 中可以精确表示（2^53 以内）
+直到2248年。
+"""
+
+import os
+import json
+import time
+import random
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 节点号和序号的位数
+NODE_BITS = 6
+SEQUENCE_BITS = 4
+
+# 每次加锁预留的ID数
+BLOCK_SIZE = 64
+
+_SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+
+class IdAllocator:
+    """跨进程唯一、按时间递增的会话ID分配器"""
+
+    def __init__(self, path, block_size=BLOCK_SIZE):
+        """
+        初始化分配器
+
+        Args:
+            path: 分配状态文件路径
+            block_size: 每次加锁预留的ID数
+        """
+        self.path = path
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._node = None
+        # 已预留、尚未使用的刻度范围 [next, end)，刻度 = 毫秒时间戳 << SEQUENCE_BITS | 序号
+        self._next = 0
+        self._end = 0
+
+    def allocate(self):
+        """
+        分配一个新的ID
+
+        Returns:
+            int: 会话ID
+        """
+        with self._lock:
+            now_tick = int(time.time() * 1000) << SEQUENCE_BITS
+            # 预留的ID用完，或者已经落后于当前时间（保持ID与时间大致对应）时重新预留
+            if self._next >= self._end or self._next < now_tick:
+                self._reserve(now_tick)
+            tick = self._next
+            self._next += 1
+        return (tick >> SEQUENCE_BITS) << (NODE_BITS + SEQUENCE_BITS) | self._node << SEQUENCE_BITS | tick & _SEQUENCE_MASK
+
+    def get_node(self):
+        """
+        获取本分配器的节点号（首次调用时从状态文件读取或生成）
+
+        Returns:
+            int: 节点号
+        """
+        with self._lock:
+            if self._node is None:
+                self._reserve(int(time.time() * 1000) << SEQUENCE_BITS)
+            return self._node
+
+    def set_node(self, node):
+        """
+        改用另一个节点号（例如与同步的其他机器重复时），写入状态文件
+
+        同一历史文件的其他进程在下次预留ID时读到新的节点号。
+
+        Args:
+            node: 节点号，0 到 2**NODE_BITS - 1
+        """
+        if not 0 <= node < 1 << NODE_BITS:
+            raise ValueError(f"node must be in [0, {1 << NODE_BITS}), not {node}")
+        with self._lock:
+            try:
+                with _locked_file(self.path) as f:
+                    state = _parse_state(f.read())
+                    state["node"] = node
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state).encode("utf-8"))
+            except OSError as e:
+                print(f"Error updating session id state: {e}")
+            self._node = node
+
+    def _reserve(self, now_tick):
+        """在文件锁内读取上次分配到的位置，预留一批刻度并写回"""
+        try:
+            with _locked_file(self.path) as f:
+                state = _parse_state(f.read())
+                node = state.get("node")
+                if not isinstance(node, int) or not 0 <= node < 1 << NODE_BITS:
+                    node = random.randrange(1 << NODE_BITS)
+                start = max(now_tick, int(state.get("last", -1)) + 1, self._end)
+                end = start + self.block_size
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({"node": node, "last": end - 1}).encode("utf-8"))
+        except OSError as e:
+            # 状态文件不可用时退化为进程内分配，仍然在进程内保持唯一和递增
+            print(f"Error updating session id state: {e}")
+            node = self._node if self._node is not None else random.randrange(1 << NODE_BITS)
+            start = max(now_tick, self._end)
+            end = start + self.block_size
+        self._node = node
+        self._next = start
+        self._end = end
+
+
+def _parse_state(data):
+    """解析分配状态，损坏时返回空字典"""
+    try:
+        state = json.loads(data.decode("utf-8")) if data else {}
+    except ValueError:
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+@contextlib.contextmanager
+def _locked_file(path):
+    """以读写方式打开（不存在时创建）文件并加排他锁"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, "r+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield f
+        finally:
+            f.flush()
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+会话备注的全文索引
+
+每个词对应一个按升序排列的行号数组（array('I')）。备注在会话表中已经驻留，
+构建索引时相同的备注只分词一次。
+
+查询时每个词按前缀匹配排序的词表（适合边输入边搜索），各词的结果取交集。
+中日韩文字没有空格分词，按单个字符建立索引，匹配后再检查原文是否包含查询文本。
+
+索引随历史记录增删增量维护，并以二进制文件保存在历史文件旁边；
+文件中记录了对应历史文件的签名，不一致时重新构建。
+"""
+
+import re
+import sys
+import bisect
+import struct
+import itertools
+from array import array
+
+_MAGIC = b"FFNI"
+_VERSION = 2
+_HEADER = struct.Struct("<4sHqqI")
+# 词的字节长度和行数（长度用32位，备注中很长的连续文字也能保存）
+_ENTRY = struct.Struct("<II")
+
+# 中日韩文字逐字索引，其余文字按连续的字母数字切分
+_CJK = "\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"[{_CJK}]|[^\W_{_CJK}]+")
+_CJK_RUN_RE = re.compile(rf"[{_CJK}]{{2,}}")
+
+
+def tokenize(text):
+    """
+    将文本切分为小写的词
+
+    Args:
+        text: 文本
+
+    Returns:
+        list: 词列表
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class NotesIndex:
+    """会话备注的倒排索引"""
+
+    def __init__(self):
+        # 词 -> 行号数组（升序）
+        self.token_rows = {}
+        # 索引对应的历史记录代数，由 HistoryManager 维护
+        self.generation = None
+        # 排序的词表，用于前缀匹配；新增或删除词后重新生成
+        self._vocab = None
+
+    @classmethod
+    def build(cls, table):
+        """
+        从会话表构建索引
+
+        Args:
+            table: SessionTable
+
+        Returns:
+            NotesIndex: 索引
+        """
+        index = cls()
+        index.add_rows(table, 0)
+        return index
+
+    def add_rows(self, table, start):
+        """
+        索引会话表中从 start 开始的新行
+
+        Args:
+            table: SessionTable
+            start: 第一个新行的行号
+        """
+        # 先按备注分组，每条不同的备注只分词一次
+        groups = {}
+        note_codes = table.note_codes
+        for row in range(start, len(note_codes)):
+            rows = groups.get(note_codes[row])
+            if rows is None:
+                groups[note_codes[row]] = [row]
+            else:
+                rows.append(row)
+
+        notes = table.note_pool.values
+        new_rows = {}
+        for code, rows in groups.items():
+            for token in set(tokenize(notes[code])):
+                runs = new_rows.get(token)
+                if runs is None:
+                    new_rows[token] = [rows]
+                else:
+                    runs.append(rows)
+
+        # 新行号都大于已有的行号，直接追加；多个分组的行号合并排序（各分组内已有序）
+        token_rows = self.token_rows
+        for token, runs in new_rows.items():
+            merged = runs[0] if len(runs) == 1 else sorted(itertools.chain.from_iterable(runs))
+            rows = token_rows.get(token)
+            if rows is None:
+                token_rows[token] = array("I", merged)
+                self._vocab = None
+            else:
+                rows.extend(merged)
+
+    def remove_rows(self, removed):
+        """
+        删除行后更新行号（行号大于被删除行的记录依次前移）
+
+        Args:
+            removed: 被删除的行号，升序
+        """
+        if not removed:
+            return
+        removed_set = set(removed)
+        first = removed[0]
+        for token, rows in list(self.token_rows.items()):
+            # 行号升序，只需处理第一个被删除行之后的部分
+            split = bisect.bisect_left(rows, first)
+            if split == len(rows):
+                continue
+            tail = [row - bisect.bisect_left(removed, row) for row in rows[split:] if row not in removed_set]
+            del rows[split:]
+            rows.extend(tail)
+            if not rows:
+                del self.token_rows[token]
+                self._vocab = None
+
+    def search(self, query, table, limit=None):
+        """
+        查找备注包含查询中所有词（按前缀匹配）的行
+
+        Args:
+            query: 查询文本
+            table: 索引对应的会话表
+            limit: 返回的最大行数，None 表示不限制
+
+        Returns:
+            tuple: (匹配的总行数, 行号列表)，行号按降序（最近添加的在前）
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return 0, []
+
+        # 每个词的候选行：只有一个词表项匹配时直接使用其行号数组
+        matches = []
+        for term in terms:
+            postings = self._match_prefix(term)
+            if not postings:
+                return 0, []
+            matches.append(postings[0] if len(postings) == 1 else set().union(*postings))
+        matches.sort(key=len)
+
+        if len(matches) == 1 and isinstance(matches[0], array):
+            rows = matches[0]
+        else:
+            candidates = set(matches[0])
+            for other in matches[1:]:
+                candidates.intersection_update(other)
+            rows = sorted(candidates)
+
+        # 中日韩文字逐字索引，需要确认原文中连续出现
+        phrases = _CJK_RUN_RE.findall(query.lower())
+        if phrases:
+            notes = table.note_pool.values
+            note_codes = table.note_codes
+            verified = {}
+            kept = []
+            for row in rows:
+                code = note_codes[row]
+                ok = verified.get(code)
+                if ok is None:
+                    text = notes[code].lower()
+                    ok = verified[code] = all(phrase in text for phrase in phrases)
+                if ok:
+                    kept.append(row)
+            rows = kept
+
+        total = len(rows)
+        if limit is not None:
+            rows = rows[-limit:] if limit else rows[:0]
+        return total, list(reversed(rows))
+
+    def save(self, path, signature):
+        """
+        保存索引
+
+        Args:
+            path: 索引文件路径
+            signature: 对应历史文件的 (inode, mtime_ns, size) 签名
+        """
+        _, mtime_ns, size = signature
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, mtime_ns, size, len(self.token_rows)))
+            for token, rows in self.token_rows.items():
+                encoded = token.encode("utf-8")
+                f.write(_ENTRY.pack(len(encoded), len(rows)))
+                f.write(encoded)
+                if sys.byteorder != "little":
+                    rows = array("I", rows)
+                    rows.byteswap()
+                rows.tofile(f)
+
+    @classmethod
+    def load(cls, path, signature):
+        """
+        读取索引，文件不存在、损坏或与历史文件不一致时返回None
+
+        Args:
+            path: 索引文件路径
+            signature: 当前历史文件的 (inode, mtime_ns, size) 签名
+
+        Returns:
+            NotesIndex: 索引
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            magic, version, mtime_ns, size, count = _HEADER.unpack_from(data, 0)
+            if magic != _MAGIC or version != _VERSION or signature is None or (mtime_ns, size) != signature[1:]:
+                return None
+
+            index = cls()
+            token_rows = index.token_rows
+            offset = _HEADER.size
+            for _ in range(count):
+                token_length, row_count = _ENTRY.unpack_from(data, offset)
+                offset += _ENTRY.size
+                token = data[offset:offset + token_length].decode("utf-8")
+                offset += token_length
+                rows = array("I")
+                rows.frombytes(data[offset:offset + 4 * row_count])
+                offset += 4 * row_count
+                if sys.byteorder != "little":
+                    rows.byteswap()
+                token_rows[token] = rows
+            if offset != len(data):
+                return None
+        except (struct.error, UnicodeDecodeError, ValueError):
+            return None
+        return index
+
+    def _match_prefix(self, term):
+        """以 term 为前缀的所有词的行号数组"""
+        if self._vocab is None:
+            self._vocab = sorted(self.token_rows)
+        vocab = self._vocab
+        postings = []
+        i = bisect.bisect_left(vocab, term)
+        while i < len(vocab) and vocab[i].startswith(term):
+            postings.append(self.token_rows[vocab[i]])
+            i += 1
+        return postings
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+用户配置（多用户共用一台机器）
+
+每个用户配置有自己的历史文件、配置文件和计时器检查点，保存在 PROFILES_DIR/<名称>/ 下；
+默认配置 "default" 沿用原来主目录中的文件。启动时通过 --profile 选择，
+运行中可用 switch_profile 切换，HistoryManager 和配置存储随之改用新的文件。
+
+跨用户的统计不重新扫描各用户的会话：每个历史文件旁边保存一份按天汇总的
+计数（<历史文件>.rollup），记录对应历史文件的签名。历史文件没有变化时
+只读取汇总（内存中已有时连汇总文件也不读），有变化的用户才重新汇总一次。
+"""
+
+import os
+import re
+import json
+import time
+import datetime
+import threading
+
+from app.utils import config, history
+from app.utils.history import HistoryManager, SessionStatus, _finalize_statistics, _file_signature
+from app.utils.session_table import SessionTable
+
+# 用户配置目录
+PROFILES_DIR = os.path.join(os.path.expanduser("~"), ".focus_forest_profiles")
+
+# 默认配置，使用主目录中原有的历史文件和配置文件
+DEFAULT_PROFILE = "default"
+
+# 配置名称只允许字母、数字、下划线、点和短横线，不能以点开头
+_NAME_RE = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]{0,63}")
+
+# 按天汇总文件的格式版本
+_ROLLUP_VERSION = 1
+
+# 按天汇总的计数: (总数, 完成数, 放弃数, 打断数, 总专注时间)
+_STATUS_COLUMNS = {
+    SessionStatus.COMPLETED.value: 1,
+    SessionStatus.FAILED.value: 2,
+    SessionStatus.INTERRUPTED.value: 3,
+}
+
+# 当前配置的名称
+_current = DEFAULT_PROFILE
+
+# 内存中的按天汇总 {历史文件路径: (历史文件签名, {日序号: [计数...]})}
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def profile_paths(name):
+    """
+    获取用户配置的历史文件和配置文件路径
+
+    Args:
+        name: 配置名称
+
+    Returns:
+        tuple: (历史文件路径, 配置文件路径)
+    """
+    if name == DEFAULT_PROFILE:
+        return (os.path.join(os.path.expanduser("~"), ".focus_forest_history.json"),
+                os.path.join(os.path.expanduser("~"), ".focus_forest_config.json"))
+    _check_name(name)
+    directory = os.path.join(PROFILES_DIR, name)
+    return os.path.join(directory, "history.json"), os.path.join(directory, "config.json")
+
+
+def checkpoint_path(name):
+    """
+    获取用户配置的计时器检查点文件路径
+
+    每个配置的检查点单独保存，某个配置中异常退出的会话只在该配置中恢复。
+
+    Args:
+        name: 配置名称
+
+    Returns:
+        str: 检查点文件路径
+    """
+    if name == DEFAULT_PROFILE:
+        return os.path.join(os.path.expanduser("~"), ".focus_forest_timer.ckpt")
+    _check_name(name)
+    return os.path.join(PROFILES_DIR, name, "timer.ckpt")
+
+
+def list_profiles():
+    """
+    列出所有用户配置
+
+    Returns:
+        list: 配置名称，默认配置在最前
+    """
+    names = []
+    try:
+        with os.scandir(PROFILES_DIR) as entries:
+            for entry in entries:
+                if entry.is_dir() and _NAME_RE.fullmatch(entry.name) and entry.name != DEFAULT_PROFILE:
+                    names.append(entry.name)
+    except OSError:
+        pass
+    return [DEFAULT_PROFILE] + sorted(names)
+
+
+def current_profile():
+    """
+    获取当前用户配置的名称
+
+    Returns:
+        str: 配置名称
+    """
+    return _current
+
+
+def switch_profile(name):
+    """
+    切换用户配置：HistoryManager 和全局配置存储改用该配置的文件
+
+    配置不存在时创建其目录。历史记录订阅者收到 reset 事件，
+    配置订阅者收到两个配置之间发生变化的配置项。
+
+    Args:
+        name: 配置名称
+
+    Raises:
+        ValueError: 配置名称不合法
+    """
+    global _current
+    history_path, config_path = profile_paths(name)
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    HistoryManager.set_history_file(history_path)
+    config.get_store().switch(config_path)
+    _current = name
+
+
+def get_aggregate_statistics(days=30, now=None, profiles=None):
+    """
+    汇总多个用户配置的统计数据
+
+    统计窗口按自然日计算：截至 now 所在日的最近 days 天（0 表示全部）。
+
+    Args:
+        days: 要统计的天数
+        now: 统计窗口的终点时间戳，默认为当前时间
+        profiles: 配置名称列表，默认为全部配置
+
+    Returns:
+        dict: {"total": 全部配置合计的统计, "profiles": {配置名称: 统计}}，
+              统计字典与 HistoryManager.get_statistics 的格式相同
+    """
+    if profiles is None:
+        profiles = list_profiles()
+    if now is None:
+        now = time.time()
+    last_day = datetime.date.fromtimestamp(now).toordinal()
+    first_day = last_day - days + 1 if days else None
+
+    per_profile = {}
+    total = [0, 0, 0, 0, 0]
+    for name in profiles:
+        counts = [0, 0, 0, 0, 0]
+        for day, day_counts in profile_rollup(name).items():
+            if day > last_day or (first_day is not None and day < first_day):
+                continue
+            for i, value in enumerate(day_counts):
+                counts[i] += value
+        for i, value in enumerate(counts):
+            total[i] += value
+        per_profile[name] = _finalize_statistics(counts, days)
+    return {"total": _finalize_statistics(total, days), "profiles": per_profile}
+
+
+def profile_rollup(name):
+    """
+    获取用户配置按天汇总的计数，历史文件有变化时重新汇总
+
+    Args:
+        name: 配置名称
+
+    Returns:
+        dict: {日序号（date.toordinal()）: [总数, 完成数, 放弃数, 打断数, 总专注时间]}，调用者不应修改
+    """
+    path = profile_paths(name)[0]
+    signature = _file_signature(path)
+    if signature is None:
+        return {}
+    with _rollups_lock:
+        cached = _rollups.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    days = _read_rollup(path, signature)
+    if days is None:
+        days = _build_rollup(_load_table(path, signature))
+        _write_rollup(path, signature, days)
+    with _rollups_lock:
+        _rollups[path] = (signature, days)
+    return days
+
+
+def _load_table(path, signature):
+    """读取历史文件的会话表；是当前正在使用的历史文件时直接使用内存中的表"""
+    if path == history.HISTORY_FILE:
+        with HistoryManager.lock:
+            table = HistoryManager.get_table()
+            if HistoryManager._table_signature == signature:
+                return table
+    return SessionTable.from_dicts(HistoryManager._read_history_file(path))
+
+
+def _build_rollup(table):
+    """
+    按天汇总会话表
+
+    Returns:
+        dict: {日序号: [总数, 完成数, 放弃数, 打断数, 总专注时间]}
+    """
+    columns = [_STATUS_COLUMNS.get(value) for value in table.status_pool.values]
+    days = {}
+    # 会话大多按时间顺序排列，缓存当前所在日的时间范围，同一天的会话不再换算日期
+    day_start = day_end = None
+    counts = None
+    for start_time, status_code, actual_duration in zip(
+            table.start_times, table.status_codes, table.actual_durations):
+        if day_start is None or not day_start <= start_time < day_end:
+            date = datetime.date.fromtimestamp(start_time)
+            day_start = time.mktime(date.timetuple())
+            day_end = time.mktime((date + datetime.timedelta(days=1)).timetuple())
+            counts = days.get(date.toordinal())
+            if counts is None:
+                counts = days[date.toordinal()] = [0, 0, 0, 0, 0]
+        counts[0] += 1
+        counts[4] += actual_duration
+        column = columns[status_code]
+        if column is not None:
+            counts[column] += 1
+    return days
+
+
+def _rollup_file(path):
+    """按天汇总文件路径（历史文件旁边）"""
+    return f"{path}.rollup"
+
+
+def _read_rollup(path, signature):
+    """读取按天汇总文件，不存在、损坏或与历史文件不一致时返回None"""
+    try:
+        with open(_rollup_file(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != _ROLLUP_VERSION or data.get("signature") != list(signature[1:]):
+            return None
+        return {row[0]: row[1:] for row in data["days"]}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, IndexError):
+        return None
+
+
+def _write_rollup(path, signature, days):
+    """原子地写入按天汇总文件（先写临时文件再替换）"""
+    rollup_path = _rollup_file(path)
+    temp_path = f"{rollup_path}.tmp"
+    data = {
+        "version": _ROLLUP_VERSION,
+        "signature": list(signature[1:]),
+        "days": [[day] + counts for day, counts in sorted(days.items())],
+    }
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, rollup_path)
+    except OSError as e:
+        print(f"Error saving history rollup: {e}")
+
+
+def _check_name(name):
+    """检查配置名称，不合法时抛出 ValueError"""
+    if not isinstance(name, str) or not _NAME_RE.fullmatch(name):
+        raise ValueError(f"invalid profile name: {name!r}")
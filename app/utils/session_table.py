@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+紧凑的会话表实现
+
+以列式 array 存储会话记录，状态与备注字符串经过驻留（interning）后
+只保存整数编码，避免每条记录都持有一个七键字典和重复的字符串。
+"""
+
+import json
+import bisect
+from array import array
+from collections.abc import Mapping
+
+# 会话记录的标准字段（顺序与历史文件中保持一致）
+FIELDS = ("id", "start_time", "end_time", "planned_duration", "actual_duration", "status", "notes")
+_FIELD_SET = frozenset(FIELDS)
+
+# 列名
+_COLUMNS = ("ids", "start_times", "end_times", "planned_durations",
+            "actual_durations", "status_codes", "note_codes")
+
+# 删除的行数不超过此值时在原数组上逐行删除，否则重建各列
+_INPLACE_DELETE_LIMIT = 64
+
+# 预置的状态取值（与 SessionStatus 的取值一致）
+DEFAULT_STATUSES = ("completed", "failed", "interrupted")
+
+# 预置的常见备注
+DEFAULT_NOTES = (
+    "",
+    "Success",
+    "Ended by user",
+    "Session interrupted",
+    "User exited the app and the session was interrupted",
+)
+
+
+class StringPool:
+    """字符串驻留池，将重复出现的字符串映射为整数编码"""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, initial=()):
+        """
+        初始化驻留池
+
+        Args:
+            initial: 预置的字符串序列
+        """
+        self.values = []
+        self._codes = {}
+        for value in initial:
+            self.intern(value)
+
+    def intern(self, value):
+        """
+        获取字符串对应的编码，不存在时新建
+
+        Args:
+            value: 字符串
+
+        Returns:
+            int: 编码
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def code_of(self, value):
+        """
+        查询字符串的编码，不新建
+
+        Args:
+            value: 字符串
+
+        Returns:
+            int: 编码，不存在时返回None
+        """
+        return self._codes.get(value)
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class SessionRow(Mapping):
+    """
+    会话表中一行的只读字典视图
+
+    支持 row["status"]、row.get("notes", "") 等字典式访问，
+    视图在所属会话表被删除修改之前有效。
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        table = self._table
+        i = self._index
+        if key == "id":
+            return table.ids[i]
+        if key == "start_time":
+            return table.start_times[i]
+        if key == "end_time":
+            return table.end_times[i]
+        if key == "planned_duration":
+            return table.planned_durations[i]
+        if key == "actual_duration":
+            return table.actual_durations[i]
+        if key == "status":
+            return table.status_pool[table.status_codes[i]]
+        if key == "notes":
+            return table.note_pool[table.note_codes[i]]
+        extra = table.extras.get(i)
+        if extra is not None and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from FIELDS
+        extra = self._table.extras.get(self._index)
+        if extra:
+            yield from extra
+
+    def __len__(self):
+        extra = self._table.extras.get(self._index)
+        return len(FIELDS) + (len(extra) if extra else 0)
+
+    def __repr__(self):
+        return f"SessionRow({self.to_dict()!r})"
+
+    def to_dict(self):
+        """
+        转换为普通字典
+
+        Returns:
+            dict: 会话记录
+        """
+        return self._table.row_dict(self._index)
+
+
+class SessionTable:
+    """
+    列式会话表
+
+    每个数值字段保存在一个 array 中，状态和备注保存为驻留池编码，
+    标准字段之外的附加字段按行号稀疏保存在 extras 中。
+    """
+
+    __slots__ = (
+        "ids", "start_times", "end_times", "planned_durations", "actual_durations",
+        "status_codes", "note_codes", "status_pool", "note_pool", "extras", "_id_rows",
+    )
+
+    def __init__(self):
+        """初始化空的会话表"""
+        self.ids = array("q")
+        self.start_times = array("d")
+        self.end_times = array("d")
+        self.planned_durations = array("q")
+        self.actual_durations = array("q")
+        self.status_codes = array("B")
+        self.note_codes = array("I")
+        self.status_pool = StringPool(DEFAULT_STATUSES)
+        self.note_pool = StringPool(DEFAULT_NOTES)
+        self.extras = {}
+        # ID到行号的哈希索引，首次按ID查找时建立，追加时增量维护，删除行后重新建立
+        self._id_rows = None
+
+    @classmethod
+    def from_dicts(cls, sessions):
+        """
+        由会话字典序列构建会话表
+
+        Args:
+            sessions: 会话字典的可迭代对象
+
+        Returns:
+            SessionTable: 会话表
+        """
+        table = cls()
+        table.extend(sessions)
+        return table
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        size = len(self.ids)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("session index out of range")
+        return SessionRow(self, index)
+
+    def __iter__(self):
+        for i in range(len(self.ids)):
+            yield SessionRow(self, i)
+
+    def append(self, session):
+        """
+        追加一条会话记录
+
+        Args:
+            session: 会话字典
+        """
+        session_id = int(session.get("id", 0) or 0)
+        self.ids.append(session_id)
+        if self._id_rows is not None:
+            self._id_rows.setdefault(session_id, len(self.ids) - 1)
+        self.start_times.append(float(session.get("start_time", 0) or 0))
+        self.end_times.append(float(session.get("end_time", 0) or 0))
+        self.planned_durations.append(int(session.get("planned_duration", 0) or 0))
+        self.actual_durations.append(int(session.get("actual_duration", 0) or 0))
+        status_code = self.status_pool.intern(session.get("status", "") or "")
+        if status_code > 0xFF:
+            # 状态种类超出单字节编码范围时扩展列宽
+            self.status_codes = array("H", self.status_codes)
+        self.status_codes.append(status_code)
+        self.note_codes.append(self.note_pool.intern(session.get("notes", "") or ""))
+
+        if not session.keys() <= _FIELD_SET:
+            extra = {key: value for key, value in session.items() if key not in FIELDS}
+            if extra:
+                self.extras[len(self.ids) - 1] = extra
+
+    def extend(self, sessions):
+        """
+        批量追加会话记录
+
+        Args:
+            sessions: 会话字典的可迭代对象
+        """
+        # 将方法绑定到局部变量，减少大批量追加时的属性查找
+        ids = self.ids.append
+        start_times = self.start_times.append
+        end_times = self.end_times.append
+        planned = self.planned_durations.append
+        actual = self.actual_durations.append
+        notes = self.note_codes.append
+        intern_status = self.status_pool.intern
+        intern_note = self.note_pool.intern
+        start = len(self.ids)
+
+        for session in sessions:
+            get = session.get
+            status_code = intern_status(get("status", "") or "")
+            if status_code > 0xFF or not session.keys() <= _FIELD_SET:
+                # 少见情况交给逐条追加处理
+                self.append(session)
+                continue
+            ids(int(get("id", 0) or 0))
+            start_times(float(get("start_time", 0) or 0))
+            end_times(float(get("end_time", 0) or 0))
+            planned(int(get("planned_duration", 0) or 0))
+            actual(int(get("actual_duration", 0) or 0))
+            self.status_codes.append(status_code)
+            notes(intern_note(get("notes", "") or ""))
+
+        index = self._id_rows
+        if index is not None:
+            for row in range(start, len(self.ids)):
+                index.setdefault(self.ids[row], row)
+
+    def row_dict(self, index):
+        """
+        将指定行转换为普通字典
+
+        Args:
+            index: 行号
+
+        Returns:
+            dict: 会话记录
+        """
+        session = {
+            "id": self.ids[index],
+            "start_time": self.start_times[index],
+            "end_time": self.end_times[index],
+            "planned_duration": self.planned_durations[index],
+            "actual_duration": self.actual_durations[index],
+            "status": self.status_pool[self.status_codes[index]],
+            "notes": self.note_pool[self.note_codes[index]],
+        }
+        extra = self.extras.get(index)
+        if extra:
+            session.update(extra)
+        return session
+
+    def iter_json(self):
+        """
+        逐行生成会话记录的JSON文本
+
+        与对每行调用 json.dumps(row_dict(i)) 的结果一致，但状态和备注的
+        JSON编码按驻留池只计算一次，数值字段直接格式化。
+
+        Yields:
+            str: 单条会话记录的JSON文本
+        """
+        dumps = json.dumps
+        status_json = [dumps(value, ensure_ascii=False) for value in self.status_pool.values]
+        note_json = [dumps(value, ensure_ascii=False) for value in self.note_pool.values]
+        template = ('{"id": %d, "start_time": %r, "end_time": %r, "planned_duration": %d, '
+                    '"actual_duration": %d, "status": %s, "notes": %s}')
+        extras = self.extras
+
+        for i, row in enumerate(zip(self.ids, self.start_times, self.end_times, self.planned_durations,
+                                    self.actual_durations, self.status_codes, self.note_codes)):
+            if i in extras:
+                yield dumps(self.row_dict(i), ensure_ascii=False)
+                continue
+            session_id, start_time, end_time, planned, actual, status_code, note_code = row
+            yield template % (session_id, start_time, end_time, planned, actual,
+                              status_json[status_code], note_json[note_code])
+
+    def to_dicts(self):
+        """
+        转换为会话字典列表（与旧版 get_history 的返回值兼容）
+
+        Returns:
+            list: 会话字典列表
+        """
+        return [self.row_dict(i) for i in range(len(self.ids))]
+
+    def row_of(self, session_id):
+        """
+        按ID查找行号（哈希索引，O(1)）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            int: 行号，ID重复时为第一条；不存在时返回None
+        """
+        index = self._id_rows
+        if index is None:
+            # 倒序插入，ID重复时保留第一条的行号
+            ids = self.ids
+            index = self._id_rows = dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+        return index.get(session_id)
+
+    def truncate(self, length):
+        """
+        删除第 length 行及之后的所有行（用于撤销未完成的批量追加）
+
+        各列长度可能因追加到一半失败而不一致，逐列截断到同一长度。
+
+        Args:
+            length: 保留的行数
+        """
+        for name in _COLUMNS:
+            del getattr(self, name)[length:]
+        if self.extras:
+            self.extras = {row: extra for row, extra in self.extras.items() if row < length}
+        self._id_rows = None
+
+    def delete_rows(self, rows):
+        """
+        删除指定行
+
+        Args:
+            rows: 要删除的行号集合
+        """
+        rows = sorted(set(rows))
+        if not rows:
+            return
+        if len(rows) > _INPLACE_DELETE_LIMIT:
+            removed = set(rows)
+            self._keep_rows([i for i in range(len(self.ids)) if i not in removed])
+            return
+
+        # 少量删除时逐行删除（数组内部整体移动，不需要逐个元素重建列）
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            for row in reversed(rows):
+                del column[row]
+        if self.extras:
+            removed = set(rows)
+            self.extras = {old - bisect.bisect_left(rows, old): extra
+                           for old, extra in self.extras.items() if old not in removed}
+        self._id_rows = None
+
+    def delete_ids(self, session_ids):
+        """
+        删除指定ID的会话记录
+
+        Args:
+            session_ids: 要删除的会话ID集合
+
+        Returns:
+            int: 删除的记录数
+        """
+        session_ids = set(session_ids)
+        keep = [i for i, session_id in enumerate(self.ids) if session_id not in session_ids]
+        removed = len(self.ids) - len(keep)
+        if removed:
+            self._keep_rows(keep)
+        return removed
+
+    def _keep_rows(self, keep):
+        """
+        只保留指定行，其余行删除
+
+        Args:
+            keep: 按升序排列的保留行号列表
+        """
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[i] for i in keep]))
+        self._id_rows = None
+
+        if self.extras:
+            new_index = {old: new for new, old in enumerate(keep)}
+            self.extras = {new_index[old]: extra for old, extra in self.extras.items() if old in new_index}
+
+    def nbytes(self):
+        """
+        估算列数据占用的字节数（不含驻留池）
+
+        Returns:
+            int: 字节数
+        """
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.ids, self.start_times, self.end_times, self.planned_durations,
+                           self.actual_durations, self.status_codes, self.note_codes)
+        )
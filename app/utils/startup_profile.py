@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析
+
+记录启动过程中各阶段的耗时以及每个模块的导入耗时（含其依赖），
+通过 main.py --profile-startup 启用。
+"""
+
+import sys
+import time
+import builtins
+
+
+class StartupProfiler:
+    """启动耗时分析器"""
+
+    def __init__(self, threshold_ms=0.5):
+        """
+        初始化分析器并开始计时
+
+        Args:
+            threshold_ms: 报告中忽略耗时低于此值（毫秒）的导入
+        """
+        self.threshold_ms = threshold_ms
+        self.start = time.perf_counter()
+        self.last_mark = self.start
+        self.phases = []
+        self.imports = []
+        self._depth = 0
+        self._original_import = None
+
+    def install_import_hook(self):
+        """替换内置 __import__，记录首次导入模块的耗时"""
+        if self._original_import is not None:
+            return
+        original_import = builtins.__import__
+        self._original_import = original_import
+        modules = sys.modules
+        perf_counter = time.perf_counter
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # 已导入的模块和相对导入直接交给原始实现
+            if level or name in modules:
+                return original_import(name, globals, locals, fromlist, level)
+            depth = self._depth
+            self._depth = depth + 1
+            # 开始导入时登记，报告中父模块排在其依赖之前
+            entry = [name, depth, 0.0]
+            self.imports.append(entry)
+            t0 = perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._depth = depth
+                entry[2] = (perf_counter() - t0) * 1000
+
+        builtins.__import__ = timed_import
+
+    def remove_import_hook(self):
+        """恢复内置 __import__"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, phase):
+        """
+        记录一个阶段的结束
+
+        Args:
+            phase: 阶段名称
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last_mark) * 1000, (now - self.start) * 1000))
+        self.last_mark = now
+
+    def report(self, file=None):
+        """
+        输出分析报告
+
+        Args:
+            file: 输出目标，默认为标准错误
+        """
+        file = file or sys.stderr
+        print("Startup imports (inclusive ms):", file=file)
+        for name, depth, elapsed in self.imports:
+            if elapsed >= self.threshold_ms:
+                print(f"  {elapsed:8.1f}  {'  ' * depth}{name}", file=file)
+
+        print("Startup phases (ms):", file=file)
+        for phase, elapsed, total in self.phases:
+            print(f"  {elapsed:8.1f}  {phase:<24} (total {total:.1f})", file=file)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+通过共享目录同步多台机器的历史记录
+
+每台机器（设备）在共享目录下有自己的子目录，其中保存:
+    manifest.json          {分段键: 内容哈希}、删除记录（墓碑）和会话ID的节点号
+    <分段键>-<哈希>.jsonl   分段中的会话，每行一条
+
+会话按开始时间划分为固定长度的分段（按 UTC 时间计算，与时区无关），
+每个分段的哈希由会话表的列直接计算。同步时只比较各设备清单中的哈希，
+只读取与本地不同、且上次同步后有变化的远程分段，只写入本地有变化的分段；
+两边只差几条会话时，只传输这几条会话所在的分段。
+
+远程会话按ID去重后加入本地历史记录。本地删除的会话通过比较上次发布的
+分段与当前的会话得出，记为墓碑随清单发布；任一设备的墓碑会从所有设备的
+历史记录中删除对应会话（清空历史记录同样会同步到所有设备）。
+墓碑只保留 TOMBSTONE_RETENTION_DAYS 天，清单不会无限增长；
+超过这段时间没有同步的设备上，已在其他设备删除的会话会被重新同步回来。
+
+本地的同步状态（设备名、已合并的远程分段哈希、本地分段哈希缓存）
+保存在历史文件旁边（<历史文件>.sync）。
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import bisect
+import random
+import socket
+import hashlib
+from array import array
+
+from app.utils import history
+from app.utils.history import HistoryManager, _file_signature
+from app.utils.id_allocator import NODE_BITS
+
+# 分段长度（秒），按 UTC 对齐
+SEGMENT_SECONDS = 7 * 24 * 60 * 60
+
+# 共享目录中的清单文件名
+MANIFEST_FILE = "manifest.json"
+
+# 删除记录（墓碑）的保留天数
+TOMBSTONE_RETENTION_DAYS = 90
+
+_MANIFEST_VERSION = 1
+_STATE_VERSION = 1
+
+_SEGMENT_RE = re.compile(r"(-?\d+)-([0-9a-f]{40})\.jsonl")
+_DEVICE_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# 参与分段哈希的数值列
+_NUMERIC_COLUMNS = ("ids", "start_times", "end_times", "planned_durations", "actual_durations")
+
+
+def sync_history(sync_dir, device=None):
+    """
+    与共享目录中的其他设备同步当前历史文件
+
+    Args:
+        sync_dir: 共享目录
+        device: 本设备在共享目录中的名称，默认使用上次的名称（首次为 主机名-随机后缀）
+
+    Returns:
+        dict: 包含 added、deleted（本地新增、删除的会话数）、
+              sent、received（写入、读取的分段数）、bytes_sent、bytes_received 的字典
+    """
+    state_path = f"{history.HISTORY_FILE}.sync"
+    state = _read_state(state_path)
+    if device:
+        state["device"] = _DEVICE_RE.sub("_", device)
+    elif not state.get("device"):
+        state["device"] = f"{_DEVICE_RE.sub('_', socket.gethostname())}-{uuid.uuid4().hex[:8]}"
+    device = state["device"]
+    device_dir = os.path.join(sync_dir, device)
+    os.makedirs(device_dir, exist_ok=True)
+    counts = {"added": 0, "deleted": 0, "sent": 0, "received": 0, "bytes_sent": 0, "bytes_received": 0}
+
+    own = _read_json(os.path.join(device_dir, MANIFEST_FILE)) or {}
+    published = own.get("segments", {})
+    # 丢弃超过保留期的墓碑
+    now = time.time()
+    expire_before = now - TOMBSTONE_RETENTION_DAYS * 24 * 60 * 60
+    tombstones = {int(session_id): deleted_at for session_id, deleted_at in own.get("tombstones", {}).items()
+                  if deleted_at >= expire_before}
+
+    with HistoryManager.lock:
+        table = HistoryManager.get_table()
+        segments = _local_segments(table, state)
+        local_ids = set(table.ids)
+
+    # 上次发布之后本地删除的会话：在已发布的分段中，但已不在本地历史记录中
+    for key, digest in published.items():
+        if segments.get(key, (None,))[0] == digest:
+            continue
+        sessions = _read_segment(device_dir, key, digest, counts)
+        for session in sessions or ():
+            session_id = int(session["id"])
+            if session_id not in local_ids:
+                tombstones.setdefault(session_id, now)
+
+    # 读取其他设备的清单，合并墓碑
+    remotes = {}
+    with os.scandir(sync_dir) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name != device:
+                manifest = _read_json(os.path.join(entry.path, MANIFEST_FILE))
+                if manifest and manifest.get("version") == _MANIFEST_VERSION:
+                    remotes[entry.name] = manifest
+    _ensure_unique_node(remotes)
+    for manifest in remotes.values():
+        for session_id, deleted_at in manifest.get("tombstones", {}).items():
+            if deleted_at < expire_before:
+                continue
+            session_id = int(session_id)
+            tombstones[session_id] = min(deleted_at, tombstones.get(session_id, deleted_at))
+
+    # 只读取与本地不同、且上次合并之后有变化的远程分段
+    additions = {}
+    merged_state = state.setdefault("merged", {})
+    for name, manifest in remotes.items():
+        merged = merged_state.get(name, {})
+        current = {}
+        for key, digest in manifest.get("segments", {}).items():
+            if segments.get(key, (None,))[0] == digest or merged.get(key) == digest:
+                current[key] = digest
+                continue
+            sessions = _read_segment(os.path.join(sync_dir, name), key, digest, counts)
+            if sessions is None:
+                # 分段文件正在被替换，下次同步时再读取
+                continue
+            current[key] = digest
+            for session in sessions:
+                session_id = int(session["id"])
+                if session_id not in local_ids and session_id not in tombstones:
+                    additions.setdefault(session_id, session)
+        merged_state[name] = current
+    for name in list(merged_state):
+        if name not in remotes:
+            del merged_state[name]
+
+    # 删除和新增在一次加锁的更新中完成，历史文件只写入一次
+    deletions = local_ids.intersection(tombstones)
+    if deletions or additions:
+        counts["added"], counts["deleted"] = HistoryManager.apply_changes(additions.values(), deletions)
+
+    # 发布本地有变化的分段，分段内容在锁内生成
+    pending = []
+    with HistoryManager.lock:
+        table = HistoryManager.get_table()
+        segments = _local_segments(table, state)
+        for key, (digest, rows) in segments.items():
+            if published.get(key) != digest:
+                pending.append((key, digest, "".join(json.dumps(table.row_dict(row), ensure_ascii=False) + "\n"
+                                                     for row in rows)))
+    for key, digest, text in pending:
+        path = os.path.join(device_dir, f"{key}-{digest}.jsonl")
+        if not os.path.exists(path):
+            data = text.encode("utf-8")
+            _write_atomic(path, data)
+            counts["sent"] += 1
+            counts["bytes_sent"] += len(data)
+
+    manifest = {
+        "version": _MANIFEST_VERSION,
+        "node": HistoryManager.get_id_allocator().get_node(),
+        "segments": {key: digest for key, (digest, _) in segments.items()},
+        "tombstones": {str(session_id): deleted_at for session_id, deleted_at in tombstones.items()},
+    }
+    if (manifest["segments"] != published or manifest["tombstones"] != own.get("tombstones")
+            or manifest["node"] != own.get("node")):
+        data = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        _write_atomic(os.path.join(device_dir, MANIFEST_FILE), data)
+        counts["bytes_sent"] += len(data)
+
+    # 清单替换之后再删除不再引用的分段文件
+    referenced = {f"{key}-{digest}.jsonl" for key, digest in manifest["segments"].items()}
+    with os.scandir(device_dir) as entries:
+        for entry in entries:
+            if _SEGMENT_RE.fullmatch(entry.name) and entry.name not in referenced:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    _write_atomic(state_path, json.dumps(state, separators=(",", ":")).encode("utf-8"))
+    return counts
+
+
+def _ensure_unique_node(remotes):
+    """
+    本机的会话ID节点号与其他设备重复时改用未被占用的节点号
+
+    节点号不同的设备分配的ID不会相同；节点号相同时，两台机器在同一毫秒、
+    同一序号新增的会话会得到相同的ID，合并时其中一条会被当作重复记录丢弃。
+
+    Args:
+        remotes: {设备名: 清单}
+    """
+    allocator = HistoryManager.get_id_allocator()
+    taken = {manifest.get("node") for manifest in remotes.values()}
+    if allocator.get_node() not in taken:
+        return
+    free = [node for node in range(1 << NODE_BITS) if node not in taken]
+    if not free:
+        print(f"More than {1 << NODE_BITS} devices share this sync folder; session ids may collide")
+        return
+    allocator.set_node(random.choice(free))
+
+
+def _local_segments(table, state):
+    """
+    将会话表按开始时间划分为分段并计算哈希
+
+    历史文件与上次计算时相同时直接使用 state 中缓存的哈希。
+
+    Returns:
+        dict: {分段键（字符串）: (哈希, 按开始时间排列的行号序列)}
+    """
+    rows, starts = HistoryManager._sorted_rows(table)
+    signature = _file_signature(history.HISTORY_FILE)
+    cached = state.get("local", {})
+    cached_hashes = cached.get("segments", {}) if signature and cached.get("signature") == list(signature[1:]) else {}
+
+    segments = {}
+    i = 0
+    while i < len(starts):
+        key = int(starts[i] // SEGMENT_SECONDS)
+        j = bisect.bisect_left(starts, (key + 1) * SEGMENT_SECONDS, i)
+        segment_rows = rows[i:j]
+        digest = cached_hashes.get(str(key)) or _segment_digest(table, segment_rows)
+        segments[str(key)] = (digest, segment_rows)
+        i = j
+
+    if signature:
+        state["local"] = {
+            "signature": list(signature[1:]),
+            "segments": {key: digest for key, (digest, _) in segments.items()},
+        }
+    return segments
+
+
+def _segment_digest(table, rows):
+    """
+    由会话表的列计算分段的内容哈希，不需要把会话转换为字典或JSON
+
+    Args:
+        table: 会话表
+        rows: 分段的行号（range 或 array）
+
+    Returns:
+        str: 十六进制的 SHA-1
+    """
+    if isinstance(rows, range):
+        def take(column):
+            return column[rows.start:rows.stop]
+    else:
+        def take(column):
+            return array(column.typecode, map(column.__getitem__, rows))
+
+    digest = hashlib.sha1()
+    for name in _NUMERIC_COLUMNS:
+        column = take(getattr(table, name))
+        if column.typecode != "d":
+            column = array("q", column)
+        digest.update(column.tobytes())
+    digest.update(json.dumps(list(map(table.status_pool.values.__getitem__, take(table.status_codes))),
+                             ensure_ascii=False).encode("utf-8"))
+    digest.update(json.dumps(list(map(table.note_pool.values.__getitem__, take(table.note_codes))),
+                             ensure_ascii=False).encode("utf-8"))
+    if table.extras:
+        for position, row in enumerate(rows):
+            extra = table.extras.get(row)
+            if extra:
+                digest.update(f"{position}:{json.dumps(extra, sort_keys=True)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_segment(directory, key, digest, counts):
+    """
+    读取分段文件
+
+    Returns:
+        list: 会话字典列表，文件不存在或损坏时返回None
+    """
+    try:
+        with open(os.path.join(directory, f"{key}-{digest}.jsonl"), "rb") as f:
+            data = f.read()
+        sessions = [json.loads(line) for line in data.decode("utf-8").splitlines() if line]
+    except (OSError, ValueError) as e:
+        print(f"Error reading sync segment {key} in {directory}: {e}")
+        return None
+    counts["received"] += 1
+    counts["bytes_received"] += len(data)
+    return sessions
+
+
+def _read_state(path):
+    """读取本地同步状态，不存在或损坏时返回新的状态"""
+    state = _read_json(path)
+    if not state or state.get("version") != _STATE_VERSION:
+        state = {"version": _STATE_VERSION}
+    return state
+
+
+def _read_json(path):
+    """读取JSON对象，不存在或损坏时返回None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_atomic(path, data):
+    """原子地写入文件（先写临时文件再替换）"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+历史记录的流式导入导出（JSON Lines / CSV）
+
+导出逐条写出会话记录，导入逐条读取并按ID去重，
+全部记录读取完成后只写入一次历史文件。
+
+CSV 的固定字段各占一列，其他字段（例如 distractions）以JSON对象
+写在最后的 extra 列中，导入时还原。
+
+命令行用法:
+    python -m app.utils.transfer export history.jsonl
+    python -m app.utils.transfer export history.csv
+    python -m app.utils.transfer import other-machine.jsonl
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+
+from app.utils.history import HistoryManager
+from app.utils.session_table import FIELDS
+
+# 支持的格式
+FORMATS = ("jsonl", "csv")
+
+# JSON Lines 每批解码的行数
+_JSONL_BATCH = 10000
+
+# CSV中保存固定字段以外的字段（JSON对象）的列
+CSV_EXTRA_COLUMN = "extra"
+
+# CSV中各字段的类型转换
+_CSV_TYPES = {
+    "id": int,
+    "start_time": float,
+    "end_time": float,
+    "planned_duration": int,
+    "actual_duration": int,
+}
+
+
+def detect_format(path, fmt=None):
+    """
+    确定文件格式，未指定时根据扩展名判断
+
+    Args:
+        path: 文件路径
+        fmt: 显式指定的格式
+
+    Returns:
+        str: "jsonl" 或 "csv"
+    """
+    if fmt is None:
+        fmt = "csv" if os.path.splitext(path)[1].lower() == ".csv" else "jsonl"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return fmt
+
+
+def iter_sessions(table=None):
+    """
+    逐条生成会话字典
+
+    Args:
+        table: 会话表，默认使用 HistoryManager 当前的会话表
+
+    Yields:
+        dict: 会话记录
+    """
+    if table is None:
+        table = HistoryManager.get_table()
+    for i in range(len(table)):
+        yield table.row_dict(i)
+
+
+def write_sessions(sessions, f, fmt="jsonl"):
+    """
+    将会话记录流式写入已打开的文本文件
+
+    Args:
+        sessions: 会话字典的可迭代对象
+        f: 已打开的文本文件
+        fmt: "jsonl" 或 "csv"
+
+    Returns:
+        int: 写出的记录数
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(f)
+        writer.writerow(FIELDS + (CSV_EXTRA_COLUMN,))
+        for session in sessions:
+            extra = {key: value for key, value in session.items() if key not in FIELDS}
+            writer.writerow([session.get(field) for field in FIELDS]
+                            + [json.dumps(extra, ensure_ascii=False) if extra else ""])
+            count += 1
+    else:
+        dumps = json.dumps
+        for session in sessions:
+            f.write(dumps(session, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def read_sessions(f, fmt="jsonl"):
+    """
+    从已打开的文本文件中逐条读取会话记录
+
+    Args:
+        f: 已打开的文本文件
+        fmt: "jsonl" 或 "csv"
+
+    Yields:
+        dict: 会话记录
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(f):
+            session = {}
+            for key, value in row.items():
+                if key is None:
+                    continue
+                if key == CSV_EXTRA_COLUMN:
+                    if value:
+                        session.update(json.loads(value))
+                    continue
+                convert = _CSV_TYPES.get(key)
+                if convert is not None:
+                    value = convert(float(value)) if value not in (None, "") else None
+                session[key] = value
+            yield session
+    else:
+        # 按批拼接为JSON数组后一次解码，内存占用只与批大小有关
+        batch = []
+        for line in f:
+            line = line.strip()
+            if line:
+                batch.append(line)
+            if len(batch) >= _JSONL_BATCH:
+                yield from json.loads("[" + ",".join(batch) + "]")
+                batch = []
+        if batch:
+            yield from json.loads("[" + ",".join(batch) + "]")
+
+
+def export_history(path, fmt=None):
+    """
+    导出全部历史记录到文件
+
+    Args:
+        path: 目标文件路径，"-" 表示标准输出
+        fmt: "jsonl" 或 "csv"，默认根据扩展名判断
+
+    Returns:
+        int: 导出的记录数
+    """
+    fmt = detect_format(path, fmt)
+    if path == "-":
+        return write_sessions(iter_sessions(), sys.stdout, fmt)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        return write_sessions(iter_sessions(), f, fmt)
+
+
+def import_history(path, fmt=None):
+    """
+    从文件导入历史记录，按ID去重，最后一次性保存
+
+    Args:
+        path: 源文件路径，"-" 表示标准输入
+        fmt: "jsonl" 或 "csv"，默认根据扩展名判断
+
+    Returns:
+        tuple: (新增的记录数, 跳过的重复记录数)
+    """
+    fmt = detect_format(path, fmt)
+    if path == "-":
+        return HistoryManager.add_sessions(read_sessions(sys.stdin, fmt))
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return HistoryManager.add_sessions(read_sessions(f, fmt))
+
+
+def cmd_export(args):
+    """命令行 export 子命令"""
+    count = export_history(args.path, args.format)
+    print(f"Exported {count} sessions", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args):
+    """命令行 import 子命令"""
+    added, skipped = import_history(args.path, args.format)
+    print(f"Imported {added} sessions, skipped {skipped} duplicates", file=sys.stderr)
+    return 0
+
+
+def add_subcommands(subparsers):
+    """
+    添加 export 和 import 子命令（本模块和 app.cli 共用）
+
+    Args:
+        subparsers: argparse 的子命令集合，各子命令的 func 为处理函数
+    """
+    export_parser = subparsers.add_parser("export", help="export history to JSON lines or CSV")
+    export_parser.add_argument("path", help="output file, or - for stdout")
+    export_parser.add_argument("--format", choices=FORMATS, help="default: by file extension")
+    export_parser.set_defaults(func=cmd_export)
+
+    import_parser = subparsers.add_parser("import", help="import history from JSON lines or CSV")
+    import_parser.add_argument("path", help="input file, or - for stdin")
+    import_parser.add_argument("--format", choices=FORMATS, help="default: by file extension")
+    import_parser.set_defaults(func=cmd_import)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(prog="python -m app.utils.transfer",
+                                     description="Import or export PyFocus history.")
+    add_subcommands(parser.add_subparsers(dest="command", required=True))
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
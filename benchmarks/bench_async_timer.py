@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+asyncio 计时器基准测试：一个事件循环中同时运行大量会话
+
+用法:
+    python benchmarks/bench_async_timer.py [会话数] [时长（秒）]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.async_timer import AsyncFocusTimer
+
+
+async def session(duration, lateness):
+    """运行一个会话，记录每次 tick 相对理想时间的延迟"""
+    timer = AsyncFocusTimer(duration)
+    start = time.monotonic()
+    timer.start()
+    async for remaining in timer.ticks():
+        if remaining == duration:
+            continue
+        lateness.append(time.monotonic() - start - (duration - remaining))
+    await timer
+    lateness.append(time.monotonic() - start - duration)
+
+
+async def run(count, duration):
+    lateness = []
+    cpu0 = time.process_time()
+    wall0 = time.monotonic()
+    await asyncio.gather(*(session(duration, lateness) for _ in range(count)))
+    wall = time.monotonic() - wall0
+    cpu = time.process_time() - cpu0
+
+    lateness.sort()
+    ticks = len(lateness)
+    print(f"{count} sessions x {duration} s in one loop ({threading.active_count()} thread): {wall:.2f} s wall")
+    print(f"CPU: {cpu:.2f} s ({cpu / wall * 100:.1f}% of one core)")
+    print(f"Tick lateness: p50 {lateness[ticks // 2] * 1000:.2f} ms, "
+          f"p99 {lateness[ticks * 99 // 100] * 1000:.2f} ms, max {lateness[-1] * 1000:.2f} ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(run(count, duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+计时器检查点基准测试：单次写入耗时，与每次重写JSON文件对比
+
+用法:
+    python benchmarks/bench_checkpoint.py [写入次数]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.checkpoint import TimerCheckpoint, STATE_RUNNING
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    started_at = time.time()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = TimerCheckpoint(os.path.join(tmp, "timer.ckpt"))
+        t0 = time.perf_counter()
+        for remaining in range(count):
+            checkpoint.save(STATE_RUNNING, started_at, count, remaining)
+        mmap_us = (time.perf_counter() - t0) / count * 1e6
+        assert checkpoint.load()["remaining"] == count - 1
+        checkpoint.close()
+
+        json_path = os.path.join(tmp, "timer.json")
+        json_count = min(count, 5000)
+        t0 = time.perf_counter()
+        for remaining in range(json_count):
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"state": STATE_RUNNING, "started_at": started_at,
+                           "duration": count, "remaining": remaining}, f)
+        json_us = (time.perf_counter() - t0) / json_count * 1e6
+
+    print(f"mmap checkpoint: {mmap_us:8.2f} us/write ({count} writes)")
+    print(f"JSON rewrite:    {json_us:8.2f} us/write ({json_count} writes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+专注房间负载测试：在子进程中运行服务，模拟大量客户端，
+测量广播延迟（放弃到所有成员收到结果）和每个房间占用的服务端内存
+
+用法:
+    python benchmarks/bench_focus_room.py [房间数] [每个房间的成员数]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.service.focus_room import FocusRoomClient
+
+# 同时进行的连接数，避免超过服务端的 listen backlog
+CONNECT_CONCURRENCY = 100
+
+
+def rss_kb(pid):
+    """进程的常驻内存（KB），不支持时返回None"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(process, port, room_count, member_count):
+    loop = asyncio.get_running_loop()
+    total = room_count * member_count
+    base_rss = rss_kb(process.pid)
+
+    # 连接并加入房间
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def connect(room, member):
+        async with semaphore:
+            return await FocusRoomClient.connect(f"room-{room}", f"user-{member}", port=port)
+
+    t0 = time.monotonic()
+    clients = await asyncio.gather(*(connect(r, m) for r in range(room_count) for m in range(member_count)))
+    print(f"{total} clients joined {room_count} rooms in {time.monotonic() - t0:.2f} s")
+    await asyncio.sleep(0.5)
+    joined_rss = rss_kb(process.pid)
+
+    # 每个客户端监听房间事件
+    started = {"count": 0, "event": asyncio.Event()}
+    ended = {"count": 0, "event": asyncio.Event()}
+    gave_up_at = [0.0] * room_count
+    latencies = []
+    tick_times = [{} for _ in range(room_count)]
+
+    async def listen(client, room):
+        async for event in client.events():
+            kind = event["type"]
+            if kind == "state" and event["state"] == "running":
+                started["count"] += 1
+                if started["count"] == total:
+                    started["event"].set()
+            elif kind == "tick":
+                tick_times[room].setdefault(event["remaining"], []).append(loop.time())
+            elif kind == "ended":
+                latencies.append(loop.time() - gave_up_at[room])
+                ended["count"] += 1
+                if ended["count"] == total:
+                    ended["event"].set()
+
+    listeners = [loop.create_task(listen(client, i // member_count)) for i, client in enumerate(clients)]
+
+    # 每个房间的第一个成员开始会话，运行几秒后放弃
+    for room in range(room_count):
+        clients[room * member_count].send("start", minutes=25)
+    await started["event"].wait()
+    await asyncio.sleep(3)
+    session_rss = rss_kb(process.pid)
+
+    for room in range(room_count):
+        gave_up_at[room] = loop.time()
+        clients[room * member_count].send("give_up")
+    await ended["event"].wait()
+
+    spreads = [max(times) - min(times) for ticks in tick_times for times in ticks.values()]
+    print(f"Give-up fan-out latency: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms "
+          f"(includes the server's batch delay)")
+    print(f"Tick arrival spread within a room: p50 {percentile(spreads, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(spreads, 0.99) * 1000:.1f} ms")
+    if base_rss is not None:
+        print(f"Server RSS: idle {base_rss} KB, joined {joined_rss} KB, sessions running {session_rss} KB")
+        print(f"Server memory per room: {(session_rss - base_rss) / room_count:.1f} KB "
+              f"({(session_rss - base_rss) / total:.2f} KB per member)")
+
+    for task in listeners:
+        task.cancel()
+    await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
+
+
+def main():
+    room_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    member_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.service.focus_room", "--port", "0"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        # 服务启动后在标准错误输出 "... on host:port"
+        port = int(process.stderr.readline().strip().rsplit(":", 1)[1])
+        asyncio.run(run(process, port, room_count, member_count))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+备注全文搜索基准测试：索引构建、加载和查询耗时，与逐条扫描对比
+
+用法:
+    python benchmarks/bench_notes_search.py [会话数]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import history
+from app.utils.history import HistoryManager
+from app.utils.session_table import SessionTable
+
+WORDS = ("reading", "thesis", "chapter", "email", "review", "code", "bugfix", "meeting",
+         "planning", "math", "physics", "essay", "design", "refactor", "deploy", "写作", "复习")
+
+
+def make_table(count):
+    """生成带有自由备注的合成会话表，约一半为默认备注"""
+    rng = random.Random(11)
+    now = time.time()
+    table = SessionTable()
+    rows = []
+    for i in range(count):
+        start = now - rng.uniform(0, 5 * 365 * 86400)
+        if rng.random() < 0.5:
+            notes = rng.choice(("Success", "Ended by user", "Session interrupted"))
+        else:
+            notes = f"{rng.choice(WORDS)} {rng.choice(WORDS)} #{rng.randrange(count // 20 or 1)}"
+        rows.append({
+            "id": i, "start_time": start, "end_time": start + 1500, "planned_duration": 1500,
+            "actual_duration": 1500, "status": "completed", "notes": notes,
+        })
+    table.extend(rows)
+    return table
+
+
+def timed(label, func, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"  {label:<36} {(time.perf_counter() - t0) / repeat * 1000:9.2f} ms")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        history.HISTORY_FILE = os.path.join(tmp, "history.json")
+        print(f"Writing {count} sessions...")
+        HistoryManager._save_history(make_table(count))
+        table = HistoryManager.get_table()
+
+        print("Index:")
+        HistoryManager._notes_index = None
+        os.unlink(history.HISTORY_FILE + ".idx") if os.path.exists(history.HISTORY_FILE + ".idx") else None
+        timed("build and save", HistoryManager._get_notes_index)
+        HistoryManager._notes_index = None
+        timed("load from disk", HistoryManager._get_notes_index)
+        print(f"  index file: {os.path.getsize(history.HISTORY_FILE + '.idx') / 1e6:.1f} MB")
+
+        print("Queries (first 200 results):")
+        for query in ("thesis", "bug", "review essay", "写作", "#123", "nomatch"):
+            total, _ = timed(f"search {query!r}", lambda: HistoryManager.search_notes(query, limit=200), repeat=20)
+            print(f"  {'':<36} {total} matches")
+
+        def scan():
+            notes = table.note_pool.values
+            return [i for i, code in enumerate(table.note_codes) if "thesis" in notes[code].lower()]
+        timed("full scan for 'thesis' (no index)", scan)
+
+        print("Incremental maintenance:")
+        timed("add_session (incl. history write)",
+              lambda: HistoryManager.add_session(time.time(), time.time(), 60, 60, "completed", "thesis intro"))
+        total, sessions = HistoryManager.search_notes("intro")
+        print(f"  found new session: {total == 1 and sessions[0]['notes'] == 'thesis intro'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+并行分块统计基准测试：输出 1 到 N 个进程的扩展曲线
+
+用法:
+    python benchmarks/bench_parallel_stats.py [会话数] [最大进程数]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import concurrent.futures
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import history
+from app.utils.history import HistoryManager
+from app.utils.session_table import SessionTable
+
+
+def make_table(count):
+    """生成跨越多年的合成会话表"""
+    rng = random.Random(7)
+    now = time.time()
+    table = SessionTable()
+    for i in range(count):
+        start = now - rng.uniform(0, 5 * 365 * 86400)
+        planned = rng.choice((15, 25, 45, 60)) * 60
+        status = rng.choice(("completed", "completed", "failed", "interrupted"))
+        table.append({
+            "id": i,
+            "start_time": start,
+            "end_time": start + planned,
+            "planned_duration": planned,
+            "actual_duration": planned if status == "completed" else rng.randint(1, planned),
+            "status": status,
+        })
+    return table
+
+
+def best_of(func, repeat=3):
+    """取多次运行的最短耗时"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    # 指向一个不存在的历史文件，并直接注入内存中的会话表，跳过JSON读写
+    history.HISTORY_FILE = os.path.join(tempfile.mkdtemp(), "history.json")
+    HistoryManager._table = make_table(count)
+    HistoryManager._table_signature = None
+
+    # days=0 统计全部记录，截止时间不随运行时刻变化，结果可以逐项比较；
+    # 每次传入 now 跳过统计缓存，测量的是完整扫描
+    serial, serial_time = best_of(lambda: HistoryManager.get_statistics(0, now=time.time()))
+    print(f"sessions: {count}")
+    print(f"serial: {serial_time:.3f}s")
+    print(f"{'workers':>8}{'time (s)':>10}{'speedup':>9}")
+
+    for workers in range(1, max_workers + 1):
+        # 进程池预先创建，只测量统计本身
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(abs, range(workers)))
+            result, elapsed = best_of(lambda: HistoryManager.get_statistics_parallel(
+                0, workers=workers, executor=pool))
+        assert result == serial, (result, serial)
+        print(f"{workers:>8}{elapsed:>10.3f}{serial_time / elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
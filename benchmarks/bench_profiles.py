@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+跨用户统计基准测试：读取各用户按天汇总的计数与逐个重新扫描历史文件的对比，
+并检查两者的结果一致
+
+用法:
+    python benchmarks/bench_profiles.py [用户数] [每个用户的会话数]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import profiles
+from app.utils import history
+from app.utils.history import HistoryManager
+
+
+def write_profiles(users, sessions_per_user):
+    """生成合成的用户配置（最近60天内的会话）"""
+    rng = random.Random(5)
+    now = time.time()
+    statuses = ("completed", "completed", "completed", "failed", "interrupted")
+    names = []
+    for u in range(users):
+        name = f"user{u:04d}"
+        path = profiles.profile_paths(name)[0]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sessions = []
+        for i in range(sessions_per_user):
+            start = now - rng.uniform(0, 60 * 86400)
+            sessions.append({
+                "id": i, "start_time": start, "end_time": start + 1500, "planned_duration": 1500,
+                "actual_duration": rng.randrange(300, 1501), "status": rng.choice(statuses), "notes": "Success",
+            })
+        sessions.sort(key=lambda session: session["start_time"])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(sessions, f)
+        names.append(name)
+    return names
+
+
+def rescan(names, days, now):
+    """逐个加载每个用户的历史文件并统计（切换配置的做法）"""
+    total = [0, 0, 0, 0, 0]
+    for name in names:
+        HistoryManager.set_history_file(profiles.profile_paths(name)[0])
+        stats = HistoryManager.get_statistics(days, now=now)
+        for i, key in enumerate(("total_sessions", "completed_sessions", "failed_sessions",
+                                 "interrupted_sessions", "total_focus_time")):
+            total[i] += stats[key]
+    return total
+
+
+def timed(label, func, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - t0) / repeat
+    print(f"  {label:<40} {elapsed * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    sessions_per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    days = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles.PROFILES_DIR = tmp
+        history.HISTORY_FILE = os.path.join(tmp, "default.json")
+        names = write_profiles(users, sessions_per_user)
+        now = time.time()
+        print(f"{users} profiles x {sessions_per_user} sessions, all days:")
+
+        expected = timed("rescan every history file", lambda: rescan(names, days, now))
+
+        def aggregate():
+            return profiles.get_aggregate_statistics(days, now=now, profiles=names)["total"]
+
+        timed("rollups, cold (build + write)", aggregate)
+        profiles._rollups.clear()
+        timed("rollups, read from .rollup files", aggregate)
+        result = timed("rollups, in memory (stat only)", aggregate, repeat=5)
+
+        got = [result[key] for key in ("total_sessions", "completed_sessions", "failed_sessions",
+                                      "interrupted_sessions", "total_focus_time")]
+        print(f"  results match: {got == expected}")
+
+
+if __name__ == "__main__":
+    main()
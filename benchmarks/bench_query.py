@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+会话查询基准测试：HistoryManager.query 取一页，与取出全部历史记录后排序筛选对比
+
+用法:
+    python benchmarks/bench_query.py [会话数]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import history
+from app.utils.history import HistoryManager
+from app.utils.session_table import SessionTable
+
+PAGE_SIZE = 200
+
+
+def make_table(count, ordered):
+    """生成合成会话表；ordered 为False时开始时间乱序（如导入合并的历史记录）"""
+    rng = random.Random(7)
+    now = time.time()
+    starts = sorted(now - rng.uniform(0, 5 * 365 * 86400) for _ in range(count))
+    if not ordered:
+        rng.shuffle(starts)
+    statuses = ("completed", "completed", "failed", "interrupted")
+    table = SessionTable()
+    table.extend({
+        "id": i, "start_time": start, "end_time": start + 1500, "planned_duration": 1500,
+        "actual_duration": 1500, "status": rng.choice(statuses), "notes": "Success",
+    } for i, start in enumerate(starts))
+    return table
+
+
+def timed(label, func, repeat=5):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"  {label:<40} {(time.perf_counter() - t0) / repeat * 1000:9.2f} ms")
+    return result
+
+
+def full_list_page(status, start, offset):
+    """旧方式：取出全部记录，在调用方筛选排序后切片"""
+    sessions = [
+        s for s in HistoryManager.get_history()
+        if (status is None or s["status"] == status) and (start is None or s["start_time"] >= start)
+    ]
+    sessions.sort(key=lambda s: s["start_time"], reverse=True)
+    return sessions[offset:offset + PAGE_SIZE]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    week_ago = time.time() - 7 * 86400
+    cases = (
+        ("first page", None, None, 0),
+        ("page 100", None, None, 100 * PAGE_SIZE),
+        ("failed, first page", "failed", None, 0),
+        ("last 7 days", None, week_ago, 0),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        history.HISTORY_FILE = os.path.join(tmp, "history.json")
+        for ordered in (True, False):
+            print(f"{count} sessions, {'appended in time order' if ordered else 'shuffled start times'}:")
+            HistoryManager._save_history(make_table(count, ordered))
+            timed("sort index (once per generation)", lambda: list(HistoryManager.query(limit=1)), repeat=1)
+            for label, status, start, offset in cases:
+                page = timed(f"query: {label}", lambda: list(HistoryManager.query(
+                    status=status, start=start, limit=PAGE_SIZE, offset=offset)))
+                expected = timed(f"get_history + sort: {label}", lambda: full_list_page(status, start, offset), repeat=1)
+                assert [s["id"] for s in page] == [s["id"] for s in expected]
+            timed("count(status='failed')", lambda: HistoryManager.count(status="failed"))
+
+
+if __name__ == "__main__":
+    main()
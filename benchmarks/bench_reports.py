@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+报告生成基准测试：多用户报告的吞吐量（单进程与进程池），以及增量缓存跳过未变化用户的效果
+
+用法:
+    python benchmarks/bench_reports.py [用户数] [每个用户的会话数]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.service.reports import find_profiles, generate_reports
+
+
+def write_profiles(users_dir, users, sessions_per_user):
+    """生成合成的用户历史文件（最近60天内的会话）"""
+    rng = random.Random(3)
+    now = time.time()
+    statuses = ("completed", "completed", "completed", "failed", "interrupted")
+    for u in range(users):
+        sessions = []
+        for i in range(sessions_per_user):
+            start = now - rng.uniform(0, 60 * 86400)
+            sessions.append({
+                "id": i, "start_time": start, "end_time": start + 1500, "planned_duration": 1500,
+                "actual_duration": rng.randrange(300, 1501), "status": rng.choice(statuses), "notes": "Success",
+            })
+        with open(os.path.join(users_dir, f"user{u:05d}.json"), "w", encoding="utf-8") as f:
+            json.dump(sessions, f)
+
+
+def timed(label, func, users):
+    t0 = time.perf_counter()
+    counts = func()
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<36} {elapsed:7.2f} s  {users / elapsed:9.0f} profiles/s  {counts}")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sessions_per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    workers = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        users_dir = os.path.join(tmp, "users")
+        os.makedirs(users_dir)
+        write_profiles(users_dir, users, sessions_per_user)
+        profiles = find_profiles(users_dir=users_dir)
+        print(f"{users} profiles x {sessions_per_user} sessions, {workers} CPUs:")
+
+        timed("single process", lambda: generate_reports(profiles, os.path.join(tmp, "serial"), workers=1), users)
+        out_dir = os.path.join(tmp, "reports")
+        timed(f"process pool ({workers} workers)", lambda: generate_reports(profiles, out_dir), users)
+        timed("rerun, nothing changed", lambda: generate_reports(profiles, out_dir), users)
+
+        # 10% 的用户有新会话
+        for name in sorted(profiles)[::10]:
+            path = profiles[name]
+            with open(path, "r", encoding="utf-8") as f:
+                sessions = json.load(f)
+            sessions.append(dict(sessions[-1], id=len(sessions), start_time=time.time() - 60))
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(sessions, f)
+        timed("rerun, 10% of users changed", lambda: generate_reports(profiles, out_dir), users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+历史记录表格行格式化基准测试：原来的逐行格式化与 SessionFormatter（首次和缓存命中）对比
+
+用法:
+    python benchmarks/bench_row_format.py [会话数]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.history import SessionStatus, format_timestamp, format_duration
+from app.utils.formatting import SessionFormatter
+
+
+def make_sessions(count):
+    """生成合成会话，开始时间为毫秒精度（与 time.time() 记录的一致）"""
+    rng = random.Random(5)
+    now = time.time()
+    statuses = ("completed", "completed", "failed", "interrupted")
+    sessions = []
+    for i in range(count):
+        start = round(now - rng.uniform(0, 3 * 365 * 86400), 3)
+        planned = rng.choice((15, 25, 45, 60)) * 60
+        sessions.append({
+            "id": i, "start_time": start, "end_time": start + planned, "planned_duration": planned,
+            "actual_duration": rng.randrange(planned + 1), "status": rng.choice(statuses), "notes": "",
+        })
+    return sessions
+
+
+def legacy_row(session):
+    """原来 _load_history 中的逐行格式化"""
+    start_time = session.get("start_time", 0)
+    date_str = format_timestamp(start_time).split()[0]
+    time_str = format_timestamp(start_time).split()[1]
+    actual_duration_str = format_duration(session.get("actual_duration", 0))
+    planned_duration_str = format_duration(session.get("planned_duration", 0))
+    status = session.get("status", "")
+    if status == SessionStatus.COMPLETED.value:
+        status_str = "Completed ✓"
+    elif status == SessionStatus.FAILED.value:
+        status_str = "Failed ✗"
+    elif status == SessionStatus.INTERRUPTED.value:
+        status_str = "Interrupted !"
+    else:
+        status_str = status
+    return (date_str, time_str, actual_duration_str, planned_duration_str, status_str)
+
+
+def timed(label, func, count):
+    t0 = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<34} {elapsed * 1000:9.1f} ms  {count / elapsed:12,.0f} rows/s")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sessions = make_sessions(count)
+    print(f"Formatting {count} rows:")
+    expected = timed("legacy (format_timestamp x2)", lambda: [legacy_row(s) for s in sessions], count)
+
+    formatter = SessionFormatter(capacity=count)
+    cold = timed("SessionFormatter, cold", lambda: [formatter.row(s) for s in sessions], count)
+    warm = timed("SessionFormatter, cached", lambda: [formatter.row(s) for s in sessions], count)
+    assert cold == expected and warm == expected
+
+    # 默认容量下按页反复浏览最近的会话
+    formatter = SessionFormatter()
+    page = sessions[:200]
+    timed("default capacity, 500 page loads", lambda: [formatter.row(s) for _ in range(500) for s in page],
+          500 * len(page))
+    print(f"  cache: {formatter.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
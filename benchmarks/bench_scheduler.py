@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+计时器调度器基准测试：一个线程驱动大量 FocusTimer，统计CPU占用和截止时间误差
+
+用法:
+    python benchmarks/bench_scheduler.py [计时器数] [时长（秒）]
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.timer import FocusTimer
+from app.core.scheduler import TimerScheduler
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    scheduler = TimerScheduler().start()
+    lateness = []
+    done = threading.Event()
+    completed = [0]
+
+    def make_timer():
+        timer = FocusTimer(duration=duration, scheduler=scheduler)
+        start = [0.0]
+
+        def on_tick(remaining):
+            # 第 n 次 tick 的理想时间是开始后 n 秒
+            if remaining < duration:
+                lateness.append(time.monotonic() - start[0] - (duration - remaining))
+
+        def on_complete():
+            lateness.append(time.monotonic() - start[0] - duration)
+            completed[0] += 1
+            if completed[0] == count:
+                done.set()
+
+        timer.on_tick = on_tick
+        timer.on_complete = on_complete
+        return timer, start
+
+    timers = [make_timer() for _ in range(count)]
+
+    cpu0 = time.process_time()
+    wall0 = time.monotonic()
+    for timer, start in timers:
+        start[0] = time.monotonic()
+        timer.start()
+    # 所有计时器都已启动，此时的线程数即为峰值（调度器驱动时不随计时器数增长）
+    threads = threading.active_count()
+    done.wait()
+    wall = time.monotonic() - wall0
+    cpu = time.process_time() - cpu0
+    scheduler.stop()
+
+    lateness.sort()
+    ticks = len(lateness)
+    print(f"{count} timers x {duration} s: {ticks} ticks in {wall:.2f} s wall, {threads} threads")
+    print(f"CPU: {cpu:.2f} s ({cpu / wall * 100:.1f}% of one core, {cpu / ticks * 1e6:.1f} us/tick)")
+    print(f"Deadline lateness: p50 {lateness[ticks // 2] * 1000:.2f} ms, "
+          f"p99 {lateness[ticks * 99 // 100] * 1000:.2f} ms, max {lateness[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+会话ID基准测试：多进程同时分配ID的唯一性和吞吐量，以及按ID查找与删除的耗时
+（哈希索引与逐行扫描的对比）
+
+用法:
+    python benchmarks/bench_session_ids.py [会话数] [进程数] [每个进程分配的ID数]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.id_allocator import IdAllocator
+from app.utils.session_table import SessionTable
+
+
+def allocate_many(path, count):
+    """在子进程中分配 count 个ID"""
+    allocator = IdAllocator(path)
+    return [allocator.allocate() for _ in range(count)]
+
+
+def build_table(count):
+    """生成合成的会话表（ID为旧版本的毫秒时间戳）"""
+    rng = random.Random(11)
+    start = time.time() - count * 3600
+    sessions = []
+    for i in range(count):
+        start += rng.uniform(1800, 5400)
+        sessions.append({"id": int(start * 1000), "start_time": start, "end_time": start + 1500,
+                         "planned_duration": 1500, "actual_duration": 1500, "status": "completed"})
+    return SessionTable.from_dicts(sessions)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    per_process = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.json.ids")
+        t0 = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(allocate_many, [(path, per_process)] * processes)
+        elapsed = time.perf_counter() - t0
+        ids = [session_id for result in results for session_id in result]
+        increasing = all(a < b for result in results for a, b in zip(result, result[1:]))
+        print(f"{processes} processes x {per_process} ids: {len(ids) / elapsed:,.0f} ids/s, "
+              f"unique: {len(set(ids)) == len(ids)}, increasing per process: {increasing}")
+
+    table = build_table(count)
+    targets = random.Random(2).sample(list(table.ids), 100)
+    print(f"{count} sessions, 100 lookups:")
+
+    t0 = time.perf_counter()
+    for session_id in targets:
+        next(i for i, row_id in enumerate(table.ids) if row_id == session_id)
+    scan = time.perf_counter() - t0
+    print(f"  linear scan              {scan / len(targets) * 1000:9.3f} ms/lookup")
+
+    t0 = time.perf_counter()
+    table.row_of(targets[0])
+    print(f"  build hash index         {(time.perf_counter() - t0) * 1000:9.1f} ms (once)")
+    t0 = time.perf_counter()
+    for session_id in targets:
+        table.row_of(session_id)
+    indexed = time.perf_counter() - t0
+    print(f"  hash index               {indexed / len(targets) * 1000:9.4f} ms/lookup")
+
+    t0 = time.perf_counter()
+    table.delete_rows([table.row_of(session_id) for session_id in targets[:10]])
+    print(f"  delete 10 by id          {(time.perf_counter() - t0) * 1000:9.1f} ms (column compaction)")
+
+
+if __name__ == "__main__":
+    main()
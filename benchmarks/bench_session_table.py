@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+会话存储基准测试：字典列表 vs 紧凑会话表
+
+用法:
+    python benchmarks/bench_session_table.py [会话数]
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.session_table import SessionTable
+
+NOTES = {"completed": "Success", "failed": "Ended by user", "interrupted": "Session interrupted"}
+
+
+def make_history_json(count):
+    """生成与历史文件格式一致的JSON文本"""
+    rng = random.Random(42)
+    now = time.time()
+    sessions = []
+    for i in range(count):
+        start = now - rng.uniform(0, 3 * 365 * 86400)
+        planned = rng.choice((15, 25, 45, 60)) * 60
+        status = rng.choice(("completed", "completed", "failed", "interrupted"))
+        actual = planned if status == "completed" else rng.randint(1, planned)
+        sessions.append({
+            "id": int(start * 1000) + i,
+            "start_time": start,
+            "end_time": start + actual,
+            "planned_duration": planned,
+            "actual_duration": actual,
+            "status": status,
+            "notes": NOTES[status],
+        })
+    return json.dumps(sessions)
+
+
+def measure(build):
+    """返回 (对象, 占用内存字节数, 构建耗时)"""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, elapsed
+
+
+def scan_dicts(history, cutoff):
+    total = completed = focus = 0
+    for s in history:
+        if s.get("start_time", 0) >= cutoff:
+            total += 1
+            focus += s.get("actual_duration", 0)
+            if s.get("status") == "completed":
+                completed += 1
+    return total, completed, focus
+
+
+def scan_table(table, cutoff):
+    completed_code = table.status_pool.code_of("completed")
+    total = completed = focus = 0
+    for start, code, actual in zip(table.start_times, table.status_codes, table.actual_durations):
+        if start >= cutoff:
+            total += 1
+            focus += actual
+            if code == completed_code:
+                completed += 1
+    return total, completed, focus
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    text = make_history_json(count)
+    cutoff = time.time() - 365 * 86400
+
+    dicts, dict_bytes, dict_build = measure(lambda: json.loads(text))
+    table, table_bytes, table_build = measure(lambda: SessionTable.from_dicts(json.loads(text)))
+
+    t0 = time.perf_counter()
+    dict_result = scan_dicts(dicts, cutoff)
+    dict_scan = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    table_result = scan_table(table, cutoff)
+    table_scan = time.perf_counter() - t0
+
+    assert dict_result == table_result
+
+    print(f"sessions: {count}")
+    print(f"{'':12}{'memory (MB)':>14}{'build (s)':>12}{'scan (s)':>12}")
+    print(f"{'dict list':12}{dict_bytes / 2**20:14.1f}{dict_build:12.2f}{dict_scan:12.3f}")
+    print(f"{'SessionTable':12}{table_bytes / 2**20:14.1f}{table_build:12.2f}{table_scan:12.3f}")
+    print(f"memory ratio: {dict_bytes / table_bytes:.1f}x, scan speedup: {dict_scan / table_scan:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
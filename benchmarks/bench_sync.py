@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+目录同步基准测试：两台机器的历史记录只差几条会话时，同步读写的分段和字节数
+
+用法:
+    python benchmarks/bench_sync.py [会话数]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.history import HistoryManager, SessionStatus
+from app.utils.sync import sync_history
+
+
+def write_history(path, count, now):
+    """生成合成的历史文件（每小时左右一次会话），相同参数生成相同的历史记录"""
+    rng = random.Random(9)
+    start = now - count * 3600 * 1.5
+    sessions = []
+    for i in range(count):
+        start += rng.uniform(1800, 5400)
+        sessions.append({
+            "id": int(start * 1000), "start_time": start, "end_time": start + 1500, "planned_duration": 1500,
+            "actual_duration": rng.randrange(300, 1501), "status": "completed", "notes": "Success",
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sessions, f)
+
+
+def timed_sync(label, history_file, sync_dir, device):
+    HistoryManager.set_history_file(history_file)
+    t0 = time.perf_counter()
+    counts = sync_history(sync_dir, device)
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<28} {elapsed * 1000:8.1f} ms  {counts}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_dir = os.path.join(tmp, "shared")
+        os.makedirs(sync_dir)
+        laptop = os.path.join(tmp, "laptop.json")
+        desktop = os.path.join(tmp, "desktop.json")
+        now = time.time()
+        write_history(laptop, count, now)
+        write_history(desktop, count, now)
+        print(f"two histories of {count} sessions:")
+
+        timed_sync("laptop, first sync", laptop, sync_dir, "laptop")
+        timed_sync("desktop, first sync", desktop, sync_dir, "desktop")
+        timed_sync("laptop, nothing changed", laptop, sync_dir, "laptop")
+
+        # 笔记本新增3条会话，台式机新增2条并删除1条
+        HistoryManager.set_history_file(laptop)
+        for i in range(3):
+            HistoryManager.add_session(now + i, now + i + 1500, 1500, 1500, SessionStatus.COMPLETED, "laptop")
+        HistoryManager.set_history_file(desktop)
+        for i in range(2):
+            HistoryManager.add_session(now + 10 + i, now + 1510 + i, 1500, 900, SessionStatus.FAILED, "desktop")
+        HistoryManager.delete_session(HistoryManager.get_table().ids[count // 2])
+
+        timed_sync("laptop, 3 new sessions", laptop, sync_dir, "laptop")
+        timed_sync("desktop, 2 new + 1 deleted", desktop, sync_dir, "desktop")
+        timed_sync("laptop, pull desktop", laptop, sync_dir, "laptop")
+
+        HistoryManager.set_history_file(laptop)
+        laptop_ids = sorted(HistoryManager.get_table().ids)
+        HistoryManager.set_history_file(desktop)
+        desktop_ids = sorted(HistoryManager.get_table().ids)
+        print(f"  histories match: {laptop_ids == desktop_ids} ({len(laptop_ids)} sessions)")
+
+
+if __name__ == "__main__":
+    main()
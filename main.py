@@ -6,15 +6,88 @@ Forest - Say no to distractions
 
 import os
 import sys
-import tkinter as tk
-from app.ui.main_window import MainWindow
+import time
+import argparse
+import threading
+
+# tkinter 和界面模块在解析参数之后才导入，以便启动分析能够统计其导入耗时
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="PyFocus - Say no to distractions")
+    parser.add_argument("--api-port", type=int, default=0,
+                        help="serve statistics over HTTP on this localhost port")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report per-import and per-phase startup timings")
+    parser.add_argument("--start", type=int, metavar="MINUTES",
+                        help="start a focus session of MINUTES minutes")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="do not hand off to an already running instance")
+    parser.add_argument("--profile", metavar="NAME",
+                        help="use (or switch the running instance to) this user profile")
+    return parser.parse_args(argv)
 
 def main():
     """应用程序入口点"""
+    args = parse_args()
+    
+    # 已有实例在运行时，把命令交给它处理后立即退出
+    from app.core.single_instance import send_command, InstanceServer
+    if args.start:
+        command = {"action": "start", "minutes": args.start}
+    else:
+        command = {"action": "raise"}
+    if args.profile:
+        command["profile"] = args.profile
+    if not args.new_instance and send_command(command):
+        return
+    
+    # 在创建窗口之前占用单实例套接字；同时启动的两个实例中只有一个能绑定成功，
+    # 另一个把命令交给它后退出。窗口创建之前收到的命令先排队
+    instance_server = None
+    queued_commands = []
+    command_lock = threading.Lock()
+    command_handler = [queued_commands.append]
+    
+    def on_command(cmd):
+        """在服务线程中接收其他启动进程发来的命令"""
+        with command_lock:
+            command_handler[0](cmd)
+    
+    if not args.new_instance:
+        instance_server = InstanceServer(on_command)
+        if not instance_server.start():
+            for _ in range(20):
+                if send_command(command):
+                    return
+                time.sleep(0.1)
+            print("Another PyFocus instance is starting but does not respond; use --new-instance to override")
+            return
+    
+    # 选择用户配置（在创建界面和读取配置之前）
+    if args.profile:
+        from app.utils.profiles import switch_profile
+        try:
+            switch_profile(args.profile)
+        except ValueError as e:
+            print(e)
+            return
+    
+    # 启动耗时分析
+    profiler = None
+    if args.profile_startup:
+        from app.utils.startup_profile import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.install_import_hook()
+    
+    import tkinter as tk
+    from app.ui.main_window import MainWindow
+    if profiler:
+        profiler.mark("imports")
     
     # 创建主应用
     root = tk.Tk()
-    root.title("PyFocus")
+    root.title(f"PyFocus - {args.profile}" if args.profile else "PyFocus")
     
     # 设置应用图标
     if os.path.exists("resources/icon.ico"):
@@ -28,12 +101,49 @@ def main():
     center_x = int((screen_width - window_width) / 2)
     center_y = int((screen_height - window_height) / 2)
     root.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
+    if profiler:
+        profiler.mark("create Tk root")
     
     # 创建主窗口
     app = MainWindow(root)
+    if profiler:
+        profiler.mark("create MainWindow")
+    
+    # 接收后续启动进程发来的命令，转到 Tk 主线程执行
+    with command_lock:
+        command_handler[0] = lambda cmd: root.after(0, app.handle_command, cmd)
+        for cmd in queued_commands:
+            root.after(0, app.handle_command, cmd)
+        queued_commands.clear()
+    
+    # 本次启动自带的命令
+    if args.start:
+        app.handle_command(command)
+    
+    # 启动本地统计接口
+    if args.api_port:
+        from app.service.http_api import StatsServer
+        try:
+            StatsServer(args.api_port, timer_provider=lambda: app.timer).start()
+        except OSError as e:
+            print(f"Cannot start statistics API on port {args.api_port}: {e}")
+    
+    if profiler:
+        profiler.mark("enter mainloop")
+        
+        def report_first_paint():
+            """主循环首次空闲时窗口已完成绘制，输出报告"""
+            profiler.mark("first paint")
+            profiler.remove_import_hook()
+            profiler.report()
+        
+        root.after_idle(report_first_paint)
     
     # 启动应用
     root.mainloop()
+    
+    if instance_server:
+        instance_server.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()